@@ -0,0 +1,64 @@
+# backend/benchmarks/auth_overhead.py
+#
+# Costo de autenticación por request (no necesita MongoDB):
+#   - decode:       decode_access_token con y sin caché de tokens verificados
+#   - verify_token: la dependencia tal como la ejecuta FastAPI en cada request
+#
+# Uso:
+#   python -m backend.benchmarks.auth_overhead --requests 5000 --tokens 50
+
+import argparse
+import asyncio
+import random
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from backend.utils import jwt_handler
+from backend.utils.security import verify_token
+
+def per_call_us(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+def run(calls, tokens, cache_size):
+    jwt_handler.JWT_CACHE_SIZE = cache_size
+    jwt_handler.clear_token_cache()
+    # Varios usuarios activos: cada "página" del dashboard reutiliza su token
+    pool = [jwt_handler.create_access_token({"user_id": f"u{i}", "role": "resident"}) for i in range(tokens)]
+    rng = random.Random(1)
+
+    decode_us = per_call_us(lambda: jwt_handler.decode_access_token(rng.choice(pool)), calls)
+
+    credentials = [HTTPAuthorizationCredentials(scheme="Bearer", credentials=t) for t in pool]
+
+    async def verify_all():
+        start = time.perf_counter()
+        for _ in range(calls):
+            await verify_token(rng.choice(credentials))
+        return (time.perf_counter() - start) / calls * 1e6
+
+    return decode_us, asyncio.run(verify_all())
+
+def main():
+    parser = argparse.ArgumentParser(description="Overhead de verify_token por request")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--tokens", type=int, default=50, help="tokens distintos en circulación")
+    args = parser.parse_args()
+
+    size = jwt_handler.JWT_CACHE_SIZE or 10000
+    results = {
+        "sin caché": run(args.requests, args.tokens, 0),
+        "con caché": run(args.requests, args.tokens, size),
+    }
+    jwt_handler.JWT_CACHE_SIZE = size
+
+    print(f"⏱️ {args.requests} llamadas, {args.tokens} tokens distintos (µs por llamada)")
+    print(f"{'modo':<12}{'decode':>10}{'verify_token':>15}")
+    for mode, (decode_us, verify_us) in results.items():
+        print(f"{mode:<12}{decode_us:>10.1f}{verify_us:>15.1f}")
+
+if __name__ == "__main__":
+    main()
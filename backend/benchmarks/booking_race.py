@@ -0,0 +1,129 @@
+# backend/benchmarks/booking_race.py
+#
+# Prueba de concurrencia de reservas: dispara cientos de POST /bookings en
+# paralelo sobre la misma instalación y verifica que
+#   - mismo horario:       exactamente una reserva gana, el resto recibe 409
+#   - horarios escalonados: ninguna pareja de reservas ganadoras se traslapa
+#
+# Uso (contra un mongod local):
+#   MONGO_URI=mongodb://localhost:27017 python -m backend.benchmarks.booking_race --bookings 300
+#   ... --mode async   (handlers de MONGO_MODE=async con asyncio.gather)
+#
+# Sale con código 1 si alguna verificación falla. Limpia lo que crea.
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from backend.db import mongo
+from backend.db.slots import SLOTS_COLLECTION
+from backend.routes.bookings import BookingIn, create_booking, create_booking_async
+
+DAY = datetime(2030, 1, 1, 8, 0)
+
+def same_slot(instalacion, n):
+    return [BookingIn(instalacion=instalacion, fechaInicio=DAY, fechaFin=DAY + timedelta(hours=1)) for _ in range(n)]
+
+def staggered(instalacion, n, rng):
+    # Inicios cada 15 min y duraciones de 30-120 min: muchos traslapes parciales
+    requests = []
+    for _ in range(n):
+        inicio = DAY + timedelta(minutes=15 * rng.randrange(0, 40))
+        requests.append(BookingIn(instalacion=instalacion, fechaInicio=inicio, fechaFin=inicio + timedelta(minutes=30 * rng.randint(1, 4))))
+    return requests
+
+def outcome(call):
+    try:
+        call()
+        return "ok"
+    except HTTPException as e:
+        return e.status_code
+
+def run_sync(requests, workers):
+    db = mongo.get_db()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda data: outcome(lambda: create_booking(data, db)), requests))
+
+async def run_async(requests):
+    mongo.connect_async()
+    db = await mongo.get_async_db()
+
+    async def one(data):
+        try:
+            await create_booking_async(data, db)
+            return "ok"
+        except HTTPException as e:
+            return e.status_code
+
+    try:
+        return await asyncio.gather(*(one(data) for data in requests))
+    finally:
+        await mongo.close_async()
+
+def overlaps(bookings):
+    bookings = sorted(bookings, key=lambda b: b["fechaInicio"])
+    return [
+        (str(a["_id"]), str(b["_id"]))
+        for a, b in zip(bookings, bookings[1:])
+        if b["fechaInicio"] < a["fechaFin"]
+    ]
+
+def scenario(name, requests, instalacion, args):
+    db = mongo.get_db()
+    start = time.perf_counter()
+    if args.mode == "async":
+        results = asyncio.run(run_async(requests))
+    else:
+        results = run_sync(requests, args.workers)
+    elapsed = time.perf_counter() - start
+
+    winners = list(db["bookings"].find({"instalacion": instalacion}))
+    ok = results.count("ok")
+    conflicts = results.count(409)
+    errors = len(results) - ok - conflicts
+    bad_pairs = overlaps(winners)
+    print(f"{name}: {len(results)} requests en {elapsed:.2f}s -> {ok} ganadoras, {conflicts} conflictos (409), {errors} errores")
+
+    failed = errors > 0 or bad_pairs or ok != len(winners)
+    if name == "mismo horario" and ok != 1:
+        failed = True
+    if bad_pairs:
+        print(f"❌ reservas traslapadas: {bad_pairs[:5]}")
+    return not failed
+
+def cleanup(instalaciones):
+    db = mongo.get_db()
+    for instalacion in instalaciones:
+        db["bookings"].delete_many({"instalacion": instalacion})
+        db[SLOTS_COLLECTION].delete_many({"instalacion": instalacion})
+
+def main():
+    parser = argparse.ArgumentParser(description="Reservas concurrentes traslapadas: solo una gana")
+    parser.add_argument("--bookings", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=64, help="hilos en modo sync")
+    parser.add_argument("--mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    suffix = str(ObjectId())
+    same, stag = f"race-same-{suffix}", f"race-staggered-{suffix}"
+    rng = random.Random(args.seed)
+    try:
+        passed = scenario("mismo horario", same_slot(same, args.bookings), same, args)
+        passed &= scenario("escalonadas", staggered(stag, args.bookings, rng), stag, args)
+    finally:
+        cleanup([same, stag])
+        mongo.close()
+
+    print("✅ Sin reservas traslapadas." if passed else "❌ La detección de conflictos falló.")
+    return 0 if passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# backend/benchmarks/bulk_writes.py
+#
+# Alta masiva de pagos: N inserciones una por una (insert_returning + hook de
+# rollups, lo que hace POST /payments por request) contra las rutas en lote
+# (insert_docs + un bulk_write de rollups), POST /payments/bulk completo y el
+# job de cargos mensuales sobre N apartamentos.
+#
+# Uso:
+#   python -m backend.benchmarks.bulk_writes --rows 10000 --batch-size 1000
+# (--rows por encima de BULK_MAX_ITEMS hace que POST /bulk responda 413)
+#
+# Escribe en la base de MONGO_URI; lo creado (concepto "Benchmark bulk" y
+# apartamentos "bench-*") se borra al final, revirtiendo también sus rollups.
+
+import argparse
+import time
+from datetime import datetime
+
+from pymongo import monitoring
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+# El listener debe registrarse antes de que se cree el cliente compartido
+counter = CommandCounter()
+monitoring.register(counter)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from backend.db import mongo  # noqa: E402
+from backend.db.bulk import insert_docs  # noqa: E402
+from backend.db.charges import monthly_charges  # noqa: E402
+from backend.db.crud import insert_returning  # noqa: E402
+from backend.db.rollups import on_payment_change, on_payment_changes  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.utils.jwt_handler import create_access_token  # noqa: E402
+
+CONCEPT = "Benchmark bulk"
+CHARGES_CONCEPT = "Benchmark charges"
+CHARGES_MONTH = "2031-01"
+
+def payment(i, apartment_ids):
+    return {
+        "apartmentId": apartment_ids[i % len(apartment_ids)],
+        "amount": 1200.0,
+        "concept": CONCEPT,
+        "dueDate": datetime(2031, 1 + i % 12, 10),
+        "status": "pending",
+        "paymentDate": None,
+    }
+
+def timed(name, fn, rows):
+    before = counter.count
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    commands = counter.count - before
+    print(f"{name:>16}: {rows} filas en {elapsed:.2f}s  ({rows / elapsed:,.0f} filas/s, {commands} comandos)")
+
+def cleanup(db, apartment_prefix):
+    # Revierte los rollups antes de borrar, como lo haría DELETE /payments/bulk
+    docs = list(db["payments"].find({"concept": {"$in": [CONCEPT, CHARGES_CONCEPT]}}))
+    on_payment_changes(db, [(doc, None) for doc in docs])
+    db["payments"].delete_many({"_id": {"$in": [d["_id"] for d in docs]}})
+    db["apartments"].delete_many({"number": {"$regex": f"^{apartment_prefix}"}})
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inserciones una por una vs. en lote")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    db = mongo.get_db()
+    prefix = f"bench-{int(time.time())}-"
+    apartments = [{"number": f"{prefix}{i}", "level": 1, "createdAt": datetime.utcnow()} for i in range(args.rows)]
+    db["apartments"].insert_many(apartments, ordered=False)
+    apartment_ids = [a["_id"] for a in apartments]
+
+    try:
+        def one_by_one():
+            for i in range(args.rows):
+                doc = insert_returning(db["payments"], payment(i, apartment_ids))
+                on_payment_change(db, None, doc)
+
+        def bulk():
+            _, inserted = insert_docs(db["payments"], [(i, payment(i, apartment_ids)) for i in range(args.rows)], args.batch_size)
+            on_payment_changes(db, [(None, doc) for doc in inserted])
+
+        headers = {"Authorization": f"Bearer {create_access_token({'user_id': 'bench', 'role': 'admin'})}"}
+        body = [dict(payment(i, apartment_ids), apartmentId=str(apartment_ids[i]), dueDate="2031-03-10T00:00:00") for i in range(args.rows)]
+
+        with TestClient(app) as client:
+            def api_bulk():
+                r = client.post("/payments/bulk", json=body, headers=headers)
+                r.raise_for_status()
+                assert r.json()["failed"] == 0, r.json()["items"][:3]
+
+            timed("uno por uno", one_by_one, args.rows)
+            timed("insert_docs", bulk, args.rows)
+            timed("POST /bulk", api_bulk, args.rows)
+
+        timed("cargos mensuales", lambda: monthly_charges(db, CHARGES_MONTH, 1200.0, CHARGES_CONCEPT, batch_size=args.batch_size), args.rows)
+        timed("cargos (re-run)", lambda: monthly_charges(db, CHARGES_MONTH, 1200.0, CHARGES_CONCEPT, batch_size=args.batch_size), args.rows)
+    finally:
+        cleanup(db, prefix)
+
+if __name__ == "__main__":
+    main()
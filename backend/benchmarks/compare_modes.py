@@ -0,0 +1,69 @@
+# backend/benchmarks/compare_modes.py
+#
+# Compara requests/seg y p99 entre MONGO_MODE=sync y MONGO_MODE=async
+# sobre los mismos endpoints y la misma base (MONGO_URI).
+#
+# Uso:
+#   python -m backend.benchmarks.compare_modes --requests 5000 --concurrency 100
+#
+# Requiere httpx y una base con datos (python -m backend.db.init_db).
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from backend.benchmarks.loadgen import run_load, wait_until_up
+from backend.utils.jwt_handler import create_access_token
+
+ENDPOINTS = [
+    ("GET", "/payments/?limit=50", None),
+    ("GET", "/incidents/?limit=50", None),
+    ("GET", "/announcements?limit=20", None),
+    ("GET", "/visits/?limit=50", None),
+]
+
+def start_server(mode, port):
+    env = dict(os.environ, MONGO_MODE=mode)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+
+async def bench_mode(mode, port, total, concurrency, headers):
+    proc = start_server(mode, port)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        await wait_until_up(base_url)
+        # Calentamiento: abre conexiones del pool antes de medir
+        await run_load(base_url, ENDPOINTS * 10, concurrency, headers)
+        requests = [ENDPOINTS[i % len(ENDPOINTS)] for i in range(total)]
+        return await run_load(base_url, requests, concurrency, headers)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+async def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="Archivo JSON con los resultados")
+    args = parser.parse_args(argv)
+
+    headers = {"Authorization": f"Bearer {create_access_token({'user_id': 'bench', 'role': 'admin'})}"}
+    results = {}
+    for mode in ("sync", "async"):
+        results[mode] = await bench_mode(mode, args.port, args.requests, args.concurrency, headers)
+        total = results[mode]["total"]
+        print(f"{mode:>5}: {total['rps']} req/s  p50={total['p50_ms']}ms  p99={total['p99_ms']}ms  errores={total['errors']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    asyncio.run(main())
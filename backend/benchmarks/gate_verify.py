@@ -0,0 +1,97 @@
+# backend/benchmarks/gate_verify.py
+#
+# Latencia de la verificación de pases en la puerta:
+#   - stub:     lo que proponía python_db/qr_generator.py (JSON en el QR, find_one
+#               por _id y recomputar el código en cada escaneo)
+#   - gate:     backend/db/gate.py en proceso (HMAC + hot set + write-behind)
+#   - API:      POST /visits/verify completo (JWT, validación, serialización)
+#
+# Uso:
+#   python -m backend.benchmarks.gate_verify --visits 1000 --scans 5000
+#
+# Escribe en la base de MONGO_URI; las visitas "bench-gate-*" se borran al final.
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.loadgen import summarize
+from backend.db import mongo
+from backend.db.gate import gate
+from backend.main import app
+from backend.utils.jwt_handler import create_access_token
+from backend.utils.passes import visit_pass
+
+PREFIX = "bench-gate-"
+TARGET_MS = 10
+
+def seed(db, count):
+    now = datetime.utcnow()
+    docs = [
+        {"apartmentId": None, "visitorName": f"{PREFIX}{i}", "entryTime": now, "exitTime": None,
+         "passExpiresAt": now + timedelta(hours=12), "createdAt": now, "updatedAt": now}
+        for i in range(count)
+    ]
+    db["visits"].insert_many(docs, ordered=False)
+    return docs
+
+def measure(fn, scans):
+    latencies = []
+    start = time.perf_counter()
+    for i in range(scans):
+        t = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, 0, time.perf_counter() - start)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latencia de POST /visits/verify")
+    parser.add_argument("--visits", type=int, default=1000)
+    parser.add_argument("--scans", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    db = mongo.get_db()
+    docs = seed(db, args.visits)
+    tokens = [visit_pass(doc) for doc in docs]
+    # Lo que el stub metía en el QR: la visita en JSON más un código a recomputar
+    stub_payloads = [json.dumps({"visit_id": str(doc["_id"]), "verification_code": str(doc["_id"])[-6:]}) for doc in docs]
+
+    try:
+        def stub(i):
+            data = json.loads(stub_payloads[i % len(docs)])
+            visit = db["visits"].find_one({"_id": docs[i % len(docs)]["_id"]})
+            assert visit and data["verification_code"] == str(visit["_id"])[-6:]
+
+        def in_process(i):
+            assert gate.verify(db, tokens[i % len(tokens)])["valid"]
+
+        headers = {"Authorization": f"Bearer {create_access_token({'user_id': 'bench', 'role': 'guard'})}"}
+
+        with TestClient(app) as client:
+            gate.refresh(db, full=True)  # precarga: el primer escaneo ya encuentra el hot set
+
+            def api(i):
+                r = client.post("/visits/verify", json={"token": tokens[i % len(tokens)]}, headers=headers)
+                r.raise_for_status()
+                assert r.json()["valid"]
+
+            results = {
+                "stub": measure(stub, args.scans),
+                "gate": measure(in_process, args.scans),
+                "API": measure(api, args.scans),
+            }
+            status = gate.status()
+        # Al salir del TestClient el lifespan detiene la puerta y escribe lo pendiente
+    finally:
+        db["visits"].delete_many({"visitorName": {"$regex": f"^{PREFIX}"}})
+
+    for name, stats in results.items():
+        flag = "✅" if stats["p99_ms"] < TARGET_MS else "⚠️"
+        print(f"{flag} {name:>5}: p50={stats['p50_ms']}ms  p95={stats['p95_ms']}ms  p99={stats['p99_ms']}ms  ({stats['rps']} escaneos/s)")
+    print(f"hot set: {status['passes']} pases, {status['hits']} hits, {status['misses']} misses, {status['written']} marcas escritas en lote")
+
+if __name__ == "__main__":
+    main()
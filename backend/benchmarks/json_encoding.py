@@ -0,0 +1,92 @@
+# backend/benchmarks/json_encoding.py
+#
+# Micro-benchmark de codificación JSON por fila (no necesita MongoDB):
+#   - paginado:  jsonable_encoder + JSONResponse (listas paginadas)
+#   - validado:  TypeAdapter(List[Out]) validate + dump + JSONResponse
+#                (lo que hace FastAPI con response_model)
+#   - fast:      FastJSONResponse (orjson, sin re-validación)
+#
+# Uso:
+#   python -m backend.benchmarks.json_encoding --rows 10000
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from backend.routes import (
+    announcements, apartments, bookings, deliveries, documents, fines,
+    incidents, payments, providers, reserves, users, visits,
+)
+from backend.utils.responses import FastJSONResponse, orjson
+
+NOW = datetime(2025, 1, 15, 10, 30)
+
+# Documento representativo (tal como sale de Mongo) por colección
+SAMPLES = {
+    announcements: lambda i: {"_id": ObjectId(), "title": f"Aviso {i}", "description": "Corte de agua programado", "category": "general", "highlight": i % 5 == 0, "imageUrl": "", "date": NOW, "createdAt": NOW, "updatedAt": NOW},
+    apartments: lambda i: {"_id": ObjectId(), "number": f"{i % 40}0{i % 4}", "level": i % 10, "userId": ObjectId(), "createdAt": NOW, "updatedAt": NOW},
+    bookings: lambda i: {"_id": ObjectId(), "userId": ObjectId(), "instalacion": "Alberca", "fechaInicio": NOW + timedelta(hours=i), "fechaFin": NOW + timedelta(hours=i + 1), "createdAt": NOW, "updatedAt": NOW},
+    deliveries: lambda i: {"_id": ObjectId(), "apartmentId": ObjectId(), "status": "pendiente", "receivedDate": NOW, "deliveredDate": None, "description": "Paquete Amazon", "createdAt": NOW, "updatedAt": NOW},
+    documents: lambda i: {"_id": ObjectId(), "userId": ObjectId(), "name": f"Reglamento {i}", "type": "PDF", "url": "https://example.com/doc.pdf", "date": NOW, "createdAt": NOW, "updatedAt": NOW},
+    fines: lambda i: {"_id": ObjectId(), "departamento": "101", "propietario": "Juan Pérez", "monto": 500.0, "descripcion": "Ruido", "fecha": NOW, "estatus": "Incompleto"},
+    incidents: lambda i: {"_id": ObjectId(), "userId": ObjectId(), "title": "Fuga", "description": "Fuga en el baño", "status": "open", "priority": "high", "category": "plomería", "createdAt": NOW, "updatedAt": NOW},
+    payments: lambda i: {"_id": ObjectId(), "apartmentId": ObjectId(), "concept": "Mantenimiento", "amount": 1500 + i % 7, "dueDate": NOW, "status": "pending", "paymentDate": None, "createdAt": NOW, "updatedAt": NOW},
+    providers: lambda i: {"_id": ObjectId(), "documentId": ObjectId(), "name": "Limpieza SA", "service": "limpieza", "email": "contacto@limpieza.mx", "phone": "5555555555", "amount": 12000.0, "createdAt": NOW, "updatedAt": NOW},
+    reserves: lambda i: {"_id": ObjectId(), "apartmentId": ObjectId(), "instalacion": "Salón", "fecha": NOW, "horaInicio": "10:00", "horaFin": "12:00", "status": "pending", "createdAt": NOW, "updatedAt": NOW},
+    users: lambda i: {"_id": ObjectId(), "firstName": "Ana", "lastName": "López", "email": f"ana{i}@milovat.mx", "password": "x", "phone": "5512345678", "role": "resident", "createdAt": NOW, "updatedAt": NOW},
+    visits: lambda i: {"_id": ObjectId(), "apartmentId": ObjectId(), "visitorName": "Carlos", "entryTime": NOW, "exitTime": None},
+}
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def bench_collection(module, rows, repeat):
+    spec = module.spec
+    items = [spec.serializer(SAMPLES[module](i)) for i in range(rows)]
+
+    def paginated():
+        JSONResponse(jsonable_encoder(items, custom_encoder={ObjectId: str}))
+
+    def fast():
+        FastJSONResponse(items)
+
+    result = {
+        "paginado": timed(paginated, repeat),
+        "fast": timed(fast, repeat),
+    }
+    if spec.model_out is not None:
+        adapter = TypeAdapter(List[spec.model_out])
+
+        def validated():
+            JSONResponse(adapter.dump_python(adapter.validate_python(items), mode="json"))
+
+        result["validado"] = timed(validated, repeat)
+    return {k: v / rows * 1e6 for k, v in result.items()}  # µs por fila
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo de codificación JSON por fila")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"⏱️ {args.rows} filas por colección, mejor de {args.repeat} (µs/fila) — orjson: {'sí' if orjson else 'no'}")
+    print(f"{'colección':<15}{'paginado':>10}{'validado':>10}{'fast':>10}{'speedup':>9}")
+    for module in SAMPLES:
+        r = bench_collection(module, args.rows, args.repeat)
+        baseline = max(r["paginado"], r.get("validado", 0))
+        validated = f"{r['validado']:.2f}" if "validado" in r else "-"
+        print(f"{module.spec.name:<15}{r['paginado']:>10.2f}{validated:>10}{r['fast']:>10.2f}{baseline / r['fast']:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
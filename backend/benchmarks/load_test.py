@@ -0,0 +1,258 @@
+# backend/benchmarks/load_test.py
+#
+# Prueba de carga de punta a punta: levanta la app en este proceso (uvicorn en
+# un hilo) contra un mongod local, siembra un residencial, y usuarios virtuales
+# repiten sesiones con guion a concurrencia fija:
+#   - resident: login, dashboard (/mine, avisos), disponibilidad y alguna reserva
+#   - admin:    login, resúmenes y listados de administración
+#   - guard:    login y escaneos de pases en la puerta
+# Guarda throughput y p50/p95/p99 por endpoint en JSON para comparar corridas.
+#
+# Uso:
+#   MONGO_URI=mongodb://localhost:27017 python -m backend.benchmarks.load_test --users 50 --duration 60
+#   ... --mix resident=70,admin=10,guard=20 --output corrida.json --compare base.json
+#   ... --server process   (uvicorn en otro proceso: el generador no compite por el GIL)
+#
+# Todo lo sembrado lleva loadtest=<id de la corrida> y se borra al terminar.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import uvicorn
+from bson import ObjectId
+from pymongo import uri_parser
+
+from backend.benchmarks.compare_modes import start_server
+from backend.benchmarks.loadgen import run_users, wait_until_up
+from backend.db import mongo
+from backend.db.slots import SLOTS_COLLECTION
+from backend.utils.passes import visit_pass
+
+PASSWORD = "loadtest"
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+# --- Residencial sembrado -------------------------------------------------------
+
+def seed_complex(db, run_id, apartments, rng):
+    """Usuarios, apartamentos y su historial; devuelve lo que usan los guiones."""
+    now = datetime.utcnow()
+    mark = {"loadtest": run_id, "createdAt": now, "updatedAt": now}
+
+    def user(username, role):
+        return {"username": username, "password": PASSWORD, "firstName": username, "role": role, **mark}
+
+    residents = [user(f"lt-{run_id}-resident-{i}", "resident") for i in range(apartments)]
+    staff = [user(f"lt-{run_id}-admin-{i}", "admin") for i in range(2)] + [user(f"lt-{run_id}-guard-{i}", "guard") for i in range(4)]
+    db["users"].insert_many(residents + staff)
+
+    apts = [
+        {"level": i // 8 + 1, "number": f"{i // 8 + 1}{'ABCDEFGH'[i % 8]}", "userId": r["_id"], **mark}
+        for i, r in enumerate(residents)
+    ]
+    db["apartments"].insert_many(apts)
+
+    payments, deliveries, visits, incidents = [], [], [], []
+    for apt in apts:
+        for m in range(12):
+            due = datetime(now.year, now.month, 10) - timedelta(days=30 * m)
+            paid = m > 0 and rng.random() < 0.9
+            payments.append({"apartmentId": apt["_id"], "amount": 1200.0, "concept": "Mantenimiento mensual", "dueDate": due,
+                             "status": "paid" if paid else "pending", "paymentDate": due if paid else None, **mark})
+        for d in range(rng.randint(2, 8)):
+            deliveries.append({"apartmentId": apt["_id"], "carrier": rng.choice(["DHL", "FedEx", "Amazon", "Estafeta"]),
+                               "receivedDate": now - timedelta(days=rng.randint(0, 60), minutes=rng.randint(0, 1440)), "status": "received", **mark})
+        for v in range(rng.randint(1, 3)):
+            entry = now - timedelta(hours=rng.randint(0, 6))
+            visits.append({"apartmentId": apt["_id"], "visitorName": f"Visita {v}", "entryTime": entry, "exitTime": None,
+                           "passExpiresAt": entry + timedelta(hours=12), **mark})
+        if rng.random() < 0.2:
+            incidents.append({"userId": apt["userId"], "title": "Fuga en baño", "description": "Fuga en lavamanos",
+                              "status": rng.choice(["open", "in_progress", "closed"]), "priority": "medium", "category": "plumbing", **mark})
+    announcements = [{"title": f"Aviso {i}", "content": "Mantenimiento de elevadores", "date": now - timedelta(days=i), **mark} for i in range(50)]
+
+    for name, docs in (("payments", payments), ("deliveries", deliveries), ("visits", visits), ("incidents", incidents), ("announcements", announcements)):
+        if docs:
+            db[name].insert_many(docs, ordered=False)
+
+    return {
+        "residents": [r["username"] for r in residents],
+        "admins": [u["username"] for u in staff if u["role"] == "admin"],
+        "guards": [u["username"] for u in staff if u["role"] == "guard"],
+        "passes": [visit_pass(v) for v in visits],
+        "documents": len(residents) + len(staff) + len(apts) + len(payments) + len(deliveries) + len(visits) + len(incidents) + len(announcements),
+    }
+
+def cleanup(db, run_id, instalacion):
+    for name in ("users", "apartments", "payments", "deliveries", "visits", "incidents", "announcements"):
+        db[name].delete_many({"loadtest": run_id})
+    db["bookings"].delete_many({"instalacion": instalacion})
+    db[SLOTS_COLLECTION].delete_many({"instalacion": instalacion})
+
+# --- Guiones --------------------------------------------------------------------
+
+async def login(session, username):
+    r = await session.request("POST /auth/login", "POST", "/auth/login", json={"username": username, "password": PASSWORD})
+    if r is None:
+        return False
+    session.headers["Authorization"] = f"Bearer {r.json()['token']}"
+    return True
+
+def scripts(ctx, instalacion):
+    async def resident(session, rng):
+        if not await login(session, rng.choice(ctx["residents"])):
+            return
+        await session.request("GET /auth/me", "GET", "/auth/me")
+        for path in ("/payments/mine?limit=20", "/visits/mine?limit=20", "/deliveries/mine?limit=20", "/incidents/mine?limit=20", "/announcements?limit=20"):
+            await session.request(f"GET {path.split('?')[0]}", "GET", path)
+        if rng.random() < 0.3:
+            desde = datetime.utcnow().date() + timedelta(days=1)
+            await session.request("GET /bookings/disponibilidad", "GET", f"/bookings/disponibilidad?instalacion={instalacion}&desde={desde}&hasta={desde + timedelta(days=6)}")
+            if rng.random() < 0.3:
+                inicio = datetime.combine(desde + timedelta(days=rng.randrange(7)), datetime.min.time()) + timedelta(hours=rng.randint(8, 19))
+                # 409 es un resultado esperado (alguien ganó el horario), no un error
+                await session.request("POST /bookings", "POST", "/bookings/", ok=(200, 409),
+                                      json={"instalacion": instalacion, "fechaInicio": inicio.isoformat(), "fechaFin": (inicio + timedelta(hours=1)).isoformat()})
+
+    async def admin(session, rng):
+        if not await login(session, rng.choice(ctx["admins"])):
+            return
+        for path in ("/payments/summary", "/payments/?limit=50", "/incidents/?limit=50", "/visits/?limit=50", "/apartments/?limit=50", "/fines/summary"):
+            await session.request(f"GET {path.split('?')[0]}", "GET", path)
+
+    async def guard(session, rng):
+        if not await login(session, rng.choice(ctx["guards"])):
+            return
+        for _ in range(5):
+            await session.request("POST /visits/verify", "POST", "/visits/verify", json={"token": rng.choice(ctx["passes"])})
+
+    return {"resident": resident, "admin": admin, "guard": guard}
+
+# --- Servidor -------------------------------------------------------------------
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_app(kind, port):
+    """Devuelve la función que lo detiene."""
+    if kind == "process":
+        proc = start_server(mongo.MONGO_MODE, port)
+        return lambda: (proc.terminate(), proc.wait())
+    server = uvicorn.Server(uvicorn.Config("backend.main:app", host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="uvicorn", daemon=True)
+    thread.start()
+
+    def stop():
+        server.should_exit = True
+        thread.join(timeout=15)
+    return stop
+
+# --- Reporte --------------------------------------------------------------------
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def print_report(result, baseline=None):
+    base = (baseline or {}).get("endpoints", {})
+    print(f"{'endpoint':<30}{'req':>8}{'err':>6}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}" + ("   Δp95" if baseline else ""))
+    rows = list(result["endpoints"].items()) + [("TOTAL", result["total"])]
+    for name, s in rows:
+        line = f"{name:<30}{s['requests']:>8}{s['errors']:>6}{s['rps']:>9}{s['p50_ms']:>9}{s['p95_ms']:>9}{s['p99_ms']:>9}"
+        before = baseline["total"] if name == "TOTAL" and baseline else base.get(name)
+        if before and before["p95_ms"]:
+            change = (s["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+            line += f"  {change:+6.1f}%{' ⚠️' if change > 10 else ''}"
+        print(line)
+
+def check_local(allow_remote):
+    hosts = {host for host, _ in uri_parser.parse_uri(mongo.MONGO_URI)["nodelist"]}
+    if not allow_remote and not hosts <= LOCAL_HOSTS:
+        sys.exit(f"❌ MONGO_URI apunta a {', '.join(sorted(hosts))}: la prueba siembra y borra datos; usa un mongod local o --allow-remote")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga HTTP con sesiones de residentes, administración y guardias")
+    parser.add_argument("--users", type=int, default=50, help="usuarios virtuales concurrentes")
+    parser.add_argument("--duration", type=float, default=30.0, help="segundos medidos")
+    parser.add_argument("--warmup", type=float, default=5.0, help="segundos de calentamiento sin medir")
+    parser.add_argument("--apartments", type=int, default=200)
+    parser.add_argument("--mix", default="resident=70,admin=10,guard=20")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--server", choices=["thread", "process"], default="thread")
+    parser.add_argument("--output", help="JSON de resultados (por defecto load_test-<fecha>.json)")
+    parser.add_argument("--compare", help="JSON de una corrida anterior para comparar p95")
+    parser.add_argument("--allow-remote", action="store_true")
+    args = parser.parse_args(argv)
+
+    check_local(args.allow_remote)
+    mix = parse_mix(args.mix)
+    run_id = str(ObjectId())
+    instalacion = f"lt-{run_id}"
+    db = mongo.get_db()
+    rng = random.Random(args.seed)
+
+    started = time.perf_counter()
+    ctx = seed_complex(db, run_id, args.apartments, rng)
+    print(f"🌱 {ctx['documents']} documentos sembrados en {time.perf_counter() - started:.1f}s ({args.apartments} apartamentos)")
+
+    available = scripts(ctx, instalacion)
+    unknown = set(mix) - set(available)
+    if unknown:
+        sys.exit(f"❌ Guiones desconocidos en --mix: {', '.join(sorted(unknown))}")
+    mixed = [(weight, available[name]) for name, weight in mix.items() if weight > 0]
+
+    port = free_port()
+    stop = start_app(args.server, port)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(wait_until_up(base_url))
+        if args.warmup > 0:
+            asyncio.run(run_users(base_url, mixed, args.users, args.warmup, seed=args.seed + 1))
+        result = asyncio.run(run_users(base_url, mixed, args.users, args.duration, seed=args.seed))
+    finally:
+        stop()
+        cleanup(mongo.get_db(), run_id, instalacion)  # el lifespan cerró el cliente compartido
+
+    result["meta"] = {
+        "date": datetime.utcnow().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "mongoMode": mongo.MONGO_MODE,
+        "server": args.server,
+        "users": args.users,
+        "duration": args.duration,
+        "apartments": args.apartments,
+        "mix": mix,
+        "seed": args.seed,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    output = args.output or f"load_test-{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"💾 {os.path.abspath(output)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# backend/benchmarks/loadgen.py
+#
+# Generador de carga HTTP mínimo (httpx + asyncio) compartido por los benchmarks.
+#   - run_load:  lista fija de requests con los mismos headers
+#   - run_users: usuarios virtuales que repiten scripts (login, dashboard, ...)
+
+import asyncio
+import random
+import time
+
+import httpx
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+def summarize(latencies, errors, elapsed):
+    """latencias en segundos -> resumen en ms."""
+    total = len(latencies) + errors
+    return {
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+async def run_load(base_url, requests, concurrency=50, headers=None, timeout=30.0):
+    """
+    Ejecuta `requests` (lista de (método, path, body|None)) con `concurrency`
+    workers y devuelve el resumen por path y el global.
+    """
+    queue = asyncio.Queue()
+    for req in requests:
+        queue.put_nowait(req)
+
+    per_path = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=timeout, limits=limits) as client:
+        async def worker():
+            while True:
+                try:
+                    method, path, body = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                stats = per_path.setdefault(path, {"lat": [], "errors": 0})
+                start = time.perf_counter()
+                try:
+                    r = await client.request(method, path, json=body)
+                    if r.status_code >= 400:
+                        stats["errors"] += 1
+                        continue
+                except httpx.HTTPError:
+                    stats["errors"] += 1
+                    continue
+                stats["lat"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return _report(per_path, elapsed)
+
+def _report(per_name, elapsed):
+    all_lat = [x for s in per_name.values() for x in s["lat"]]
+    all_err = sum(s["errors"] for s in per_name.values())
+    return {
+        "total": summarize(all_lat, all_err, elapsed),
+        "endpoints": {name: summarize(s["lat"], s["errors"], elapsed) for name, s in sorted(per_name.items())},
+    }
+
+class Session:
+    """Cliente de un usuario virtual: cada request se mide bajo un nombre de endpoint ("GET /visits/mine")."""
+
+    def __init__(self, client, per_name):
+        self.client = client
+        self.headers = {}
+        self._per_name = per_name
+
+    async def request(self, name, method, path, json=None, ok=(200,)):
+        """Respuesta, o None si falló (status fuera de `ok` o error de red)."""
+        stats = self._per_name.setdefault(name, {"lat": [], "errors": 0})
+        start = time.perf_counter()
+        try:
+            r = await self.client.request(method, path, json=json, headers=self.headers)
+        except httpx.HTTPError:
+            stats["errors"] += 1
+            return None
+        if r.status_code not in ok:
+            stats["errors"] += 1
+            return None
+        stats["lat"].append(time.perf_counter() - start)
+        return r
+
+async def run_users(base_url, scripts, concurrency=50, duration=30.0, timeout=30.0, seed=1):
+    """
+    `concurrency` usuarios virtuales durante `duration` segundos. Cada vuelta
+    un usuario elige un script de `scripts` (lista de (peso, async fn(session, rng)))
+    y lo ejecuta completo; la semilla hace reproducible la secuencia de cada uno.
+    """
+    per_name = {}
+    weights = [w for w, _ in scripts]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+
+        async def user(i):
+            rng = random.Random(seed * 100003 + i)
+            while time.perf_counter() < deadline:
+                _, script = rng.choices(scripts, weights)[0]
+                await script(Session(client, per_name), rng)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return _report(per_name, elapsed)
+
+async def wait_until_up(base_url, path="/health/live", timeout=20.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(path)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"El servidor en {base_url} no respondió en {timeout}s")
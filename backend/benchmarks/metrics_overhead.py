@@ -0,0 +1,64 @@
+# backend/benchmarks/metrics_overhead.py
+#
+# Costo de las métricas por request (no necesita MongoDB):
+#   - middleware: una app ASGI mínima con y sin MetricsMiddleware
+#   - listener:   started + succeeded de CommandMetrics por comando de Mongo
+#
+# Uso:
+#   python -m backend.benchmarks.metrics_overhead --requests 20000
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from backend.utils.metrics import CommandMetrics, MetricsMiddleware, reset_metrics
+
+ROUTE = SimpleNamespace(path="/visits/{id}")
+
+async def endpoint(scope, receive, send):
+    scope["route"] = ROUTE  # lo que hace el router de Starlette
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+async def receive():
+    return {"type": "http.request", "body": b""}
+
+async def send(message):
+    pass
+
+def asgi_us(app, calls):
+    async def loop():
+        start = time.perf_counter()
+        for _ in range(calls):
+            await app({"type": "http", "method": "GET", "path": "/visits/x"}, receive, send)
+        return (time.perf_counter() - start) / calls * 1e6
+    return asyncio.run(loop())
+
+def listener_us(calls):
+    listener = CommandMetrics()
+    started = SimpleNamespace(command_name="find", command={"find": "visits"}, connection_id=("localhost", 27017), request_id=1)
+    succeeded = SimpleNamespace(command_name="find", reply={"cursor": {"firstBatch": [{}] * 20}}, connection_id=("localhost", 27017), request_id=1, duration_micros=800)
+    start = time.perf_counter()
+    for _ in range(calls):
+        listener.started(started)
+        listener.succeeded(succeeded)
+    return (time.perf_counter() - start) / calls * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Overhead de MetricsMiddleware y CommandMetrics")
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    bare = asgi_us(endpoint, args.requests)
+    measured = asgi_us(MetricsMiddleware(endpoint), args.requests)
+    command = listener_us(args.requests)
+    reset_metrics()
+
+    print(f"⏱️ {args.requests} llamadas (µs por llamada)")
+    print(f"{'app ASGI sin métricas':<28}{bare:>8.2f}")
+    print(f"{'app ASGI con middleware':<28}{measured:>8.2f}  (+{measured - bare:.2f})")
+    print(f"{'comando de Mongo (listener)':<28}{command:>8.2f}")
+
+if __name__ == "__main__":
+    main()
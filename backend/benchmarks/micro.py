@@ -0,0 +1,239 @@
+# backend/benchmarks/micro.py
+#
+# Micro-benchmarks de lo que cuesta CPU en cada request (no necesita MongoDB):
+#   - serialize.<colección>:    serialize_* de cada router sobre un documento de Mongo
+#   - validate_in/out.<col>:    model_validate de los modelos *In / *Out
+#   - auth.*:                   decode_access_token con y sin caché, create_access_token
+#   - ids.*:                    ObjectId desde hex, is_valid, id_filter, cursores de paginación
+#   - passes.read:              verificación del pase firmado (POST /visits/verify)
+#
+# Cada caso se calibra para que una ronda dure --min-time segundos y se mide
+# en --rounds rondas con el GC apagado (como timeit); se reporta ns/op (mín,
+# mediana, desviación). Los resultados se guardan como baseline con nombre y
+# `compare` marca los casos cuya mediana empeoró más de --threshold %.
+#
+# Uso:
+#   python -m backend.benchmarks.micro list
+#   python -m backend.benchmarks.micro run --save main              (guarda baselines/main.json)
+#   python -m backend.benchmarks.micro compare main --threshold 10  (sale con 1 si hay regresiones)
+#   python -m backend.benchmarks.micro compare main --against rama  (dos baselines guardados)
+#   ... -k serialize  (solo los casos que contienen el texto)
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from itertools import cycle
+
+from bson import ObjectId
+
+from backend.benchmarks.json_encoding import SAMPLES
+from backend.utils import jwt_handler
+from backend.utils.pagination import decode_cursor, encode_cursor, id_filter
+from backend.utils.passes import read_pass, sign_pass
+
+BASELINES_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+DOCS = 64  # documentos distintos por caso (evita medir siempre el mismo objeto en caché)
+
+# --- Casos ----------------------------------------------------------------------
+
+def _cycled(values):
+    it = cycle(values)
+    return lambda: next(it)
+
+def _payload(doc, row):
+    # Cuerpo de un POST: lo que devuelve la API más los campos que no se exponen (password)
+    return {**{k: str(v) if isinstance(v, ObjectId) else v for k, v in doc.items()}, **row}
+
+def cases():
+    """{nombre: función sin argumentos que ejecuta una operación}."""
+    found = {}
+    for module, sample in SAMPLES.items():
+        spec = module.spec
+        docs = [sample(i) for i in range(DOCS)]
+        rows = [spec.serializer(d) for d in docs]
+        next_doc, next_row = _cycled(docs), _cycled(rows)
+        next_body = _cycled([_payload(d, r) for d, r in zip(docs, rows)])
+        serializer = spec.serializer
+        found[f"serialize.{spec.name}"] = lambda s=serializer, n=next_doc: s(n())
+        if spec.model_in is not None:
+            found[f"validate_in.{spec.name}"] = lambda m=spec.model_in, n=next_body: m.model_validate(n())
+        if spec.model_out is not None:
+            found[f"validate_out.{spec.name}"] = lambda m=spec.model_out, n=next_row: m.model_validate(n())
+
+    tokens = [jwt_handler.create_access_token({"user_id": str(ObjectId()), "role": "resident"}) for _ in range(DOCS)]
+    next_token = _cycled(tokens)
+
+    def decode_uncached():
+        size, jwt_handler.JWT_CACHE_SIZE = jwt_handler.JWT_CACHE_SIZE, 0
+        try:
+            jwt_handler.decode_access_token(next_token())
+        finally:
+            jwt_handler.JWT_CACHE_SIZE = size
+
+    found["auth.decode_cached"] = lambda: jwt_handler.decode_access_token(next_token())
+    found["auth.decode_uncached"] = decode_uncached
+    found["auth.create_token"] = lambda: jwt_handler.create_access_token({"user_id": "u1", "role": "resident"})
+
+    hexes = [str(ObjectId()) for _ in range(DOCS)]
+    next_hex = _cycled(hexes)
+    cursors = [encode_cursor(datetime(2025, 1, 1 + i % 28), ObjectId(h)) for i, h in enumerate(hexes)]
+    next_cursor = _cycled(cursors)
+    found["ids.objectid_from_hex"] = lambda: ObjectId(next_hex())
+    found["ids.is_valid"] = lambda: ObjectId.is_valid(next_hex())
+    found["ids.id_filter"] = lambda: id_filter(next_hex())
+    found["ids.decode_cursor"] = lambda: decode_cursor(next_cursor())
+
+    passes = [sign_pass(h, datetime(2030, 1, 1)) for h in hexes]
+    next_pass = _cycled(passes)
+    found["passes.read"] = lambda: read_pass(next_pass())
+    return found
+
+# --- Medición -------------------------------------------------------------------
+
+def _calibrate(fn, min_time, limit=1 << 20):
+    """Operaciones por ronda: se duplica hasta que una ronda dure min_time."""
+    number = 1
+    while number < limit:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time:
+            break
+        number *= 2
+    return number
+
+def measure(fn, rounds, min_time):
+    """ns por operación en cada ronda."""
+    number = _calibrate(fn, min_time)
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        results = []
+        for _ in range(rounds):
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                fn()
+            results.append((time.perf_counter_ns() - start) / number)
+    finally:
+        if enabled:
+            gc.enable()
+    return {
+        "min_ns": round(min(results), 1),
+        "median_ns": round(statistics.median(results), 1),
+        "stdev_ns": round(statistics.stdev(results), 1) if len(results) > 1 else 0.0,
+        "ops_per_round": number,
+    }
+
+def run(selected, rounds, min_time, verbose=True):
+    results = {}
+    for name, fn in selected.items():
+        fn()  # calentamiento (imports perezosos, cachés)
+        results[name] = measure(fn, rounds, min_time)
+        if verbose:
+            r = results[name]
+            print(f"{name:<34}{r['median_ns']:>12,.0f} ns  (mín {r['min_ns']:,.0f}, ±{r['stdev_ns']:,.0f})")
+    return results
+
+# --- Baselines ------------------------------------------------------------------
+
+def baseline_path(name):
+    return name if name.endswith(".json") else os.path.join(BASELINES_DIR, f"{name}.json")
+
+def save(name, results, args):
+    path = baseline_path(name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "meta": {
+                "date": datetime.utcnow().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "rounds": args.rounds,
+                "min_time": args.min_time,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"💾 {os.path.abspath(path)}")
+
+def load(name):
+    path = baseline_path(name)
+    if not os.path.exists(path):
+        sys.exit(f"❌ No existe el baseline {path} (créalo con: run --save {name})")
+    with open(path) as f:
+        return json.load(f)["results"]
+
+def compare(base, current, threshold, stat="median_ns"):
+    """Imprime la tabla y devuelve los casos que empeoraron más de `threshold` %."""
+    regressions = []
+    print(f"{'caso':<34}{'base ns':>12}{'actual ns':>12}{'cambio':>9}")
+    for name in sorted(set(base) | set(current)):
+        if name not in base or name not in current:
+            print(f"{name:<34}{'(solo en ' + ('actual' if name in current else 'base') + ')':>33}")
+            continue
+        before, after = base[name][stat], current[name][stat]
+        change = (after - before) / before * 100 if before else 0.0
+        flag = ""
+        if change > threshold:
+            flag = " ❌"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = " ✅"
+        print(f"{name:<34}{before:>12,.0f}{after:>12,.0f}{change:>+8.1f}%{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de serialización, validación y auth")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="lista los casos")
+    for name in ("run", "compare"):
+        p = sub.add_parser(name)
+        p.add_argument("-k", dest="filter", help="solo los casos que contienen este texto")
+        p.add_argument("--rounds", type=int, default=7)
+        p.add_argument("--min-time", type=float, default=0.02, help="segundos mínimos por ronda")
+        if name == "run":
+            p.add_argument("--save", metavar="NOMBRE", help="guardar como baseline (baselines/NOMBRE.json)")
+        else:
+            p.add_argument("baseline", help="nombre o ruta del baseline de referencia")
+            p.add_argument("--against", metavar="NOMBRE", help="comparar contra otro baseline en vez de medir ahora")
+            p.add_argument("--threshold", type=float, default=10.0, help="%% de empeoramiento tolerado")
+            p.add_argument("--stat", choices=["median", "min"], default="median", help="min es más estable en máquinas ruidosas")
+    args = parser.parse_args(argv)
+
+    available = cases()
+    if args.command == "list":
+        for name in available:
+            print(name)
+        return 0
+    selected = {n: fn for n, fn in available.items() if not args.filter or args.filter in n}
+    if not selected:
+        sys.exit(f"❌ Ningún caso contiene '{args.filter}'")
+
+    if args.command == "run":
+        results = run(selected, args.rounds, args.min_time)
+        if args.save:
+            save(args.save, results, args)
+        return 0
+
+    base = load(args.baseline)
+    if args.against:
+        current = load(args.against)
+    else:
+        current = run(selected, args.rounds, args.min_time, verbose=False)
+    if args.filter:
+        base = {n: r for n, r in base.items() if args.filter in n}
+        current = {n: r for n, r in current.items() if args.filter in n}
+    regressions = compare(base, current, args.threshold, f"{args.stat}_ns")
+    if regressions:
+        print(f"❌ {len(regressions)} casos más de {args.threshold:g}% más lentos: {', '.join(regressions)}")
+        return 1
+    print(f"✅ Sin regresiones mayores a {args.threshold:g}%")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# backend/benchmarks/write_roundtrips.py
+#
+# Cuenta los comandos que cada escritura manda a MongoDB (round trips) y su
+# latencia: patrón anterior (insert_one/update_one + find_one) contra los
+# handlers actuales (insert_returning / find_one_and_update).
+#
+# Uso:
+#   python -m backend.benchmarks.write_roundtrips --writes 200
+#
+# Escribe en la base de MONGO_URI; los pagos "Benchmark" se borran al final.
+
+import argparse
+import time
+from datetime import datetime
+
+from pymongo import monitoring
+
+from backend.benchmarks.loadgen import summarize
+
+class CommandCounter(monitoring.CommandListener):
+    WRITE_COMMANDS = {"insert", "update", "findAndModify", "find", "delete"}
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name in self.WRITE_COMMANDS:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+# El listener debe registrarse antes de que se cree el cliente compartido
+counter = CommandCounter()
+monitoring.register(counter)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from backend.db import mongo  # noqa: E402
+from backend.db.rollups import on_payment_changes  # noqa: E402
+from backend.main import app  # noqa: E402
+from backend.utils.jwt_handler import create_access_token  # noqa: E402
+
+PAYMENT = {"amount": 1200.0, "concept": "Benchmark", "dueDate": "2025-04-30T00:00:00", "status": "pending"}
+
+def measure(fn, writes):
+    latencies = []
+    before = counter.count
+    start = time.perf_counter()
+    for _ in range(writes):
+        t = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    stats = summarize(latencies, 0, elapsed)
+    stats["commands_per_write"] = round((counter.count - before) / writes, 2)
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Round trips por escritura")
+    parser.add_argument("--writes", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    db = mongo.get_db()
+    payments = db["payments"]
+    created = []
+
+    def legacy_create():
+        doc = dict(PAYMENT, dueDate=datetime(2025, 4, 30), createdAt=datetime.utcnow(), updatedAt=datetime.utcnow())
+        result = payments.insert_one(doc)
+        created.append(payments.find_one({"_id": result.inserted_id})["_id"])
+
+    def legacy_update():
+        _id = created[-1]
+        payments.update_one({"_id": _id}, {"$set": {"status": "paid", "updatedAt": datetime.utcnow()}})
+        payments.find_one({"_id": _id})
+
+    headers = {"Authorization": f"Bearer {create_access_token({'user_id': 'bench', 'role': 'admin'})}"}
+    with TestClient(app) as client:
+        def api_create():
+            r = client.post("/payments/", json=PAYMENT, headers=headers)
+            r.raise_for_status()
+
+        results = {
+            "legacy_create": measure(legacy_create, args.writes),
+            "legacy_update": measure(legacy_update, args.writes),
+            "create": measure(api_create, args.writes),
+        }
+
+        target = created[-1]
+
+        def api_update():
+            r = client.patch(f"/payments/{target}", json=dict(PAYMENT, status="paid"), headers=headers)
+            r.raise_for_status()
+
+        results["update"] = measure(api_update, args.writes)
+
+    # Los pagos creados por la API también sumaron a ledger_rollups: se revierten antes de borrar
+    on_payment_changes(db, [(doc, None) for doc in payments.find({"concept": "Benchmark"})])
+    payments.delete_many({"concept": "Benchmark"})
+
+    for name, stats in results.items():
+        print(f"{name:>14}: {stats['commands_per_write']} comandos/escritura  p50={stats['p50_ms']}ms  p99={stats['p99_ms']}ms")
+
+if __name__ == "__main__":
+    main()
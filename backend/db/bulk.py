@@ -0,0 +1,231 @@
+# backend/db/bulk.py
+#
+# Escrituras en lote: insert_many / bulk_write sin orden (ordered=False), por
+# lotes de BULK_BATCH_SIZE. Un documento inválido o rechazado por Mongo no
+# detiene al resto: cada elemento recibe su propio resultado (BulkItem) con el
+# índice que tenía en la solicitud.
+
+import os
+from typing import List, Optional
+
+from bson import ObjectId
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from backend.db.crud import _stamp_insert, _stamp_update
+
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", 1000))
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 10000))
+
+NOT_FOUND = "No encontrado"
+
+class BulkItem(BaseModel):
+    index: int
+    ok: bool
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    ok: int
+    failed: int
+    items: List[BulkItem]
+
+class BulkUpdate(BaseModel):
+    id: str
+    data: dict
+
+class BulkIds(BaseModel):
+    ids: List[str]
+
+def check_bulk_size(items):
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Máximo {BULK_MAX_ITEMS} elementos por solicitud")
+
+def validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc']) or 'body'}: {err['msg']}" for err in e.errors())
+
+def bulk_result(results: dict, total: int) -> dict:
+    """`results` es {índice: BulkItem}; los que falten se reportan como no procesados."""
+    items = [results.get(i) or BulkItem(index=i, ok=False, error="No procesado") for i in range(total)]
+    ok = sum(1 for item in items if item.ok)
+    return {"ok": ok, "failed": total - ok, "items": items}
+
+def validate_items(raw_items, build):
+    """
+    Aplica `build(raw)` a cada elemento. Devuelve ([(índice, valor)], {índice: BulkItem de error}).
+    `build` puede lanzar ValidationError (modelo) o ValueError/InvalidId (ids mal formados).
+    """
+    valid, errors = [], {}
+    for index, raw in enumerate(raw_items):
+        try:
+            valid.append((index, build(raw)))
+        except ValidationError as e:
+            errors[index] = BulkItem(index=index, ok=False, error=validation_message(e))
+        except Exception as e:
+            errors[index] = BulkItem(index=index, ok=False, error=str(e))
+    return valid, errors
+
+def _batches(items, batch_size):
+    for i in range(0, len(items), batch_size):
+        yield items[i:i + batch_size]
+
+def _write_errors(e: BulkWriteError) -> dict:
+    # índice dentro del lote -> mensaje
+    return {err["index"]: err.get("errmsg", "Error de escritura") for err in e.details.get("writeErrors", [])}
+
+def _object_ids(ids):
+    return [ObjectId(i) for i in ids]
+
+# --- Inserción ----------------------------------------------------------------
+
+def _insert_results(batch, failed, results):
+    for position, (index, doc) in enumerate(batch):
+        if position in failed:
+            results[index] = BulkItem(index=index, ok=False, error=failed[position])
+        else:
+            results[index] = BulkItem(index=index, ok=True, id=str(doc["_id"]))
+
+def insert_docs(collection, items, batch_size: int = BULK_BATCH_SIZE, timestamps: bool = True):
+    """
+    Inserta [(índice, doc)] con insert_many(ordered=False). Devuelve
+    ({índice: BulkItem}, [docs insertados]).
+    """
+    results, inserted = {}, []
+    for batch in _batches(items, batch_size):
+        docs = [_stamp_insert(doc, timestamps) for _, doc in batch]
+        try:
+            collection.insert_many(docs, ordered=False)
+            failed = {}
+        except BulkWriteError as e:
+            failed = _write_errors(e)
+        _insert_results(batch, failed, results)
+        inserted.extend(doc for position, (_, doc) in enumerate(batch) if position not in failed)
+    return results, inserted
+
+async def ainsert_docs(collection, items, batch_size: int = BULK_BATCH_SIZE, timestamps: bool = True):
+    results, inserted = {}, []
+    for batch in _batches(items, batch_size):
+        docs = [_stamp_insert(doc, timestamps) for _, doc in batch]
+        try:
+            await collection.insert_many(docs, ordered=False)
+            failed = {}
+        except BulkWriteError as e:
+            failed = _write_errors(e)
+        _insert_results(batch, failed, results)
+        inserted.extend(doc for position, (_, doc) in enumerate(batch) if position not in failed)
+    return results, inserted
+
+# --- Actualización ------------------------------------------------------------
+# Se leen primero los documentos del lote (una consulta $in) para reportar los
+# que no existen y, si hay hooks, tener su versión anterior. El "después" se
+# arma localmente como en update_with_before().
+
+def _update_plan(batch, existing, timestamps):
+    ops, planned, results = [], [], {}
+    for index, (id, data) in batch:
+        before = existing.get(id)
+        if before is None:
+            results[index] = BulkItem(index=index, ok=False, id=id, error=NOT_FOUND)
+            continue
+        update = _stamp_update(dict(data), timestamps)
+        ops.append(UpdateOne({"_id": before["_id"]}, update))
+        after = existing[id] = {**before, **update["$set"]}  # un id repetido parte del estado ya actualizado
+        planned.append((index, id, before, after))
+    return ops, planned, results
+
+def _update_results(planned, failed, results, changes):
+    for position, (index, id, before, after) in enumerate(planned):
+        if position in failed:
+            results[index] = BulkItem(index=index, ok=False, id=id, error=failed[position])
+        else:
+            results[index] = BulkItem(index=index, ok=True, id=id)
+            changes.append((before, after))
+
+def update_docs(collection, items, batch_size: int = BULK_BATCH_SIZE, timestamps: bool = True, with_before: bool = False):
+    """
+    Aplica [(índice, (id, $set))] con bulk_write(ordered=False). Devuelve
+    ({índice: BulkItem}, [(antes, después)]); los pares solo traen el documento
+    completo si with_before=True.
+    """
+    results, changes = {}, []
+    projection = None if with_before else {"_id": 1}
+    for batch in _batches(items, batch_size):
+        ids = [id for _, (id, _) in batch]
+        existing = {str(d["_id"]): d for d in collection.find({"_id": {"$in": _object_ids(ids)}}, projection)}
+        ops, planned, batch_results = _update_plan(batch, existing, timestamps)
+        results.update(batch_results)
+        failed = {}
+        if ops:
+            try:
+                collection.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                failed = _write_errors(e)
+        _update_results(planned, failed, results, changes)
+    return results, changes
+
+async def aupdate_docs(collection, items, batch_size: int = BULK_BATCH_SIZE, timestamps: bool = True, with_before: bool = False):
+    results, changes = {}, []
+    projection = None if with_before else {"_id": 1}
+    for batch in _batches(items, batch_size):
+        ids = [id for _, (id, _) in batch]
+        existing = {str(d["_id"]): d async for d in collection.find({"_id": {"$in": _object_ids(ids)}}, projection)}
+        ops, planned, batch_results = _update_plan(batch, existing, timestamps)
+        results.update(batch_results)
+        failed = {}
+        if ops:
+            try:
+                await collection.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                failed = _write_errors(e)
+        _update_results(planned, failed, results, changes)
+    return results, changes
+
+# --- Borrado ------------------------------------------------------------------
+
+def _delete_plan(batch, existing):
+    ops, planned, results = [], [], {}
+    for index, id in batch:
+        before = existing.pop(id, None)  # pop: un id repetido solo se borra una vez
+        if before is None:
+            results[index] = BulkItem(index=index, ok=False, id=id, error=NOT_FOUND)
+            continue
+        ops.append(DeleteOne({"_id": before["_id"]}))
+        planned.append((index, id, before, None))
+    return ops, planned, results
+
+def delete_docs(collection, items, batch_size: int = BULK_BATCH_SIZE, with_before: bool = False):
+    """Borra [(índice, id)] con bulk_write(ordered=False). Devuelve ({índice: BulkItem}, [(antes, None)])."""
+    results, changes = {}, []
+    projection = None if with_before else {"_id": 1}
+    for batch in _batches(items, batch_size):
+        ids = [id for _, id in batch]
+        existing = {str(d["_id"]): d for d in collection.find({"_id": {"$in": _object_ids(ids)}}, projection)}
+        ops, planned, batch_results = _delete_plan(batch, existing)
+        results.update(batch_results)
+        failed = {}
+        if ops:
+            try:
+                collection.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                failed = _write_errors(e)
+        _update_results(planned, failed, results, changes)
+    return results, changes
+
+async def adelete_docs(collection, items, batch_size: int = BULK_BATCH_SIZE, with_before: bool = False):
+    results, changes = {}, []
+    projection = None if with_before else {"_id": 1}
+    for batch in _batches(items, batch_size):
+        ids = [id for _, id in batch]
+        existing = {str(d["_id"]): d async for d in collection.find({"_id": {"$in": _object_ids(ids)}}, projection)}
+        ops, planned, batch_results = _delete_plan(batch, existing)
+        results.update(batch_results)
+        failed = {}
+        if ops:
+            try:
+                await collection.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                failed = _write_errors(e)
+        _update_results(planned, failed, results, changes)
+    return results, changes
@@ -0,0 +1,253 @@
+# backend/db/changes.py
+#
+# Cambios en vivo: un solo hilo por proceso observa MongoDB y reparte cada
+# inserción/actualización/borrado a los suscriptores (SSE/WebSocket en
+# backend/routes/live.py), que reciben el documento ya serializado en vez de
+# volver a descargar el listado.
+#
+# Fuentes (LIVE_SOURCE):
+#   - auto (por defecto): change streams; si el servidor no los soporta
+#     (mongod standalone, sin replica set) se pasa a sondeo
+#   - changestream / poll: forzar una u otra
+#   - off: canal deshabilitado
+#
+# El sondeo busca (updatedAt, _id) > último visto cada LIVE_POLL_INTERVAL segundos,
+# solo mientras haya suscriptores. No ve borrados ni escrituras que no
+# actualicen updatedAt: es el modo de desarrollo, no el de producción.
+#
+# Cada suscriptor tiene una cola acotada (LIVE_QUEUE_SIZE). Si un cliente lento
+# la llena se descartan sus eventos pendientes y recibe un "resync" (recargar
+# el listado una vez) en lugar de frenar al resto.
+
+import asyncio
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, NamedTuple, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from backend.db.crud import now_ms
+from backend.db.mongo import get_db
+from backend.utils.logs import get_logger
+from backend.utils.responses import dumps
+
+LIVE_SOURCE = os.getenv("LIVE_SOURCE", "auto").lower()
+LIVE_POLL_INTERVAL = float(os.getenv("LIVE_POLL_INTERVAL", 1.0))
+LIVE_POLL_BATCH = int(os.getenv("LIVE_POLL_BATCH", 500))
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", 256))
+LIVE_RETRY_SECONDS = 5.0
+LIVE_AWAIT_MS = 1000  # getMore del change stream: cada cuánto se revisa si hay que parar
+
+OPERATIONS = ("insert", "update", "replace", "delete")
+CHANGESTREAM_UNSUPPORTED = 40573  # "The $changeStream stage is only supported on replica sets"
+
+logger = get_logger("live")
+
+class Watched(NamedTuple):
+    serializer: Callable[[dict], dict]
+    owner_field: Optional[str]  # "apartmentId" / "userId"; None = datos de todo el residencial
+
+class Subscription:
+    """Cola de un cliente y su filtro: colecciones y, opcionalmente, dueños por campo."""
+
+    def __init__(self, loop, collections, owners: Optional[Dict[str, set]] = None):
+        self.loop = loop
+        self.collections = frozenset(collections)
+        self.owners = owners or {}
+        self.queue = asyncio.Queue(LIVE_QUEUE_SIZE)
+        self.dropped = 0
+
+    def matches(self, collection: str, field: Optional[str], owner: Optional[str], op: str) -> bool:
+        if collection not in self.collections:
+            return False
+        if not field or not self.owners:
+            return True
+        if owner is None:
+            # Un borrado no trae el documento (solo viaja el _id): se avisa a todos.
+            # Una inserción/actualización sin dueño solo la ven los suscriptores sin filtro
+            return op == "delete"
+        # Con filtro de dueños, un campo sin dueños permitidos no entrega nada
+        return owner in self.owners.get(field, ())
+
+    def offer(self, kind: str, data: bytes):
+        # Corre en el event loop del cliente
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.dropped += 1
+            kind, data = "resync", dumps({"type": "resync"})
+        self.queue.put_nowait((kind, data))
+
+class ChangeHub:
+    def __init__(self):
+        self._watched: Dict[str, Watched] = {}
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._resume_token = None
+        self.source = None
+        self.events = 0
+
+    @property
+    def enabled(self) -> bool:
+        return LIVE_SOURCE != "off"
+
+    @property
+    def collections(self):
+        return tuple(self._watched)
+
+    def watch(self, name: str, serializer: Callable[[dict], dict], owner_field: Optional[str] = None):
+        """Publica los cambios de la colección `name` (registrar antes de la primera suscripción)."""
+        self._watched[name] = Watched(serializer, owner_field)
+
+    # --- Suscriptores (event loop) -------------------------------------------
+
+    def subscribe(self, collections, owners: Optional[Dict[str, set]] = None) -> Subscription:
+        sub = Subscription(asyncio.get_running_loop(), collections, owners)
+        with self._lock:
+            self._subscribers.add(sub)
+            if self._thread is None or not self._thread.is_alive():
+                self._start()
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def status(self) -> dict:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            "source": self.source,
+            "collections": list(self._watched),
+            "subscribers": len(subscribers),
+            "events": self.events,
+            "dropped": sum(sub.dropped for sub in subscribers),
+        }
+
+    def _start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="live-changes", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo (apagado de la app)."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=LIVE_AWAIT_MS / 1000 + 1)
+        self._thread = None
+        self.source = None
+
+    # --- Publicación (hilo) ---------------------------------------------------
+
+    def publish(self, collection: str, op: str, doc_id, doc: Optional[dict]):
+        watched = self._watched[collection]
+        field = watched.owner_field
+        owner = str(doc[field]) if doc is not None and doc.get(field) else None
+        with self._lock:
+            targets = [sub for sub in self._subscribers if sub.matches(collection, field, owner, op)]
+        self.events += 1
+        if not targets:
+            return
+        # Se serializa una sola vez por evento, no por suscriptor
+        data = dumps({
+            "type": "change",
+            "collection": collection,
+            "op": op,
+            "id": str(doc_id),
+            "doc": watched.serializer(doc) if doc is not None else None,
+        })
+        by_loop = defaultdict(list)
+        for sub in targets:
+            by_loop[sub.loop].append(sub)
+        for loop, subs in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver, subs, data)
+            except RuntimeError:
+                pass  # loop cerrado: el suscriptor se va con él
+
+    def _run(self):
+        source = LIVE_SOURCE
+        while not self._stop.is_set():
+            try:
+                if source == "poll":
+                    self._poll(get_db())
+                else:
+                    self._stream(get_db())
+            except (OperationFailure, NotImplementedError) as e:
+                if source == "auto" and _unsupported(e):
+                    logger.warning("event=live_fallback source=poll reason=%s", e)
+                    source = "poll"
+                    continue
+                logger.error("event=live_error source=%s error=%s", source, e)
+                self._stop.wait(LIVE_RETRY_SECONDS)
+            except PyMongoError as e:
+                # Red o failover: se reintenta; el change stream retoma desde el último resume token
+                logger.warning("event=live_retry source=%s error=%s", source, e)
+                self._stop.wait(LIVE_RETRY_SECONDS)
+
+    def _stream(self, db):
+        pipeline = [{"$match": {"ns.coll": {"$in": list(self._watched)}, "operationType": {"$in": list(OPERATIONS)}}}]
+        with db.watch(pipeline, full_document="updateLookup", resume_after=self._resume_token, max_await_time_ms=LIVE_AWAIT_MS) as stream:
+            self.source = "changestream"
+            logger.info("event=live_started source=changestream collections=%s", ",".join(self._watched))
+            while not self._stop.is_set() and stream.alive:
+                change = stream.try_next()
+                self._resume_token = stream.resume_token
+                if change is not None:
+                    self._publish_change(change)
+
+    def _publish_change(self, change: dict):
+        op = change["operationType"]
+        doc = change.get("fullDocument")
+        if op != "delete" and doc is None:
+            return  # borrado antes del lookup: llegará su propio evento delete
+        self.publish(change["ns"]["coll"], "update" if op == "replace" else op, change["documentKey"]["_id"], doc)
+
+    def _poll(self, db):
+        self.source = "poll"
+        logger.info("event=live_started source=poll interval=%s collections=%s", LIVE_POLL_INTERVAL, ",".join(self._watched))
+        marks = _marks(self._watched)
+        while not self._stop.wait(LIVE_POLL_INTERVAL):
+            with self._lock:
+                idle = not self._subscribers
+            if idle:
+                marks = _marks(self._watched)  # al volver un cliente no se reenvía lo ocurrido sin nadie escuchando
+                continue
+            for name in self._watched:
+                marks[name] = self._poll_collection(db, name, *marks[name])
+
+    def _poll_collection(self, db, name: str, since: datetime, last_id):
+        # Índice (updatedAt, _id) en cada colección: backend/db/indexes.py LIVE_POLLED
+        # Cursor (updatedAt, _id): más de LIVE_POLL_BATCH documentos con el mismo updatedAt
+        # (inserciones masivas, seeder) se recorren por _id en vez de releer siempre los mismos
+        if last_id is None:
+            query = {"updatedAt": {"$gte": since}}
+        else:
+            query = {"$or": [{"updatedAt": {"$gt": since}}, {"updatedAt": since, "_id": {"$gt": last_id}}]}
+        docs = db[name].find(query).sort([("updatedAt", 1), ("_id", 1)]).limit(LIVE_POLL_BATCH)
+        for doc in docs:
+            updated = doc.get("updatedAt")
+            since, last_id = updated, doc["_id"]
+            self.publish(name, "insert" if doc.get("createdAt") == updated else "update", doc["_id"], doc)
+        return since, last_id
+
+def _deliver(subs, data: bytes):
+    for sub in subs:
+        sub.offer("change", data)
+
+def _unsupported(e: Exception) -> bool:
+    if isinstance(e, NotImplementedError):
+        return True
+    return e.code == CHANGESTREAM_UNSUPPORTED or "replica set" in str(e)
+
+def _marks(watched):
+    # Mongo guarda milisegundos: una marca con microsegundos saltaría documentos del mismo ms
+    now = now_ms()
+    return {name: (now, None) for name in watched}
+
+hub = ChangeHub()
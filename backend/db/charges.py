@@ -0,0 +1,81 @@
+# backend/db/charges.py
+#
+# Cargo mensual de mantenimiento: un pago "pending" por apartamento para el mes
+# indicado, insertado en lote (insert_docs) y con un solo bulk_write a
+# ledger_rollups. Es idempotente: los apartamentos que ya tienen un pago con
+# el mismo concepto en ese mes se omiten, así que volver a correrlo solo
+# completa lo que falte. Como escribe fuera de las rutas, incrementa la
+# versión de payments (ETag) por su cuenta.
+#
+# Uso:
+#   python -m backend.db.charges 2025-07 --amount 1200
+#   python -m backend.db.charges 2025-07 --amount 1200 --concept "Mantenimiento mensual" --due-day 10
+
+import argparse
+import sys
+from datetime import datetime
+
+from fastapi import HTTPException
+
+from backend.db.mongo import get_db
+from backend.db.bulk import BULK_BATCH_SIZE, insert_docs, ainsert_docs
+from backend.db.rollups import on_payment_changes, aon_payment_changes
+from backend.db.versions import bump_version, abump_version
+
+DEFAULT_CONCEPT = "Mantenimiento mensual"
+DEFAULT_DUE_DAY = 10
+
+def month_bounds(month: str):
+    try:
+        start = datetime.strptime(month, "%Y-%m")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="El mes debe tener formato YYYY-MM")
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+def _existing_query(concept: str, start: datetime, end: datetime):
+    return {"concept": concept, "dueDate": {"$gte": start, "$lt": end}}
+
+def _charges(apartment_ids, billed, amount, concept, due_date):
+    return [
+        (i, {"apartmentId": apartment_id, "amount": amount, "concept": concept, "dueDate": due_date, "status": "pending", "paymentDate": None})
+        for i, apartment_id in enumerate(a for a in apartment_ids if str(a) not in billed)
+    ]
+
+def monthly_charges(db, month: str, amount: float, concept: str = DEFAULT_CONCEPT, due_day: int = DEFAULT_DUE_DAY, batch_size: int = BULK_BATCH_SIZE) -> dict:
+    """Genera los pagos del mes que falten. Devuelve {"month", "created", "skipped", "failed"}."""
+    start, end = month_bounds(month)
+    apartment_ids = [a["_id"] for a in db["apartments"].find({}, {"_id": 1})]
+    billed = {str(p["apartmentId"]) for p in db["payments"].find(_existing_query(concept, start, end), {"apartmentId": 1})}
+    items = _charges(apartment_ids, billed, amount, concept, start.replace(day=due_day))
+    results, inserted = insert_docs(db["payments"], items, batch_size)
+    if inserted:
+        bump_version(db, "payments")
+    on_payment_changes(db, [(None, doc) for doc in inserted])
+    return {"month": month, "created": len(inserted), "skipped": len(apartment_ids) - len(items), "failed": len(results) - len(inserted)}
+
+async def amonthly_charges(db, month: str, amount: float, concept: str = DEFAULT_CONCEPT, due_day: int = DEFAULT_DUE_DAY, batch_size: int = BULK_BATCH_SIZE) -> dict:
+    start, end = month_bounds(month)
+    apartment_ids = [a["_id"] async for a in db["apartments"].find({}, {"_id": 1})]
+    billed = {str(p["apartmentId"]) async for p in db["payments"].find(_existing_query(concept, start, end), {"apartmentId": 1})}
+    items = _charges(apartment_ids, billed, amount, concept, start.replace(day=due_day))
+    results, inserted = await ainsert_docs(db["payments"], items, batch_size)
+    if inserted:
+        await abump_version(db, "payments")
+    await aon_payment_changes(db, [(None, doc) for doc in inserted])
+    return {"month": month, "created": len(inserted), "skipped": len(apartment_ids) - len(items), "failed": len(results) - len(inserted)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera el cargo mensual de mantenimiento para todos los apartamentos")
+    parser.add_argument("month", help="Mes a facturar (YYYY-MM)")
+    parser.add_argument("--amount", type=float, required=True)
+    parser.add_argument("--concept", default=DEFAULT_CONCEPT)
+    parser.add_argument("--due-day", type=int, default=DEFAULT_DUE_DAY, choices=range(1, 29), metavar="1-28")
+    args = parser.parse_args(argv)
+
+    result = monthly_charges(get_db(), args.month, args.amount, args.concept, args.due_day)
+    print(f"✅ {args.month}: {result['created']} cargos creados, {result['skipped']} ya existían, {result['failed']} fallidos.")
+    return 1 if result["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
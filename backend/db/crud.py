@@ -0,0 +1,68 @@
+# backend/db/crud.py
+#
+# Escrituras de un solo round trip: los inserts devuelven el documento
+# construido localmente y los updates usan find_one_and_update(AFTER).
+
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+def now_ms() -> datetime:
+    """utcnow() truncado a milisegundos, la precisión con que Mongo guarda fechas:
+    lo que devuelve un POST/PATCH es igual a lo que luego devuelve un GET."""
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+def _stamp_insert(doc: dict, timestamps: bool):
+    if timestamps:
+        now = now_ms()
+        doc.setdefault("createdAt", now)
+        doc.setdefault("updatedAt", now)
+    return doc
+
+def _stamp_update(update_data: dict, timestamps: bool):
+    if timestamps:
+        update_data["updatedAt"] = now_ms()
+    return {"$set": update_data}
+
+def insert_returning(collection, doc: dict, timestamps: bool = True) -> dict:
+    """Inserta `doc` y lo devuelve con su _id (insert_one lo agrega al dict)."""
+    collection.insert_one(_stamp_insert(doc, timestamps))
+    return doc
+
+def update_returning(collection, id: str, update_data: dict, timestamps: bool = True):
+    """Aplica $set y devuelve el documento ya actualizado, o None si no existe."""
+    return collection.find_one_and_update(
+        {"_id": ObjectId(id)},
+        _stamp_update(update_data, timestamps),
+        return_document=ReturnDocument.AFTER,
+    )
+
+def update_with_before(collection, id: str, update_data: dict, timestamps: bool = True):
+    """
+    Como update_returning pero devuelve (antes, después). El "después" se arma
+    localmente: el $set es atómico, así que equivale a lo que quedó guardado.
+    """
+    update = _stamp_update(update_data, timestamps)
+    before = collection.find_one_and_update({"_id": ObjectId(id)}, update, return_document=ReturnDocument.BEFORE)
+    if before is None:
+        return None, None
+    return before, {**before, **update["$set"]}
+
+async def ainsert_returning(collection, doc: dict, timestamps: bool = True) -> dict:
+    await collection.insert_one(_stamp_insert(doc, timestamps))
+    return doc
+
+async def aupdate_returning(collection, id: str, update_data: dict, timestamps: bool = True):
+    return await collection.find_one_and_update(
+        {"_id": ObjectId(id)},
+        _stamp_update(update_data, timestamps),
+        return_document=ReturnDocument.AFTER,
+    )
+
+async def aupdate_with_before(collection, id: str, update_data: dict, timestamps: bool = True):
+    update = _stamp_update(update_data, timestamps)
+    before = await collection.find_one_and_update({"_id": ObjectId(id)}, update, return_document=ReturnDocument.BEFORE)
+    if before is None:
+        return None, None
+    return before, {**before, **update["$set"]}
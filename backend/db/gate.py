@@ -0,0 +1,220 @@
+# backend/db/gate.py
+#
+# Verificación de pases en la puerta (POST /visits/verify) sin ir a Mongo en
+# el camino normal:
+#   1. la firma HMAC del pase y su vencimiento se validan en memoria
+#      (backend/utils/passes.py)
+#   2. la visita se busca en un hot set por proceso con los pases vigentes que
+#      empiezan dentro de GATE_WINDOW_HOURS, precargado al primer escaneo y
+#      refrescado cada GATE_REFRESH_SECONDS (solo updatedAt recientes)
+#   3. la entrada/salida se marca en memoria y se escribe en lote (write-behind)
+#      cada GATE_FLUSH_MS, con un bulk_write por lote
+#
+# Un pase con firma válida que no está en el hot set (creado hace segundos en
+# otro worker) se lee por _id una vez y se agrega; las firmas inválidas nunca
+# llegan a Mongo. Si el proceso muere se pierden las marcas aún no escritas
+# (como mucho GATE_FLUSH_MS); al apagar la app se vacía la cola.
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from backend.db.crud import now_ms
+from backend.db.mongo import get_db
+from backend.db.versions import bump_version
+from backend.utils.logs import get_logger
+from backend.utils.passes import read_pass
+
+GATE_WINDOW_HOURS = int(os.getenv("GATE_WINDOW_HOURS", 24))
+GATE_REFRESH_SECONDS = float(os.getenv("GATE_REFRESH_SECONDS", 5))
+GATE_FLUSH_MS = int(os.getenv("GATE_FLUSH_MS", 200))
+GATE_BATCH_SIZE = int(os.getenv("GATE_BATCH_SIZE", 500))
+FULL_RELOAD_SECONDS = 3600  # la ventana avanza: recarga completa cada hora
+
+PROJECTION = {"apartmentId": 1, "visitorName": 1, "entryTime": 1, "exitTime": 1, "passExpiresAt": 1, "status": 1}
+
+INSIDE = "inside"
+LEFT = "left"
+
+logger = get_logger("gate")
+
+def _result(valid: bool, message: str, action: Optional[str] = None, visit: Optional[dict] = None) -> dict:
+    return {"valid": valid, "message": message, "action": action, "visit": visit}
+
+class Gate:
+    def __init__(self):
+        self._passes = {}   # _id hex -> documento (PROJECTION)
+        self._pending = {}  # _id hex -> $set pendiente (entrada y salida del mismo pase se combinan)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._mark = None   # desde dónde pedir updatedAt en el próximo refresco
+        self._loaded_at = 0.0
+        self.stats = {"hits": 0, "misses": 0, "invalid": 0, "written": 0, "write_errors": 0}
+
+    # --- Verificación ---------------------------------------------------------
+
+    def lookup(self, token: str):
+        """(resultado final, None, None) o (None, _id, documento del hot set o None si hay que leerlo)."""
+        self.start()
+        parsed = read_pass(token or "")
+        if parsed is None:
+            self.stats["invalid"] += 1
+            return _result(False, "Pase inválido"), None, None
+        visit_id, expires_at = parsed
+        if expires_at < datetime.utcnow():
+            self.stats["invalid"] += 1
+            return _result(False, "Pase vencido"), None, None
+        doc = self._passes.get(visit_id)
+        self.stats["hits" if doc is not None else "misses"] += 1
+        return None, visit_id, doc
+
+    def find(self, db, visit_id: str) -> Optional[dict]:
+        return db["visits"].find_one({"_id": ObjectId(visit_id)}, PROJECTION)
+
+    async def afind(self, db, visit_id: str) -> Optional[dict]:
+        return await db["visits"].find_one({"_id": ObjectId(visit_id)}, PROJECTION)
+
+    def record(self, visit_id: str, doc: Optional[dict], action: Optional[str]) -> dict:
+        """Marca entrada/salida (action None: alterna según el estado) y la encola para escribirla."""
+        if doc is None:
+            return _result(False, "Visita no encontrada")
+        now = datetime.utcnow()
+        with self._lock:
+            doc = self._passes.setdefault(visit_id, doc)
+            inside = doc.get("status") == INSIDE
+            if doc.get("status") == LEFT:
+                # Un pase es de una sola visita: volver a entrar pisaría la entrada original
+                return _result(False, "La visita ya registró su salida", action, dict(doc))
+            action = action or ("exit" if inside else "entry")
+            if action == "entry" and inside:
+                return _result(False, "La visita ya registró su entrada", action, dict(doc))
+            if action == "exit" and not inside:
+                return _result(False, "La visita no ha registrado su entrada", action, dict(doc))
+            update = {"entryTime": now, "status": INSIDE} if action == "entry" else {"exitTime": now, "status": LEFT}
+            doc.update(update)
+            self._pending[visit_id] = {**self._pending.get(visit_id, {}), **update}
+            batch_full = len(self._pending) >= GATE_BATCH_SIZE
+            visit = dict(doc)
+        if batch_full:
+            self._wake.set()
+        return _result(True, "QR válido", action, visit)
+
+    def verify(self, db, token: str, action: Optional[str] = None) -> dict:
+        """Valida y registra un escaneo. Solo consulta Mongo si la firma es válida y el pase no está en el hot set."""
+        result, visit_id, doc = self.lookup(token)
+        if result is not None:
+            return result
+        return self.record(visit_id, doc if doc is not None else self.find(db, visit_id), action)
+
+    async def averify(self, db, token: str, action: Optional[str] = None) -> dict:
+        result, visit_id, doc = self.lookup(token)
+        if result is not None:
+            return result
+        return self.record(visit_id, doc if doc is not None else await self.afind(db, visit_id), action)
+
+    # --- Hot set ----------------------------------------------------------------
+
+    def refresh(self, db, full: bool = False):
+        """Precarga (full) o trae solo los cambios desde el último refresco."""
+        now = datetime.utcnow()
+        if full or self._mark is None:
+            query = {"passExpiresAt": {"$gte": now}, "entryTime": {"$lt": now + timedelta(hours=GATE_WINDOW_HOURS)}}
+        else:
+            query = {"updatedAt": {"$gte": self._mark}}
+        docs = list(db["visits"].find(query, PROJECTION))
+        with self._lock:
+            if full or self._mark is None:
+                self._passes = {}
+                self._loaded_at = time.monotonic()
+            for doc in docs:
+                visit_id = str(doc["_id"])
+                # Lo marcado en este proceso y aún no escrito gana sobre lo leído
+                doc.update(self._pending.get(visit_id, {}))
+                self._passes[visit_id] = doc
+            for visit_id in [i for i, d in self._passes.items() if isinstance(d.get("passExpiresAt"), datetime) and d["passExpiresAt"] < now]:
+                del self._passes[visit_id]
+        # 1 s de solape: reaplicar un documento es idempotente, perder uno no
+        self._mark = now - timedelta(seconds=1)
+
+    # --- Write-behind -----------------------------------------------------------
+
+    def flush(self, db):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        now = now_ms()
+        ops = [UpdateOne({"_id": ObjectId(visit_id)}, {"$set": {**fields, "updatedAt": now}}) for visit_id, fields in batch.items()]
+        try:
+            db["visits"].bulk_write(ops, ordered=False)
+        except Exception as e:
+            # Cualquier error (no solo de red): el lote ya salió de _pending y se perdería
+            self.stats["write_errors"] += 1
+            logger.error("event=gate_flush_failed visits=%s error=%s", len(ops), e)
+            self._requeue(batch)
+            return
+        self.stats["written"] += len(ops)
+        try:
+            bump_version(db, "visits")  # ETag de GET /visits
+        except PyMongoError as e:
+            logger.warning("event=gate_version_failed error=%s", e)
+
+    def _requeue(self, batch: dict):
+        with self._lock:
+            for visit_id, fields in batch.items():
+                self._pending[visit_id] = {**fields, **self._pending.get(visit_id, {})}
+
+    # --- Hilo -------------------------------------------------------------------
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="gate", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo después de escribir lo pendiente (apagado de la app)."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        thread.join(timeout=10)
+        self._thread = None
+
+    def status(self) -> dict:
+        return {"passes": len(self._passes), "pending": len(self._pending), **self.stats}
+
+    def _run(self):
+        db = get_db()
+        next_refresh = 0.0
+        while True:
+            stopping = self._stop.is_set()
+            if not stopping and time.monotonic() >= next_refresh:
+                try:
+                    self.refresh(db, full=time.monotonic() - self._loaded_at >= FULL_RELOAD_SECONDS)
+                except Exception as e:
+                    # Un error inesperado no debe matar el hilo: el write-behind se detendría en silencio
+                    logger.warning("event=gate_refresh_failed error=%s", e)
+                next_refresh = time.monotonic() + GATE_REFRESH_SECONDS
+            try:
+                self.flush(db)
+            except Exception as e:
+                logger.error("event=gate_flush_error error=%s", e)
+            if stopping:
+                return
+            self._wake.wait(GATE_FLUSH_MS / 1000)
+            self._wake.clear()
+
+gate = Gate()
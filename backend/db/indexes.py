@@ -0,0 +1,206 @@
+# backend/db/indexes.py
+
+from datetime import datetime
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+# Registro declarativo de índices por colección.
+# Cada entrada respalda una consulta real de backend/routes (filtros + orden de paginación).
+# Los índices (dueño, orden, _id) sirven GET /<colección>/mine sin SORT en memoria.
+INDEXES = {
+    "users": [
+        IndexModel([("username", ASCENDING)], name="username_1"),
+        IndexModel([("email", ASCENDING)], name="email_1"),
+        IndexModel([("role", ASCENDING), ("_id", ASCENDING)], name="role_1__id_1"),
+    ],
+    "apartments": [
+        IndexModel([("userId", ASCENDING)], name="userId_1"),
+        IndexModel([("level", ASCENDING), ("_id", ASCENDING)], name="level_1__id_1"),
+    ],
+    "bookings": [
+        IndexModel([("instalacion", ASCENDING), ("fechaInicio", ASCENDING), ("fechaFin", ASCENDING)], name="instalacion_1_fechaInicio_1_fechaFin_1"),
+        IndexModel([("fechaInicio", ASCENDING), ("_id", ASCENDING)], name="fechaInicio_1__id_1"),
+        IndexModel([("userId", ASCENDING), ("fechaInicio", ASCENDING)], name="userId_1_fechaInicio_1"),
+    ],
+    # _id = "<instalacion>|<bloque>" ya es único: ahí se detectan los traslapes
+    "booking_slots": [
+        IndexModel([("bookingId", ASCENDING)], name="bookingId_1"),
+    ],
+    "payments": [
+        IndexModel([("apartmentId", ASCENDING), ("dueDate", ASCENDING), ("_id", ASCENDING)], name="apartmentId_1_dueDate_1__id_1"),
+        IndexModel([("status", ASCENDING), ("dueDate", ASCENDING)], name="status_1_dueDate_1"),
+        IndexModel([("dueDate", ASCENDING), ("_id", ASCENDING)], name="dueDate_1__id_1"),
+    ],
+    "ledger_rollups": [
+        IndexModel([("apartment", ASCENDING), ("month", ASCENDING)], name="apartment_1_month_1"),
+        IndexModel([("month", ASCENDING)], name="month_1"),
+    ],
+    "deliveries": [
+        IndexModel([("apartmentId", ASCENDING), ("receivedDate", ASCENDING), ("_id", ASCENDING)], name="apartmentId_1_receivedDate_1__id_1"),
+        IndexModel([("status", ASCENDING), ("receivedDate", ASCENDING)], name="status_1_receivedDate_1"),
+        IndexModel([("receivedDate", ASCENDING), ("_id", ASCENDING)], name="receivedDate_1__id_1"),
+    ],
+    "documents": [
+        IndexModel([("userId", ASCENDING), ("date", ASCENDING), ("_id", ASCENDING)], name="userId_1_date_1__id_1"),
+        IndexModel([("date", ASCENDING), ("_id", ASCENDING)], name="date_1__id_1"),
+    ],
+    "incidents": [
+        IndexModel([("userId", ASCENDING), ("_id", ASCENDING)], name="userId_1__id_1"),
+        IndexModel([("status", ASCENDING), ("_id", ASCENDING)], name="status_1__id_1"),
+    ],
+    "reserves": [
+        IndexModel([("apartmentId", ASCENDING), ("fecha", ASCENDING)], name="apartmentId_1_fecha_1"),
+        IndexModel([("instalacion", ASCENDING), ("fecha", ASCENDING)], name="instalacion_1_fecha_1"),
+        IndexModel([("fecha", ASCENDING), ("_id", ASCENDING)], name="fecha_1__id_1"),
+    ],
+    "fines": [
+        IndexModel([("estatus", ASCENDING), ("fecha", ASCENDING)], name="estatus_1_fecha_1"),
+        IndexModel([("departamento", ASCENDING), ("fecha", ASCENDING)], name="departamento_1_fecha_1"),
+        IndexModel([("fecha", ASCENDING), ("_id", ASCENDING)], name="fecha_1__id_1"),
+    ],
+    "visits": [
+        IndexModel([("apartmentId", ASCENDING), ("entryTime", ASCENDING), ("_id", ASCENDING)], name="apartmentId_1_entryTime_1__id_1"),
+        IndexModel([("entryTime", ASCENDING), ("_id", ASCENDING)], name="entryTime_1__id_1"),
+        # Hot set de la puerta (backend/db/gate.py): precarga por vigencia; el refresco
+        # incremental por updatedAt usa el índice (updatedAt, _id) de LIVE_POLLED
+        IndexModel([("passExpiresAt", ASCENDING)], name="passExpiresAt_1"),
+    ],
+    "announcements": [
+        IndexModel([("date", ASCENDING), ("_id", ASCENDING)], name="date_1__id_1"),
+        IndexModel([("category", ASCENDING), ("date", ASCENDING)], name="category_1_date_1"),
+    ],
+    "providers": [
+        IndexModel([("service", ASCENDING), ("_id", ASCENDING)], name="service_1__id_1"),
+    ],
+}
+
+# Colecciones publicadas por backend/routes/live.py. El sondeo de cambios
+# (backend/db/changes.py, sin change streams) recorre cada una por (updatedAt, _id)
+# cada LIVE_POLL_INTERVAL: sin este índice sería un COLLSCAN + SORT por segundo.
+LIVE_POLLED = (
+    "announcements", "apartments", "bookings", "deliveries", "documents", "fines",
+    "incidents", "payments", "providers", "reserves", "visits",
+)
+for _name in LIVE_POLLED:
+    INDEXES[_name].append(IndexModel([("updatedAt", ASCENDING), ("_id", ASCENDING)], name="updatedAt_1__id_1"))
+
+# Consultas registradas de las rutas: (nombre, colección, filtro, orden).
+# check_query_plans() falla si alguna se resuelve con COLLSCAN.
+_SAMPLE_ID = ObjectId("000000000000000000000000")
+_SAMPLE_DATE = datetime(2025, 1, 1)
+_SAMPLE_OWNER = [_SAMPLE_ID, str(_SAMPLE_ID)]
+
+ROUTE_QUERIES = [
+    ("auth.login", "users", {"username": "admin"}, None),
+    ("bookings.update_booking", "booking_slots", {"bookingId": _SAMPLE_ID}, None),
+    ("bookings.get_disponibilidad", "booking_slots", {
+        "_id": {"$gte": "alberca|2025-01-01", "$lt": "alberca|2025-01-02"},
+    }, None),
+    ("bookings.get_bookings", "bookings", {}, [("fechaInicio", DESCENDING), ("_id", DESCENDING)]),
+    ("payments.get_payments", "payments", {}, [("dueDate", DESCENDING), ("_id", DESCENDING)]),
+    ("payments.get_payments?apartmentId", "payments", {"apartmentId": _SAMPLE_ID}, [("dueDate", DESCENDING)]),
+    ("payments.get_payments?status", "payments", {"status": "pending"}, [("dueDate", DESCENDING)]),
+    ("payments.get_ledger?apartmentId", "ledger_rollups", {"apartment": "x", "month": {"$gte": "2025-01"}}, [("apartment", ASCENDING), ("month", ASCENDING)]),
+    ("payments.get_ledger?desde", "ledger_rollups", {"month": {"$gte": "2025-01"}}, [("apartment", ASCENDING), ("month", ASCENDING)]),
+    ("payments.create_monthly_charges", "payments", {"concept": "Mantenimiento mensual", "dueDate": {"$gte": _SAMPLE_DATE}}, None),
+    ("payments.get_payments_summary?desde", "payments", {"dueDate": {"$gte": _SAMPLE_DATE}}, None),
+    ("deliveries.get_deliveries?apartmentId", "deliveries", {"apartmentId": _SAMPLE_ID}, [("receivedDate", DESCENDING)]),
+    ("deliveries.get_deliveries", "deliveries", {}, [("receivedDate", DESCENDING), ("_id", DESCENDING)]),
+    ("documents.get_documents?userId", "documents", {"userId": _SAMPLE_ID}, [("date", DESCENDING)]),
+    ("incidents.get_incidents?userId", "incidents", {"userId": _SAMPLE_ID}, [("_id", DESCENDING)]),
+    ("incidents.get_incidents?status", "incidents", {"status": "open"}, [("_id", DESCENDING)]),
+    ("reserves.get_reserves?apartmentId", "reserves", {"apartmentId": _SAMPLE_ID}, [("fecha", DESCENDING)]),
+    ("fines.get_fines", "fines", {}, [("fecha", DESCENDING), ("_id", DESCENDING)]),
+    ("fines.get_fines?estatus", "fines", {"estatus": "Incompleto"}, [("fecha", DESCENDING)]),
+    ("fines.get_fines_summary?desde", "fines", {"fecha": {"$gte": _SAMPLE_DATE}}, None),
+    ("visits.get_visits?apartmentId", "visits", {"apartmentId": _SAMPLE_ID}, [("entryTime", DESCENDING)]),
+    ("visits.get_visits", "visits", {}, [("entryTime", DESCENDING), ("_id", DESCENDING)]),
+    ("announcements.get_announcements", "announcements", {}, [("date", DESCENDING), ("_id", DESCENDING)]),
+    ("apartments.get_apartments?userId", "apartments", {"userId": _SAMPLE_ID}, None),
+    ("payments.get_my_payments", "payments", {"apartmentId": {"$in": _SAMPLE_OWNER}}, [("dueDate", DESCENDING), ("_id", DESCENDING)]),
+    ("deliveries.get_my_deliveries", "deliveries", {"apartmentId": {"$in": _SAMPLE_OWNER}}, [("receivedDate", DESCENDING), ("_id", DESCENDING)]),
+    ("visits.get_my_visits", "visits", {"apartmentId": {"$in": _SAMPLE_OWNER}}, [("entryTime", DESCENDING), ("_id", DESCENDING)]),
+    ("documents.get_my_documents", "documents", {"userId": {"$in": _SAMPLE_OWNER}}, [("date", DESCENDING), ("_id", DESCENDING)]),
+    ("incidents.get_my_incidents", "incidents", {"userId": {"$in": _SAMPLE_OWNER}}, [("_id", DESCENDING)]),
+    ("gate.refresh", "visits", {"updatedAt": {"$gte": _SAMPLE_DATE}}, None),
+] + [
+    (f"live.poll.{name}", name, {"$or": [
+        {"updatedAt": {"$gt": _SAMPLE_DATE}},
+        {"updatedAt": _SAMPLE_DATE, "_id": {"$gt": _SAMPLE_ID}},
+    ]}, [("updatedAt", ASCENDING), ("_id", ASCENDING)])
+    for name in LIVE_POLLED
+]
+
+def ensure_indexes(db):
+    """Crea los índices registrados. create_indexes es idempotente."""
+    for col_name, models in INDEXES.items():
+        names = db[col_name].create_indexes(models)
+        print(f"📇 {col_name}: {', '.join(names)}")
+
+def _stages(plan):
+    """Recorre un plan de explain() y devuelve todas sus etapas."""
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan["stage"]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from _stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _stages(child)
+
+def explain_stages(db, col_name, query, sort=None):
+    cursor = db[col_name].find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+    return list(_stages(plan))
+
+def check_query_plans(db):
+    """Devuelve la lista de consultas registradas que hacen COLLSCAN."""
+    failures = []
+    for name, col_name, query, sort in ROUTE_QUERIES:
+        stages = explain_stages(db, col_name, query, sort)
+        status = "❌ COLLSCAN" if "COLLSCAN" in stages else "✅"
+        print(f"{status} {name}: {' <- '.join(stages)}")
+        if "COLLSCAN" in stages:
+            failures.append(name)
+    return failures
+
+def _find_key(doc, key):
+    """Primer valor de `key` en un explain anidado (find, aggregate y SBE lo ponen en lugares distintos)."""
+    if isinstance(doc, dict):
+        if key in doc:
+            return doc[key]
+        doc = list(doc.values())
+    if isinstance(doc, list):
+        for value in doc:
+            found = _find_key(value, key)
+            if found is not None:
+                return found
+    return None
+
+def _index_names(plan):
+    if isinstance(plan, dict):
+        if plan.get("indexName"):
+            yield plan["indexName"]
+        for value in plan.values():
+            yield from _index_names(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _index_names(value)
+
+def plan_summary(explained: dict) -> dict:
+    """Resumen de un explain con executionStats: etapas, índices y documentos examinados vs devueltos."""
+    winning = (_find_key(explained, "queryPlanner") or {}).get("winningPlan", {})
+    stats = _find_key(explained, "executionStats") or {}
+    stages = list(_stages(winning))
+    return {
+        "stages": stages,
+        "collscan": "COLLSCAN" in stages,
+        "indexes": sorted(set(_index_names(winning))),
+        "keysExamined": stats.get("totalKeysExamined"),
+        "docsExamined": stats.get("totalDocsExamined"),
+        "returned": stats.get("nReturned"),
+        "executionMs": stats.get("executionTimeMillis"),
+    }
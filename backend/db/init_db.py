@@ -1,56 +1,74 @@
 # init_db.py
-from mongo import get_db
-from datetime import datetime
+# Uso:
+#   python -m backend.db.init_db            -> residencial de demostración en un mongod local (ver backend/db/seed.py)
+#   python -m backend.db.init_db --indexes  -> crea los índices registrados (idempotente)
+#   python -m backend.db.init_db --check    -> falla si alguna consulta registrada hace COLLSCAN
+#   python -m backend.db.init_db --booking-slots -> libera bloques huérfanos y genera los de reservas existentes
+#   python -m backend.db.init_db --rollups-rebuild -> recalcula ledger_rollups desde payments/fines
+#   python -m backend.db.init_db --rollups-check   -> falla si ledger_rollups no cuadra con los datos
+import argparse
+import sys
+
+from backend.db.mongo import get_db
+from backend.db.indexes import ensure_indexes, check_query_plans
+from backend.db.slots import backfill_slots, sweep_orphan_slots
+from backend.db.rollups import rebuild_rollups, check_rollups
+from backend.db.seed import already_seeded, check_local, seed_complex
 
 db = get_db()
 
-# Colecciones y sus datos dummy
-collections = {
-    "users": {
-        "firstName": "Carlos",
-        "lastName": "Martínez",
-        "email": "carlos@mail.com",
-        "password": "hashed_pw",
-        "role": "admin",
-        "phone": "555-1234",
-        "createdAt": datetime.utcnow(),
-        "updatedAt": datetime.utcnow()
-    },
-    "apartments": {
-        "level": 2,
-        "number": "2B",
-        "userId": None,
-        "createdAt": datetime.utcnow(),
-        "updatedAt": datetime.utcnow()
-    },
-    "payments": {
-        "apartmentId": None,
-        "amount": 1200.00,
-        "concept": "Mantenimiento mensual",
-        "dueDate": datetime(2025, 4, 30),
-        "status": "pending",
-        "paymentDate": datetime(2025, 4, 2),
-        "createdAt": datetime.utcnow(),
-        "updatedAt": datetime.utcnow()
-    },
-    "incidents": {
-        "userId": None,
-        "title": "Fuga en baño",
-        "description": "Fuga en lavamanos",
-        "status": "open",
-        "priority": "high",
-        "category": "plumbing",
-        "createdAt": datetime.utcnow(),
-        "updatedAt": datetime.utcnow()
-    },
-    # Agrega el resto si quieres aquí mismo o en un seeder aparte
-}
+def seed_demo(allow_remote: bool = False):
+    """Residencial chico de demostración (1 torre, 16 departamentos, 1 año)."""
+    check_local(allow_remote)  # crea cuentas de administración: nunca sin querer en una base compartida
+    if already_seeded(db):
+        print("ℹ️ La base ya tiene datos sembrados (regenerar: python -m backend.db.seed --drop).")
+        return
+    counts = seed_complex(db, towers=1, levels=4, units=4, years=1, workers=0)
+    print(f"✅ {sum(counts.values())} documentos de demostración (a escala: python -m backend.db.seed).")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inicialización de residencial_db")
+    parser.add_argument("--indexes", action="store_true", help="Crear/actualizar índices registrados")
+    parser.add_argument("--check", action="store_true", help="Verificar con explain() que no haya COLLSCAN")
+    parser.add_argument("--booking-slots", action="store_true", help="Liberar bloques huérfanos y generar booking_slots de las reservas existentes")
+    parser.add_argument("--rollups-rebuild", action="store_true", help="Recalcular ledger_rollups desde cero")
+    parser.add_argument("--rollups-check", action="store_true", help="Comparar ledger_rollups contra payments/fines")
+    parser.add_argument("--allow-remote", action="store_true", help="Sembrar la demostración aunque MONGO_URI no sea local")
+    args = parser.parse_args(argv)
 
-def seed_collections():
-    for col_name, doc in collections.items():
-        print(f"Inserting into {col_name}...")
-        db[col_name].insert_one(doc)
-    print("✅ Todas las colecciones fueron inicializadas.")
+    if not (args.indexes or args.check or args.booking_slots or args.rollups_rebuild or args.rollups_check):
+        seed_demo(args.allow_remote)
+        return 0
+    if args.indexes:
+        ensure_indexes(db)
+        print("✅ Índices creados.")
+    if args.booking_slots:
+        removed = sweep_orphan_slots(db)
+        if removed:
+            print(f"🧹 {removed} bloques sin reserva liberados.")
+        conflicts = backfill_slots(db)
+        if conflicts:
+            print(f"⚠️ {len(conflicts)} reservas traslapadas sin bloques: {', '.join(conflicts)}")
+        else:
+            print("✅ Bloques de reservas generados.")
+    if args.rollups_rebuild:
+        count = rebuild_rollups(db)
+        print(f"✅ {count} rollups mensuales recalculados.")
+    if args.rollups_check:
+        mismatches = check_rollups(db)
+        if mismatches:
+            for key, field, expected, stored in mismatches[:20]:
+                print(f"❌ {key} {field}: esperado {expected}, guardado {stored}")
+            print(f"❌ {len(mismatches)} diferencias en ledger_rollups (corregir con --rollups-rebuild)")
+            return 1
+        print("✅ ledger_rollups cuadra con payments y fines.")
+    if args.check:
+        failures = check_query_plans(db)
+        if failures:
+            print(f"❌ {len(failures)} consultas sin índice: {', '.join(failures)}")
+            return 1
+        print("✅ Todas las consultas registradas usan índice.")
+    return 0
 
 if __name__ == "__main__":
-    seed_collections()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,26 +1,98 @@
 # backend/db/mongo.py
 
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from pymongo import MongoClient, AsyncMongoClient
+from pymongo.errors import PyMongoError
 from dotenv import load_dotenv
 import os
 
+from backend.db import profiler
+from backend.utils import metrics
+
 # Cargar variables del archivo .env
 load_dotenv()
 
 # Obtener la URI desde la variable de entorno
 MONGO_URI = os.getenv("MONGO_URI")
-DB_NAME = "residencial_db"  
+DB_NAME = "residencial_db"
 
 if not MONGO_URI:
     raise ValueError("❌ La variable de entorno MONGO_URI no está definida en el archivo .env")
 
-def get_db():
+# Configuración del pool de conexiones (ajustable por despliegue)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+MONGO_MAX_IDLE_MS = int(os.getenv("MONGO_MAX_IDLE_MS", 60000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 10000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 0)) or None
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 0)) or None
+
+# Modo de acceso a datos: "sync" (pymongo + threadpool) o "async" (AsyncMongoClient)
+MONGO_MODE = os.getenv("MONGO_MODE", "sync").lower()
+
+# Clientes compartidos por todo el proceso (un solo pool de conexiones cada uno)
+_client = None
+_async_client = None
+
+def _pool_options():
+    return dict(
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        # Duración por colección/comando (GET /metrics) y consultas lentas (GET /debug/slow-queries)
+        event_listeners=metrics.event_listeners() + profiler.event_listeners(),
+    )
+
+def connect():
+    """Crea el cliente compartido si aún no existe y lo devuelve."""
+    global _client
+    if _client is None:
+        _client = MongoClient(MONGO_URI, **_pool_options())
+        print(f"✅ Cliente MongoDB creado [{DB_NAME}] (maxPoolSize={MONGO_MAX_POOL_SIZE})")
+    return _client
+
+def connect_async():
+    """Igual que connect() pero para el cliente asyncio."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncMongoClient(MONGO_URI, **_pool_options())
+        print(f"✅ Cliente MongoDB async creado [{DB_NAME}] (maxPoolSize={MONGO_MAX_POOL_SIZE})")
+    return _async_client
+
+def close():
+    """Cierra el cliente compartido y libera el pool."""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+        print("🔌 Conexión a MongoDB cerrada")
+
+async def close_async():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
+        print("🔌 Conexión async a MongoDB cerrada")
+
+def get_client():
+    return connect()
+
+def ping():
+    """Verifica que el servidor responda usando el cliente compartido."""
     try:
-        client = MongoClient(MONGO_URI)
-        db = client[DB_NAME]
-        print(f"✅ Conexión exitosa a MongoDB [{DB_NAME}]")
-        return db
-    except ConnectionFailure as e:
+        get_client().admin.command("ping")
+        return True
+    except PyMongoError as e:
         print(f"❌ Error de conexión a MongoDB: {e}")
-        raise
\ No newline at end of file
+        return False
+
+def get_db():
+    return get_client()[DB_NAME]
+
+# Dependencia async: se resuelve en el event loop, sin pasar por el threadpool
+async def get_async_db():
+    return connect_async()[DB_NAME]
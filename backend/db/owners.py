@@ -0,0 +1,107 @@
+# backend/db/owners.py
+#
+# Alcance "mis datos" de un residente: el user_id viaja en el JWT y los
+# apartamentos que le pertenecen (apartments.userId) se resuelven una vez y se
+# cachean en memoria (LRU + TTL). Las escrituras en apartments invalidan la
+# entrada de los usuarios afectados vía CollectionSpec.on_change.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from backend.utils.pagination import id_filter
+
+OWNER_CACHE_SIZE = int(os.getenv("OWNER_CACHE_SIZE", 10000))
+OWNER_CACHE_TTL = float(os.getenv("OWNER_CACHE_TTL", 300))
+
+_apartments = OrderedDict()  # user_id -> (ids de apartamentos, cargado_en)
+_apartments_lock = threading.Lock()
+
+def _cached(user_id: str):
+    with _apartments_lock:
+        entry = _apartments.get(user_id)
+        if entry is None or time.monotonic() - entry[1] >= OWNER_CACHE_TTL:
+            return None
+        _apartments.move_to_end(user_id)
+        return entry[0]
+
+def _store(user_id: str, ids):
+    if OWNER_CACHE_SIZE <= 0:
+        return ids
+    with _apartments_lock:
+        _apartments[user_id] = (ids, time.monotonic())
+        _apartments.move_to_end(user_id)
+        while len(_apartments) > OWNER_CACHE_SIZE:
+            _apartments.popitem(last=False)
+    return ids
+
+def user_apartments(db, user_id: str):
+    """_id (str) de los apartamentos del usuario, con caché."""
+    ids = _cached(user_id)
+    if ids is None:
+        docs = db["apartments"].find({"userId": id_filter(user_id)}, {"_id": 1})
+        ids = _store(user_id, tuple(str(d["_id"]) for d in docs))
+    return ids
+
+async def auser_apartments(db, user_id: str):
+    ids = _cached(user_id)
+    if ids is None:
+        docs = db["apartments"].find({"userId": id_filter(user_id)}, {"_id": 1})
+        ids = _store(user_id, tuple([str(d["_id"]) async for d in docs]))
+    return ids
+
+def clear_owner_cache():
+    with _apartments_lock:
+        _apartments.clear()
+
+def forget_owners(db, before, after):
+    """Hook on_change de apartments: olvida a los dueños anterior y nuevo."""
+    with _apartments_lock:
+        for doc in (before, after):
+            if doc and doc.get("userId"):
+                _apartments.pop(str(doc["userId"]), None)
+
+async def aforget_owners(db, before, after):
+    forget_owners(db, before, after)
+
+def current_user_id(payload: dict) -> str:
+    user_id = payload.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Token sin usuario")
+    return user_id
+
+def _any_id(ids):
+    # Los documentos guardan el id como ObjectId o como string
+    values = []
+    for value in ids:
+        if ObjectId.is_valid(value):
+            values.append(ObjectId(value))
+        values.append(value)
+    return {"$in": values}
+
+def _scoped(field: str, user_id: str, apartment_ids, requested):
+    # ?userId= / ?apartmentId= solo puede acotar dentro de lo que es del usuario
+    if field == "userId":
+        if requested and requested != user_id:
+            raise HTTPException(status_code=403, detail="Solo puedes consultar tus propios datos")
+        return id_filter(user_id)
+    if requested:
+        if requested not in apartment_ids:
+            raise HTTPException(status_code=403, detail="El apartamento no pertenece al usuario")
+        return id_filter(requested)
+    return _any_id(apartment_ids)
+
+def owner_filter(db, field: str, payload: dict, requested: str = None):
+    """Filtro de `field` para los documentos del usuario del token; 403 si `requested` no es suyo."""
+    user_id = current_user_id(payload)
+    apartment_ids = () if field == "userId" else user_apartments(db, user_id)
+    return _scoped(field, user_id, apartment_ids, requested)
+
+async def aowner_filter(db, field: str, payload: dict, requested: str = None):
+    user_id = current_user_id(payload)
+    apartment_ids = () if field == "userId" else await auser_apartments(db, user_id)
+    return _scoped(field, user_id, apartment_ids, requested)
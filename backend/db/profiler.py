@@ -0,0 +1,203 @@
+# backend/db/profiler.py
+#
+# Perfilador de consultas lentas. Un CommandListener de pymongo mira cada
+# find/aggregate/count/distinct/update/delete/findAndModify; los que tardan
+# SLOW_QUERY_MS o más se agrupan por forma de consulta (el filtro con los
+# valores reemplazados por "?", más el orden y la proyección) y se guardan las
+# SLOW_QUERY_TOP formas más lentas con la ruta que las originó.
+#
+# La ruta sale del scope ASGI del request (ProfilerMiddleware lo deja en un
+# ContextVar que también ve el threadpool). Los comandos de hilos propios
+# (puerta, live) quedan con el nombre del hilo.
+#
+# explain() no se ejecuta desde el listener (no se pueden mandar comandos desde
+# ahí): GET /debug/slow-queries explica cada forma una vez con la muestra más
+# lenta y guarda el resumen. Las muestras solo se usan para eso; la respuesta
+# muestra formas, nunca valores.
+
+import json
+import os
+import threading
+from contextvars import ContextVar
+from datetime import datetime
+
+from pymongo import monitoring
+
+from backend.db.indexes import plan_summary
+
+SLOW_QUERY_ENABLED = os.getenv("SLOW_QUERY_ENABLED", "true").lower() == "true"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 100))
+SLOW_QUERY_TOP = int(os.getenv("SLOW_QUERY_TOP", 50))
+
+# Comando -> campos que se conservan para poder explicarlo después
+EXPLAINABLE = {
+    "find": ("filter", "sort", "projection", "skip", "limit", "hint", "collation"),
+    "aggregate": ("pipeline", "hint", "collation"),
+    "count": ("query", "skip", "limit", "hint"),
+    "distinct": ("key", "query"),
+    "update": ("updates",),
+    "delete": ("deletes",),
+    "findAndModify": ("query", "sort", "fields", "update", "remove", "upsert"),
+}
+
+MAX_ROUTES = 10  # rutas distintas que se guardan por forma
+
+_request = ContextVar("profiler_request", default=None)
+
+class ProfilerMiddleware:
+    """Deja el scope del request a la vista del listener (ruta que originó cada consulta)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = _request.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request.reset(token)
+
+def _origin() -> str:
+    scope = _request.get()
+    if scope is None:
+        return f"thread:{threading.current_thread().name}"
+    # El router ya resolvió la ruta cuando el handler consulta Mongo
+    route = getattr(scope.get("route"), "path", None) or scope.get("path")
+    return f"{scope['method']} {route}"
+
+# --- Formas de consulta ---------------------------------------------------------
+
+def shape(value):
+    """Filtro/pipeline sin valores: las claves y operadores se conservan, los valores pasan a "?"."""
+    if isinstance(value, dict):
+        return {key: shape(v) for key, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if any(isinstance(v, (dict, list, tuple)) for v in value):
+            return [shape(v) for v in value]
+        return "?"  # $in: [..] con 3 o 300 ids es la misma forma
+    return "?"
+
+def _filter(name: str, command: dict):
+    if name == "find":
+        return command.get("filter") or {}
+    if name == "aggregate":
+        return command.get("pipeline") or []
+    if name in ("update", "delete"):
+        statements = command.get("updates" if name == "update" else "deletes") or [{}]
+        return statements[0].get("q") or {}
+    return command.get("query") or {}
+
+def query_shape(name: str, collection: str, command: dict) -> dict:
+    return {
+        "collection": collection,
+        "command": name,
+        "filter": shape(_filter(name, command)),
+        # El orden y la proyección deciden el índice: se conservan tal cual
+        "sort": dict(command.get("sort") or {}),
+        "projection": sorted(command.get("projection") or command.get("fields") or {}),
+    }
+
+def _sample(name: str, command: dict) -> dict:
+    sample = {key: command[key] for key in EXPLAINABLE[name] if key in command}
+    for key in ("updates", "deletes"):
+        if key in sample:
+            sample[key] = sample[key][:1]  # un statement alcanza para el plan
+    return sample
+
+# --- Listener -------------------------------------------------------------------
+
+class SlowQueryProfiler(monitoring.CommandListener):
+    def __init__(self, threshold_ms: float = SLOW_QUERY_MS, top: int = SLOW_QUERY_TOP):
+        self.threshold_ms = threshold_ms
+        self.top = top
+        self._started = {}   # (connection, request_id) -> (comando, colección, documento, origen)
+        self._shapes = {}    # forma (json) -> entrada
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        name = event.command_name
+        if name in EXPLAINABLE:
+            collection = event.command.get(name)
+            if isinstance(collection, str):
+                self._started[(event.connection_id, event.request_id)] = (name, collection, event.command, _origin())
+
+    def succeeded(self, event):
+        started = self._started.pop((event.connection_id, event.request_id), None)
+        if started is not None and event.duration_micros >= self.threshold_ms * 1000:
+            self._record(*started, event.duration_micros / 1000, event.reply)
+
+    def failed(self, event):
+        self._started.pop((event.connection_id, event.request_id), None)
+
+    def _record(self, name, collection, command, origin, ms, reply):
+        query = query_shape(name, collection, command)
+        key = json.dumps(query, default=str)
+        cursor = reply.get("cursor") if isinstance(reply, dict) else None
+        returned = len(cursor.get("firstBatch") or ()) if isinstance(cursor, dict) else reply.get("n")
+        with self._lock:
+            entry = self._shapes.get(key)
+            if entry is None:
+                if len(self._shapes) >= self.top:
+                    fastest = min(self._shapes, key=lambda k: self._shapes[k]["maxMs"])
+                    if self._shapes[fastest]["maxMs"] >= ms:
+                        return
+                    del self._shapes[fastest]
+                entry = self._shapes[key] = {**query, "count": 0, "totalMs": 0.0, "maxMs": 0.0, "routes": {}, "explain": None}
+            entry["count"] += 1
+            entry["totalMs"] += ms
+            entry["lastMs"] = ms
+            entry["lastSeen"] = datetime.utcnow()
+            if ms >= entry["maxMs"]:
+                entry["maxMs"] = ms
+                entry["returned"] = returned
+                entry["_sample"] = _sample(name, command)
+            routes = entry["routes"]
+            if origin in routes or len(routes) < MAX_ROUTES:
+                routes[origin] = routes.get(origin, 0) + 1
+
+    # --- Consulta -----------------------------------------------------------------
+
+    def explain(self, db, refresh: bool = False):
+        """Corre explain(executionStats) para las formas que aún no lo tienen."""
+        with self._lock:
+            pending = [e for e in self._shapes.values() if refresh or e["explain"] is None]
+        for entry in pending:
+            explain_cmd = {entry["command"]: entry["collection"], **entry["_sample"]}
+            if entry["command"] == "aggregate":
+                explain_cmd["cursor"] = {}
+            try:
+                summary = plan_summary(db.command("explain", explain_cmd, verbosity="executionStats"))
+            except Exception as e:  # un explain que falla no debe tapar el resto del reporte
+                summary = {"error": str(e)}
+            with self._lock:
+                entry["explain"] = summary
+
+    def report(self, min_ms: float = 0, limit: int = None) -> list:
+        """Formas más lentas primero (sin las muestras)."""
+        with self._lock:
+            entries = [
+                {**{k: v for k, v in e.items() if not k.startswith("_")}, "avgMs": round(e["totalMs"] / e["count"], 2), "routes": dict(e["routes"])}
+                for e in self._shapes.values() if e["maxMs"] >= min_ms
+            ]
+        entries.sort(key=lambda e: -e["maxMs"])
+        return entries[:limit] if limit else entries
+
+    def configure(self, threshold_ms: float = None, top: int = None):
+        with self._lock:
+            if threshold_ms is not None:
+                self.threshold_ms = threshold_ms
+            if top is not None:
+                self.top = top
+                while len(self._shapes) > top:
+                    del self._shapes[min(self._shapes, key=lambda k: self._shapes[k]["maxMs"])]
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+
+profiler = SlowQueryProfiler()
+
+def event_listeners() -> list:
+    return [profiler] if SLOW_QUERY_ENABLED else []
@@ -0,0 +1,218 @@
+# backend/db/rollups.py
+#
+# Rollups mensuales del estado de cuenta por apartamento (ledger_rollups).
+# Cada documento "<apartamento>|<YYYY-MM>" acumula lo facturado, pagado,
+# pendiente y vencido de payments, y el monto de fines del mes.
+#
+# Se mantienen de forma incremental: cada escritura en payments/fines resta la
+# contribución del documento anterior y suma la del nuevo con $inc (atómico,
+# seguro ante escrituras concurrentes). rebuild_rollups() recalcula todo desde
+# cero recorriendo las colecciones por lotes y check_rollups() compara los
+# rollups contra los datos crudos.
+
+import os
+from collections import defaultdict
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from backend.db.indexes import INDEXES
+
+ROLLUPS_COLLECTION = "ledger_rollups"
+ROLLUP_BATCH_SIZE = int(os.getenv("ROLLUP_BATCH_SIZE", 1000))
+
+PAID_STATUSES = {"paid", "pagado"}
+OVERDUE_STATUSES = {"overdue", "vencido"}
+
+# Campos acumulados de cada rollup
+FIELDS = ("billed", "paid", "pending", "overdue", "payments", "fines", "finesPaid", "finesCount")
+
+def _month(value):
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return f"{value:%Y-%m}" if isinstance(value, datetime) else None
+
+def _amount(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+def payment_contribution(doc):
+    """(apartamento, mes, incrementos) de un pago; None si no tiene fecha válida."""
+    month = _month(doc.get("dueDate"))
+    if month is None:
+        return None
+    amount = _amount(doc.get("amount"))
+    status = doc.get("status")
+    inc = {"billed": amount, "payments": 1}
+    if status in PAID_STATUSES:
+        inc["paid"] = amount
+    elif status in OVERDUE_STATUSES:
+        inc["overdue"] = amount
+    else:
+        inc["pending"] = amount
+    return str(doc.get("apartmentId") or ""), month, inc
+
+def fine_contribution(doc, apartments):
+    """
+    Las multas guardan el número de departamento; `apartments` (número -> _id)
+    las lleva a la misma clave que los pagos. Sin apartamento registrado se usa el número.
+    """
+    month = _month(doc.get("fecha"))
+    if month is None:
+        return None
+    number = doc.get("departamento") or ""
+    amount = _amount(doc.get("monto"))
+    inc = {"fines": amount, "finesCount": 1}
+    if doc.get("estatus") == "Completo":
+        inc["finesPaid"] = amount
+    return apartments.get(number, number), month, inc
+
+def _key(apartment, month):
+    return f"{apartment}|{month}"
+
+def _accumulate(totals, contribution, sign=1):
+    if contribution is None:
+        return
+    apartment, month, inc = contribution
+    bucket = totals[(apartment, month)]
+    for field, value in inc.items():
+        bucket[field] += sign * value
+
+def _apartment_ids(db, numbers):
+    numbers = [n for n in numbers if n]
+    if not numbers:
+        return {}
+    return {a["number"]: str(a["_id"]) for a in db["apartments"].find({"number": {"$in": numbers}}, {"number": 1})}
+
+def _operations(totals):
+    now = datetime.utcnow()
+    ops = []
+    for (apartment, month), inc in totals.items():
+        inc = {k: v for k, v in inc.items() if v}
+        if not inc:
+            continue
+        ops.append(UpdateOne(
+            {"_id": _key(apartment, month)},
+            {"$inc": inc, "$set": {"updatedAt": now}, "$setOnInsert": {"apartment": apartment, "month": month}},
+            upsert=True,
+        ))
+    return ops
+
+def _deltas(changes, contribution):
+    totals = defaultdict(lambda: defaultdict(float))
+    for before, after in changes:
+        if before is not None:
+            _accumulate(totals, contribution(before), -1)
+        if after is not None:
+            _accumulate(totals, contribution(after), 1)
+    return totals
+
+def _emptied(totals):
+    # Meses que quedaron sin pagos ni multas tras mover/borrar un documento
+    return {
+        "_id": {"$in": [_key(a, m) for a, m in totals]},
+        "payments": {"$not": {"$gt": 0}},
+        "finesCount": {"$not": {"$gt": 0}},
+    }
+
+def _fine_numbers(changes):
+    return {d.get("departamento") for pair in changes for d in pair if d and d.get("departamento")}
+
+# --- Mantenimiento incremental (hooks de CollectionSpec) ----------------------
+# on_*_change(db, antes, después) para una escritura; on_*_changes(db, pares)
+# para las escrituras en lote: un solo bulk_write para todos los documentos.
+
+def _apply(db, changes, totals):
+    ops = _operations(totals)
+    if ops:
+        db[ROLLUPS_COLLECTION].bulk_write(ops, ordered=False)
+        if any(before is not None for before, _ in changes):
+            db[ROLLUPS_COLLECTION].delete_many(_emptied(totals))
+
+async def _aapply(db, changes, totals):
+    ops = _operations(totals)
+    if ops:
+        await db[ROLLUPS_COLLECTION].bulk_write(ops, ordered=False)
+        if any(before is not None for before, _ in changes):
+            await db[ROLLUPS_COLLECTION].delete_many(_emptied(totals))
+
+def on_payment_changes(db, changes):
+    _apply(db, changes, _deltas(changes, payment_contribution))
+
+def on_fine_changes(db, changes):
+    apartments = _apartment_ids(db, list(_fine_numbers(changes)))
+    _apply(db, changes, _deltas(changes, lambda d: fine_contribution(d, apartments)))
+
+def on_payment_change(db, before, after):
+    on_payment_changes(db, [(before, after)])
+
+def on_fine_change(db, before, after):
+    on_fine_changes(db, [(before, after)])
+
+async def aon_payment_changes(db, changes):
+    await _aapply(db, changes, _deltas(changes, payment_contribution))
+
+async def aon_fine_changes(db, changes):
+    numbers = list(_fine_numbers(changes))
+    apartments = {}
+    if numbers:
+        async for a in db["apartments"].find({"number": {"$in": numbers}}, {"number": 1}):
+            apartments[a["number"]] = str(a["_id"])
+    await _aapply(db, changes, _deltas(changes, lambda d: fine_contribution(d, apartments)))
+
+async def aon_payment_change(db, before, after):
+    await aon_payment_changes(db, [(before, after)])
+
+async def aon_fine_change(db, before, after):
+    await aon_fine_changes(db, [(before, after)])
+
+# --- Recalculo completo y verificación ----------------------------------------
+
+def compute_rollups(db, batch_size: int = ROLLUP_BATCH_SIZE):
+    """Recorre payments y fines por lotes (cursor con batch_size) y devuelve los totales."""
+    totals = defaultdict(lambda: defaultdict(float))
+    for doc in db["payments"].find({}, {"apartmentId": 1, "dueDate": 1, "amount": 1, "status": 1}).batch_size(batch_size):
+        _accumulate(totals, payment_contribution(doc))
+    apartments = {a["number"]: str(a["_id"]) for a in db["apartments"].find({}, {"number": 1}) if a.get("number")}
+    for doc in db["fines"].find({}, {"departamento": 1, "fecha": 1, "monto": 1, "estatus": 1}).batch_size(batch_size):
+        _accumulate(totals, fine_contribution(doc, apartments))
+    return totals
+
+def rebuild_rollups(db, batch_size: int = ROLLUP_BATCH_SIZE) -> int:
+    """
+    Recalcula ledger_rollups desde cero en una colección temporal y la
+    intercambia con renameCollection(dropTarget), así los lectores nunca ven
+    rollups a medio construir. Devuelve el número de rollups escritos.
+    Las escrituras que ocurran durante el recálculo pueden perderse: correrlo
+    en horario de poca actividad y verificar después con check_rollups().
+    """
+    totals = compute_rollups(db, batch_size)
+    tmp = db[f"{ROLLUPS_COLLECTION}_rebuild"]
+    tmp.drop()
+    tmp.create_indexes(INDEXES[ROLLUPS_COLLECTION])
+    ops = _operations(totals)
+    for i in range(0, len(ops), batch_size):
+        tmp.bulk_write(ops[i:i + batch_size], ordered=False)
+    if ops:
+        tmp.rename(ROLLUPS_COLLECTION, dropTarget=True)
+    else:
+        tmp.drop()
+        db[ROLLUPS_COLLECTION].delete_many({})
+    return len(ops)
+
+def check_rollups(db, batch_size: int = ROLLUP_BATCH_SIZE, tolerance: float = 1e-6):
+    """Lista de diferencias (clave, campo, esperado, guardado) entre rollups y datos crudos."""
+    expected = {_key(a, m): inc for (a, m), inc in compute_rollups(db, batch_size).items()}
+    stored = {d["_id"]: d for d in db[ROLLUPS_COLLECTION].find({})}
+    mismatches = []
+    for key in sorted(set(expected) | set(stored)):
+        want, have = expected.get(key, {}), stored.get(key, {})
+        for field in FIELDS:
+            if abs(want.get(field, 0) - have.get(field, 0)) > tolerance:
+                mismatches.append((key, field, want.get(field, 0), have.get(field, 0)))
+    return mismatches
@@ -0,0 +1,433 @@
+# backend/db/seed.py
+#
+# Generador de un residencial sintético a escala de producción:
+#   torres x niveles x departamentos, un residente dueño por departamento
+#   ocupado, staff (administración y guardias) y `--years` años de historial:
+#   pagos mensuales, multas, visitas con pase, paquetería, reservas (con sus
+#   booking_slots), incidencias, documentos, avisos y proveedores.
+#
+# Distribuciones: cada departamento tiene un factor de actividad lognormal
+# (unos pocos concentran visitas, paquetes y multas), las visitas se agrupan
+# en tardes y fines de semana, los pagos viejos casi siempre están pagados y
+# los recientes no tanto. Los _id llevan la fecha del documento (ObjectId con
+# timestamp histórico), así ordenar por _id equivale a ordenar por antigüedad
+# como en producción.
+#
+# Usuarios y departamentos se crean primero; el historial se genera por
+# tareas de SEED_CHUNK departamentos (la semilla de cada tarea no depende de
+# --workers: misma --seed, mismos datos) en un ProcessPoolExecutor y se
+# escribe con insert_many(ordered=False) por lotes de --batch documentos.
+# Al final se crean los índices, se recalculan ledger_rollups y se
+# incrementan las versiones (ETag) de las colecciones sembradas.
+#
+# Uso:
+#   python -m backend.db.seed                                   (~350 mil documentos)
+#   python -m backend.db.seed --towers 10 --levels 25 --units 8 --years 5 --workers 8   (millones)
+#   python -m backend.db.seed --drop ...  (vacía antes las colecciones sembradas)
+
+import argparse
+import math
+import multiprocessing
+import os
+import random
+import secrets
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import uri_parser
+
+from backend.db import mongo
+from backend.db.indexes import ensure_indexes
+from backend.db.rollups import rebuild_rollups
+from backend.db.slots import SLOTS_COLLECTION, slot_key, slot_starts
+from backend.db.versions import bump_version
+from backend.utils.passes import pass_expiry
+
+SEED_CHUNK = 64  # departamentos por tarea
+EPOCH = datetime(1970, 1, 1)
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+COLLECTIONS = (
+    "users", "apartments", "payments", "fines", "visits", "deliveries",
+    "bookings", SLOTS_COLLECTION, "incidents", "documents", "announcements", "providers",
+)
+
+FACILITIES = ("alberca", "gimnasio", "salon", "asadores")
+FIRST_NAMES = ("Ana", "Carlos", "Lucía", "Jorge", "María", "Luis", "Sofía", "Diego", "Valeria", "Miguel", "Fernanda", "José", "Camila", "Andrés", "Paola", "Ricardo")
+LAST_NAMES = ("García", "Martínez", "López", "Hernández", "González", "Pérez", "Rodríguez", "Sánchez", "Ramírez", "Torres", "Flores", "Rivera", "Gómez", "Díaz")
+CARRIERS = ("Amazon", "Mercado Libre", "DHL", "FedEx", "Estafeta", "UPS")
+INCIDENT_CATEGORIES = (("plumbing", "Fuga de agua"), ("electrical", "Falla eléctrica"), ("noise", "Ruido excesivo"), ("security", "Acceso no autorizado"), ("general", "Área común dañada"))
+FINE_REASONS = (("Ruido después de las 22:00", 500.0), ("Estacionarse en lugar ajeno", 800.0), ("Mascota sin correa", 300.0), ("Basura fuera de horario", 250.0), ("Daño a áreas comunes", 1500.0))
+DOCUMENT_TYPES = (("Reglamento interno", "reglamento"), ("Contrato de arrendamiento", "contrato"), ("Comprobante de domicilio", "comprobante"))
+ANNOUNCEMENT_CATEGORIES = ("mantenimiento", "eventos", "seguridad", "administración")
+SERVICES = ("limpieza", "jardinería", "seguridad", "elevadores", "plomería", "fumigación")
+
+# Hora de llegada de visitas: picos a mediodía y en la tarde
+VISIT_HOURS = list(range(8, 23))
+VISIT_HOUR_WEIGHTS = [1, 2, 3, 4, 6, 6, 4, 3, 4, 6, 8, 8, 6, 3, 1]
+
+# --- Utilidades -----------------------------------------------------------------
+
+def _oid(when: datetime, rng: random.Random) -> ObjectId:
+    """ObjectId con el timestamp del documento (los 8 bytes restantes al azar)."""
+    return ObjectId(int((when - EPOCH).total_seconds()).to_bytes(4, "big") + rng.randbytes(8))
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    if lam <= 0:
+        return 0
+    if lam > 30:
+        return max(0, round(rng.gauss(lam, math.sqrt(lam))))
+    limit, k, p = math.exp(-lam), 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+def _name(rng: random.Random):
+    return rng.choice(FIRST_NAMES), f"{rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+def _months(start: datetime, end: datetime):
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        yield year, month
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+class Writer:
+    """Acumula documentos por colección y los escribe con insert_many cada `batch`."""
+
+    def __init__(self, db, batch: int):
+        self.db = db
+        self.batch = batch
+        self.buffers = {}
+        self.counts = Counter()
+
+    def add(self, name: str, doc: dict):
+        buffer = self.buffers.setdefault(name, [])
+        buffer.append(doc)
+        if len(buffer) >= self.batch:
+            self._write(name)
+
+    def _write(self, name: str):
+        docs = self.buffers.pop(name, None)
+        if docs:
+            self.db[name].insert_many(docs, ordered=False)
+            self.counts[name] += len(docs)
+
+    def flush(self) -> Counter:
+        for name in list(self.buffers):
+            self._write(name)
+        return self.counts
+
+# --- Personas y departamentos ---------------------------------------------------
+
+def build_people(rng: random.Random, towers: int, levels: int, units: int, start: datetime, password: str, staff_password: str, occupancy: float = 0.92):
+    """(usuarios, departamentos): un residente por departamento ocupado, más administración y guardias."""
+    users, apartments = [], []
+    for t in range(towers):
+        tower = chr(ord("A") + t) if towers <= 26 else f"T{t + 1}"
+        for level in range(1, levels + 1):
+            for unit in range(1, units + 1):
+                created = start + timedelta(days=rng.randint(0, 30))
+                number = f"{tower}-{level}{unit:02d}"
+                owner = None
+                if rng.random() < occupancy:
+                    first, last = _name(rng)
+                    username = f"res.{number.lower()}"
+                    owner = {
+                        "_id": _oid(created, rng), "username": username, "firstName": first, "lastName": last,
+                        "email": f"{username}@residencial.mx", "password": password, "role": "resident",
+                        "phone": f"55{rng.randint(10000000, 99999999)}", "createdAt": created, "updatedAt": created,
+                    }
+                    users.append(owner)
+                apartments.append({
+                    "_id": _oid(created, rng), "number": number, "level": level,
+                    "userId": owner["_id"] if owner else None, "createdAt": created, "updatedAt": created,
+                })
+    staff = [("admin", 3), ("guard", 2 * towers)]
+    for role, count in staff:
+        for i in range(count):
+            first, last = _name(rng)
+            username = f"{role}{i + 1}"
+            users.append({
+                "_id": _oid(start, rng), "username": username, "firstName": first, "lastName": last,
+                "email": f"{username}@residencial.mx", "password": staff_password, "role": role,
+                "phone": f"55{rng.randint(10000000, 99999999)}", "createdAt": start, "updatedAt": start,
+            })
+    return users, apartments
+
+# --- Historial por departamento (tarea del pool) ---------------------------------
+
+def _payments(out, rng, apt, start, now):
+    base = 1200.0 + 50 * (apt["level"] // 5)
+    for year, month in _months(start, now):
+        due = datetime(year, month, 10)
+        if due > now + timedelta(days=31):
+            break
+        age = (now - due).days
+        paid = rng.random() < (0.97 if age > 60 else 0.85 if age > 0 else 0.3)
+        payment_date = due - timedelta(days=5) + timedelta(days=rng.lognormvariate(1.2, 0.8)) if paid else None
+        if payment_date and payment_date > now:
+            payment_date = now
+        created = due - timedelta(days=20)
+        out.add("payments", {
+            "_id": _oid(created, rng), "apartmentId": apt["_id"], "amount": base, "concept": "Mantenimiento mensual",
+            "dueDate": due, "status": "paid" if paid else "pending", "paymentDate": payment_date,
+            "createdAt": created, "updatedAt": payment_date or created,
+        })
+        if month == 3 and rng.random() < 0.9:  # cuota extraordinaria anual
+            out.add("payments", {
+                "_id": _oid(created, rng), "apartmentId": apt["_id"], "amount": 3000.0, "concept": "Cuota extraordinaria",
+                "dueDate": due + timedelta(days=20), "status": "paid" if paid else "pending", "paymentDate": payment_date,
+                "createdAt": created, "updatedAt": payment_date or created,
+            })
+
+def _visits(out, rng, apt, factor, start, now):
+    day = start
+    while day < now:
+        for _ in range(_poisson(rng, 1.5 * factor)):
+            when = day + timedelta(days=rng.randrange(7))
+            # entre semana se descarta un tercio: los fines de semana concentran las visitas
+            if when.weekday() < 5 and rng.random() < 0.35:
+                continue
+            entry = when.replace(hour=rng.choices(VISIT_HOURS, VISIT_HOUR_WEIGHTS)[0], minute=rng.randrange(60))
+            if entry > now:
+                continue
+            exit_time = entry + timedelta(minutes=rng.randint(20, 300))
+            left = exit_time <= now
+            first, last = _name(rng)
+            out.add("visits", {
+                "_id": _oid(entry - timedelta(hours=rng.randint(0, 48)), rng), "apartmentId": apt["_id"],
+                "visitorName": f"{first} {last}", "entryTime": entry, "exitTime": exit_time if left else None,
+                "passExpiresAt": pass_expiry(entry, exit_time if left else None), "status": "left" if left else "inside",
+                "createdAt": entry, "updatedAt": exit_time if left else entry,
+            })
+        day += timedelta(days=7)
+
+def _deliveries(out, rng, apt, factor, start, now):
+    for year, month in _months(start, now):
+        first_day = datetime(year, month, 1)
+        for _ in range(_poisson(rng, 3.0 * factor)):
+            received = first_day + timedelta(days=rng.randrange(28), hours=rng.randint(9, 19), minutes=rng.randrange(60))
+            if received > now:
+                continue
+            delivered = received + timedelta(hours=rng.lognormvariate(1.5, 1.0))
+            done = delivered <= now and rng.random() < 0.98
+            out.add("deliveries", {
+                "_id": _oid(received, rng), "apartmentId": apt["_id"], "receivedDate": received,
+                "deliveredDate": delivered if done else None, "status": "delivered" if done else "pending",
+                "description": f"Paquete {rng.choice(CARRIERS)}", "createdAt": received, "updatedAt": delivered if done else received,
+            })
+
+def _fines(out, rng, apt, owner_name, factor, start, now):
+    years = (now - start).days / 365
+    for _ in range(_poisson(rng, 0.3 * factor ** 2 * years)):
+        fecha = start + timedelta(seconds=rng.randrange(int((now - start).total_seconds())))
+        reason, amount = rng.choice(FINE_REASONS)
+        paid = (now - fecha).days > 45 and rng.random() < 0.8
+        out.add("fines", {
+            "_id": _oid(fecha, rng), "departamento": apt["number"], "propietario": owner_name, "monto": amount,
+            "descripcion": reason, "fecha": fecha, "estatus": "Completo" if paid else "Incompleto",
+            "createdAt": fecha, "updatedAt": fecha,
+        })
+
+def _incidents(out, rng, apt, factor, start, now):
+    years = (now - start).days / 365
+    for _ in range(_poisson(rng, 0.6 * factor * years)):
+        created = start + timedelta(seconds=rng.randrange(int((now - start).total_seconds())))
+        category, title = rng.choice(INCIDENT_CATEGORIES)
+        age = (now - created).days
+        status = "closed" if age > 30 else rng.choice(("open", "in_progress", "closed"))
+        out.add("incidents", {
+            "_id": _oid(created, rng), "userId": apt["userId"], "title": title, "description": f"{title} en {apt['number']}",
+            "status": status, "priority": rng.choices(("low", "medium", "high"), (3, 5, 2))[0], "category": category,
+            "createdAt": created, "updatedAt": created + timedelta(days=min(age, rng.randint(1, 20))),
+        })
+
+def _documents(out, rng, apt, start):
+    for name, kind in rng.sample(DOCUMENT_TYPES, rng.randint(1, len(DOCUMENT_TYPES))):
+        date = start + timedelta(days=rng.randint(0, 60))
+        out.add("documents", {
+            "_id": _oid(date, rng), "userId": apt["userId"], "name": name, "type": kind,
+            "url": f"https://docs.residencial.mx/{apt['number'].lower()}/{kind}.pdf", "date": date, "createdAt": date, "updatedAt": date,
+        })
+
+def seed_history(task: dict) -> Counter:
+    """Tarea del pool: historial completo de un bloque de departamentos."""
+    rng = random.Random(task["seed"])
+    start, now = task["start"], task["now"]
+    out = Writer(mongo.get_db(), task["batch"])
+    for apt, owner_name in task["apartments"]:
+        factor = rng.lognormvariate(0, 0.6)
+        _payments(out, rng, apt, start, now)
+        if apt["userId"] is None:
+            continue  # desocupado: solo genera cuotas
+        _deliveries(out, rng, apt, factor, start, now)
+        _visits(out, rng, apt, factor, start, now)
+        _fines(out, rng, apt, owner_name, factor, start, now)
+        _incidents(out, rng, apt, factor, start, now)
+        _documents(out, rng, apt, start)
+    return out.flush()
+
+def seed_bookings(task: dict) -> Counter:
+    """Tarea del pool: reservas sin traslapes de una instalación y sus booking_slots."""
+    rng = random.Random(task["seed"])
+    residents = task["residents"]
+    out = Writer(mongo.get_db(), task["batch"])
+    day = task["start"].replace(hour=0, minute=0, second=0, microsecond=0)
+    end = task["now"] + timedelta(days=30)
+    busy = 0.25 if task["facility"] in ("alberca", "asadores") else 0.15
+    while day < end:
+        weekend = day.weekday() >= 5
+        hour = 8
+        while hour < 21:
+            if rng.random() < busy * (2 if weekend else 1):
+                hours = min(rng.choice((1, 1, 2, 3)), 22 - hour)
+                inicio = day + timedelta(hours=hour)
+                fin = inicio + timedelta(hours=hours)
+                booking_id = _oid(inicio - timedelta(days=rng.randint(1, 20)), rng)
+                out.add("bookings", {
+                    "_id": booking_id, "userId": rng.choice(residents), "instalacion": task["facility"],
+                    "fechaInicio": inicio, "fechaFin": fin, "createdAt": booking_id.generation_time.replace(tzinfo=None), "updatedAt": inicio,
+                })
+                for s in slot_starts(inicio, fin):
+                    out.add(SLOTS_COLLECTION, {"_id": slot_key(task["facility"], s), "instalacion": task["facility"], "inicio": s, "bookingId": booking_id})
+                hour += hours
+            else:
+                hour += 1
+        day += timedelta(days=1)
+    return out.flush()
+
+def _community(out, rng, start, now):
+    day = start
+    while day < now:
+        for _ in range(_poisson(rng, 2)):
+            date = day + timedelta(days=rng.randrange(7), hours=rng.randint(8, 18))
+            category = rng.choice(ANNOUNCEMENT_CATEGORIES)
+            out.add("announcements", {
+                "_id": _oid(date, rng), "title": f"Aviso de {category}", "description": f"Información de {category} para todos los residentes.",
+                "category": category, "highlight": rng.random() < 0.1, "date": date, "createdAt": date, "updatedAt": date,
+            })
+        day += timedelta(days=7)
+    for i in range(30):
+        _, last = _name(rng)
+        service = rng.choice(SERVICES)
+        out.add("providers", {
+            "_id": _oid(start, rng), "name": f"{service.capitalize()} {last.split()[0]} {i + 1}", "service": service,
+            "email": f"contacto{i + 1}@{service}.mx", "phone": f"55{rng.randint(10000000, 99999999)}",
+            "amount": float(rng.randrange(3000, 40000, 500)), "documentId": None, "createdAt": start, "updatedAt": start,
+        })
+
+# --- Orquestación ---------------------------------------------------------------
+
+def _run(tasks, workers: int, progress):
+    if workers <= 0:
+        for fn, task in tasks:
+            progress(fn(task))
+        return
+    # spawn: cada proceso abre su propio cliente de Mongo
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for future in as_completed([pool.submit(fn, task) for fn, task in tasks]):
+            progress(future.result())
+
+def seed_complex(db, towers=4, levels=20, units=8, years=3, seed=42, workers=4, batch=5000, password="residente", staff_password=None, indexes=True, rollups=True) -> Counter:
+    """
+    Siembra el residencial completo y devuelve los documentos escritos por colección.
+    Administración y guardias nunca usan una contraseña fija: sin `staff_password`
+    se genera una al azar y se imprime una sola vez.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    start = now - timedelta(days=int(365 * years))
+    total = Counter()
+
+    if not staff_password:
+        staff_password = secrets.token_urlsafe(12)
+        print(f"🔑 Contraseña de admin1.. y guard1..: {staff_password}")
+    users, apartments = build_people(rng, towers, levels, units, start, password, staff_password)
+    out = Writer(db, batch)
+    for doc in users:
+        out.add("users", doc)
+    for doc in apartments:
+        out.add("apartments", doc)
+    _community(out, rng, start, now)
+    total.update(out.flush())
+
+    owners = {u["_id"]: f"{u['firstName']} {u['lastName']}" for u in users if u["role"] == "resident"}
+    common = {"start": start, "now": now, "batch": batch}
+    tasks = [
+        (seed_history, {**common, "seed": seed * 1_000_003 + i, "apartments": [(a, owners.get(a["userId"], "")) for a in apartments[i:i + SEED_CHUNK]]})
+        for i in range(0, len(apartments), SEED_CHUNK)
+    ]
+    residents = list(owners)
+    if residents:
+        tasks += [(seed_bookings, {**common, "seed": seed * 7 + j, "facility": f, "residents": residents}) for j, f in enumerate(FACILITIES)]
+
+    started = time.perf_counter()
+
+    def progress(counts):
+        total.update(counts)
+        written = sum(total.values())
+        print(f"  … {written:,} documentos ({written / (time.perf_counter() - started):,.0f}/s)", flush=True)
+
+    _run(tasks, workers, progress)
+
+    if indexes:
+        ensure_indexes(db)
+    if rollups:
+        total["ledger_rollups"] = rebuild_rollups(db)
+    for name in total:
+        bump_version(db, name)  # los ETag anteriores a la siembra dejan de validar
+    return total
+
+def already_seeded(db) -> bool:
+    # booking_slots usa _id fijos por instalación y horario: sembrar dos veces chocaría
+    return db["users"].find_one({"username": "admin1"}, {"_id": 1}) is not None
+
+def check_local(allow_remote: bool):
+    """Sale si MONGO_URI no es local: la siembra crea cuentas de administración."""
+    hosts = {host for host, _ in uri_parser.parse_uri(mongo.MONGO_URI)["nodelist"]}
+    if not allow_remote and not hosts <= LOCAL_HOSTS:
+        sys.exit(f"❌ MONGO_URI apunta a {', '.join(sorted(hosts))}: usa un mongod local o --allow-remote")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Residencial sintético para pruebas de rendimiento")
+    parser.add_argument("--towers", type=int, default=4)
+    parser.add_argument("--levels", type=int, default=20)
+    parser.add_argument("--units", type=int, default=8, help="departamentos por nivel")
+    parser.add_argument("--years", type=float, default=3, help="años de historial")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="procesos (0: en este proceso)")
+    parser.add_argument("--batch", type=int, default=5000, help="documentos por insert_many")
+    parser.add_argument("--password", default="residente", help="contraseña de los residentes")
+    parser.add_argument("--staff-password", help="contraseña de administración y guardias (por defecto: al azar)")
+    parser.add_argument("--drop", action="store_true", help="vaciar antes las colecciones sembradas")
+    parser.add_argument("--no-indexes", action="store_true")
+    parser.add_argument("--no-rollups", action="store_true")
+    parser.add_argument("--allow-remote", action="store_true")
+    args = parser.parse_args(argv)
+
+    check_local(args.allow_remote)
+    db = mongo.get_db()
+    if args.drop:
+        for name in COLLECTIONS:
+            db[name].drop()
+        print(f"🗑️ {len(COLLECTIONS)} colecciones vaciadas")
+    elif already_seeded(db):
+        sys.exit("❌ La base ya tiene un residencial sembrado: usa --drop para regenerarlo")
+
+    started = time.perf_counter()
+    counts = seed_complex(db, args.towers, args.levels, args.units, args.years, args.seed, args.workers, args.batch,
+                          args.password, args.staff_password, indexes=not args.no_indexes, rollups=not args.no_rollups)
+    elapsed = time.perf_counter() - started
+    for name, count in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f"  {name:<16}{count:>12,}")
+    total = sum(counts.values())
+    print(f"✅ {total:,} documentos en {elapsed:.1f}s ({total / elapsed:,.0f}/s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
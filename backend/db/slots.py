@@ -0,0 +1,302 @@
+# backend/db/slots.py
+#
+# Reservas de instalaciones sin traslapes: cada reserva "toma" los bloques de
+# BOOKING_SLOT_MINUTES que cubre en la colección booking_slots, cuyo _id es
+# "<instalacion>|<inicio del bloque>". El índice único de _id hace que el
+# chequeo de conflicto y la toma del bloque sean una sola operación atómica:
+# si dos reservas concurrentes se traslapan, solo una logra insertar el bloque.
+#
+# La disponibilidad se sirve desde un bitmap por instalación/día (bit i =
+# bloque i del día ocupado), cacheado en memoria; un rango de días se carga
+# con una sola consulta por prefijo de _id. Cada toma/liberación incrementa la
+# versión "booking_slots:<instalacion>" (backend/db/versions.py, compartida
+# por todos los workers) y un bitmap solo se sirve si se cargó con la versión
+# vigente: leerla cuesta una consulta por _id en vez del rango de bloques.
+#
+# Los intervalos se amplían a bloques completos (10:10-10:50 ocupa 10:00-11:00
+# con bloques de 30 min): nunca se permite un traslape, a costa de rechazar
+# reservas contiguas que no estén alineadas a bloques.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
+
+from backend.db.versions import abump_version, aget_version, bump_version, get_version
+
+SLOTS_COLLECTION = "booking_slots"
+# Bloques sin reserva más viejos que esto se consideran huérfanos (POST toma los
+# bloques antes de insertar la reserva: los recientes pueden estar en curso)
+ORPHAN_SLOT_GRACE = timedelta(minutes=10)
+BOOKING_SLOT_MINUTES = int(os.getenv("BOOKING_SLOT_MINUTES", 30))
+BOOKING_MAX_HOURS = int(os.getenv("BOOKING_MAX_HOURS", 24))
+
+if 60 % BOOKING_SLOT_MINUTES:
+    raise ValueError("❌ BOOKING_SLOT_MINUTES debe dividir 60 (5, 10, 15, 20, 30, 60)")
+
+SLOT = timedelta(minutes=BOOKING_SLOT_MINUTES)
+SLOTS_PER_DAY = 24 * 60 // BOOKING_SLOT_MINUTES
+
+# Caché de bitmaps por (instalacion, día), validada por versión; el TTL solo
+# acota cuánto vive una entrada que nadie vuelve a pedir.
+AVAILABILITY_CACHE_SIZE = int(os.getenv("AVAILABILITY_CACHE_SIZE", 2048))
+AVAILABILITY_CACHE_TTL = float(os.getenv("AVAILABILITY_CACHE_TTL", 60))
+AVAILABILITY_MAX_DAYS = 62
+
+def _utc(value: datetime) -> datetime:
+    # Mongo guarda datetimes UTC sin zona
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def slot_floor(value: datetime) -> datetime:
+    value = _utc(value).replace(second=0, microsecond=0)
+    return value - timedelta(minutes=value.minute % BOOKING_SLOT_MINUTES)
+
+def slot_key(instalacion: str, inicio: datetime) -> str:
+    return f"{instalacion}|{inicio:%Y-%m-%dT%H:%M}"
+
+def slot_starts(inicio: datetime, fin: datetime):
+    """Inicios de bloque que cubren [inicio, fin)."""
+    inicio, fin = _utc(inicio), _utc(fin)
+    if fin <= inicio:
+        raise HTTPException(status_code=400, detail="fechaFin debe ser posterior a fechaInicio")
+    if fin - inicio > timedelta(hours=BOOKING_MAX_HOURS):
+        raise HTTPException(status_code=400, detail=f"Una reserva no puede durar más de {BOOKING_MAX_HOURS} horas")
+    starts = []
+    current = slot_floor(inicio)
+    while current < fin:
+        starts.append(current)
+        current += SLOT
+    return starts
+
+def _slot_docs(booking_id, instalacion, inicio, fin, skip=()):
+    return [
+        {"_id": slot_key(instalacion, s), "instalacion": instalacion, "inicio": s, "bookingId": booking_id}
+        for s in slot_starts(inicio, fin)
+        if slot_key(instalacion, s) not in skip
+    ]
+
+def _conflict():
+    return HTTPException(status_code=409, detail="Conflicto: ya existe una reserva en ese horario.")
+
+# --- Bitmaps de ocupación ---------------------------------------------------
+
+_bitmaps = OrderedDict()  # (instalacion, date) -> (bitmap, versión, cargado_en)
+_bitmaps_lock = threading.Lock()
+
+def _parse_key(key: str):
+    instalacion, _, stamp = key.rpartition("|")
+    inicio = datetime.strptime(stamp, "%Y-%m-%dT%H:%M")
+    return instalacion, inicio.date(), (inicio.hour * 60 + inicio.minute) // BOOKING_SLOT_MINUTES
+
+def _version_name(instalacion: str) -> str:
+    return f"{SLOTS_COLLECTION}:{instalacion}"
+
+def _changed(keys):
+    """Instalaciones cuyos bitmaps dejan de valer tras tomar/liberar `keys`."""
+    return {key.rpartition("|")[0] for key in keys}
+
+def _touch(db, keys):
+    # Después de escribir: un lector que leyó la versión anterior no puede guardar
+    # su bitmap como vigente
+    for instalacion in _changed(keys):
+        bump_version(db, _version_name(instalacion))
+
+async def _atouch(db, keys):
+    for instalacion in _changed(keys):
+        await abump_version(db, _version_name(instalacion))
+
+def _cached_bitmaps(instalacion: str, days, version: int):
+    now = time.monotonic()
+    found, missing = {}, []
+    with _bitmaps_lock:
+        for day in days:
+            entry = _bitmaps.get((instalacion, day))
+            if entry is not None and entry[1] == version and now - entry[2] < AVAILABILITY_CACHE_TTL:
+                _bitmaps.move_to_end((instalacion, day))
+                found[day] = entry[0]
+            else:
+                missing.append(day)
+    return found, missing
+
+def _store_bitmaps(instalacion: str, days, keys, version: int):
+    bitmaps = dict.fromkeys(days, 0)
+    for key in keys:
+        _, day, bit = _parse_key(key)
+        if day in bitmaps:
+            bitmaps[day] |= 1 << bit
+    now = time.monotonic()
+    with _bitmaps_lock:
+        for day, bits in bitmaps.items():
+            _bitmaps[(instalacion, day)] = (bits, version, now)
+            _bitmaps.move_to_end((instalacion, day))
+        while len(_bitmaps) > AVAILABILITY_CACHE_SIZE:
+            _bitmaps.popitem(last=False)
+    return bitmaps
+
+def _day_range(desde: date, hasta: date):
+    if hasta < desde:
+        raise HTTPException(status_code=400, detail="hasta debe ser igual o posterior a desde")
+    days = (hasta - desde).days + 1
+    if days > AVAILABILITY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"El rango no puede superar {AVAILABILITY_MAX_DAYS} días")
+    return [desde + timedelta(days=i) for i in range(days)]
+
+def _range_query(instalacion: str, days):
+    # Los _id de un rango de días son contiguos en el índice de _id
+    return {"_id": {
+        "$gte": f"{instalacion}|{days[0]:%Y-%m-%d}",
+        "$lt": f"{instalacion}|{days[-1] + timedelta(days=1):%Y-%m-%d}",
+    }}
+
+def day_bitmaps(db, instalacion: str, desde: date, hasta: date) -> dict:
+    """{día: bitmap} para [desde, hasta]; los días no cacheados se cargan en una consulta."""
+    days = _day_range(desde, hasta)
+    # La versión se lee antes que los bloques: una escritura concurrente la deja vieja
+    version = get_version(db, _version_name(instalacion))
+    found, missing = _cached_bitmaps(instalacion, days, version)
+    if missing:
+        missing_days = [missing[0] + timedelta(days=i) for i in range((missing[-1] - missing[0]).days + 1)]
+        keys = [d["_id"] for d in db[SLOTS_COLLECTION].find(_range_query(instalacion, missing_days), {"_id": 1})]
+        found.update(_store_bitmaps(instalacion, missing_days, keys, version))
+    return {day: found[day] for day in days}
+
+async def aday_bitmaps(db, instalacion: str, desde: date, hasta: date) -> dict:
+    days = _day_range(desde, hasta)
+    version = await aget_version(db, _version_name(instalacion))
+    found, missing = _cached_bitmaps(instalacion, days, version)
+    if missing:
+        missing_days = [missing[0] + timedelta(days=i) for i in range((missing[-1] - missing[0]).days + 1)]
+        keys = [d["_id"] async for d in db[SLOTS_COLLECTION].find(_range_query(instalacion, missing_days), {"_id": 1})]
+        found.update(_store_bitmaps(instalacion, missing_days, keys, version))
+    return {day: found[day] for day in days}
+
+def clear_availability_cache():
+    with _bitmaps_lock:
+        _bitmaps.clear()
+
+# --- Toma / liberación de bloques ---------------------------------------------
+
+def _rollback(db, booking_id, docs):
+    try:
+        keys = [d["_id"] for d in docs]
+        db[SLOTS_COLLECTION].delete_many({"bookingId": booking_id, "_id": {"$in": keys}})
+        _touch(db, keys)  # un lector pudo ver los bloques mientras estuvieron tomados
+    except PyMongoError:
+        pass  # se relanza el error original; sweep_orphan_slots limpia lo que quede
+
+async def _arollback(db, booking_id, docs):
+    try:
+        keys = [d["_id"] for d in docs]
+        await db[SLOTS_COLLECTION].delete_many({"bookingId": booking_id, "_id": {"$in": keys}})
+        await _atouch(db, keys)
+    except PyMongoError:
+        pass
+
+def claim_slots(db, booking_id, instalacion: str, inicio: datetime, fin: datetime, owned=()):
+    """
+    Toma los bloques de la reserva en una sola escritura (ordered insert_many).
+    Con conflicto deshace los bloques recién tomados y lanza 409.
+    `owned` son los _id que la reserva ya tenía (PATCH) y no se vuelven a insertar.
+    Devuelve los _id de todos los bloques del nuevo intervalo.
+    """
+    docs = _slot_docs(booking_id, instalacion, inicio, fin, skip=set(owned))
+    if docs:
+        try:
+            db[SLOTS_COLLECTION].insert_many(docs, ordered=True)
+        except PyMongoError as e:
+            # Conflicto, timeout o conexión caída a mitad del insert: se deshace lo que haya entrado
+            _rollback(db, booking_id, docs)
+            if isinstance(e, (BulkWriteError, DuplicateKeyError)):
+                raise _conflict()
+            raise
+        _touch(db, [d["_id"] for d in docs])
+    return [slot_key(instalacion, s) for s in slot_starts(inicio, fin)]
+
+def _release_query(booking_id, keep):
+    query = {"bookingId": booking_id}
+    if keep:
+        query["_id"] = {"$nin": list(keep)}
+    return query
+
+def release_slots(db, booking_id, keep=()):
+    """Libera los bloques de la reserva (salvo los de `keep`)."""
+    query = _release_query(booking_id, keep)
+    keys = [d["_id"] for d in db[SLOTS_COLLECTION].find(query, {"_id": 1})]
+    if keys:
+        db[SLOTS_COLLECTION].delete_many({"_id": {"$in": keys}, "bookingId": booking_id})
+        _touch(db, keys)
+
+def owned_slots(db, booking_id):
+    return [d["_id"] for d in db[SLOTS_COLLECTION].find({"bookingId": booking_id}, {"_id": 1})]
+
+async def aclaim_slots(db, booking_id, instalacion: str, inicio: datetime, fin: datetime, owned=()):
+    docs = _slot_docs(booking_id, instalacion, inicio, fin, skip=set(owned))
+    if docs:
+        try:
+            await db[SLOTS_COLLECTION].insert_many(docs, ordered=True)
+        except PyMongoError as e:
+            await _arollback(db, booking_id, docs)
+            if isinstance(e, (BulkWriteError, DuplicateKeyError)):
+                raise _conflict()
+            raise
+        await _atouch(db, [d["_id"] for d in docs])
+    return [slot_key(instalacion, s) for s in slot_starts(inicio, fin)]
+
+async def arelease_slots(db, booking_id, keep=()):
+    query = _release_query(booking_id, keep)
+    keys = [d["_id"] async for d in db[SLOTS_COLLECTION].find(query, {"_id": 1})]
+    if keys:
+        await db[SLOTS_COLLECTION].delete_many({"_id": {"$in": keys}, "bookingId": booking_id})
+        await _atouch(db, keys)
+
+async def aowned_slots(db, booking_id):
+    return [d["_id"] async for d in db[SLOTS_COLLECTION].find({"bookingId": booking_id}, {"_id": 1})]
+
+def sweep_orphan_slots(db, grace: timedelta = ORPHAN_SLOT_GRACE) -> int:
+    """
+    Borra los bloques cuya reserva ya no existe (liberación fallida tras un
+    DELETE, rollback interrumpido). Solo mira reservas cuyo ObjectId tenga más
+    de `grace`: las más nuevas pueden estar entre la toma y el insert.
+    Devuelve cuántos bloques se liberaron.
+    """
+    cutoff = datetime.now(timezone.utc) - grace
+    candidates = [b for b in db[SLOTS_COLLECTION].distinct("bookingId") if not isinstance(b, ObjectId) or b.generation_time < cutoff]
+    removed = 0
+    for i in range(0, len(candidates), 1000):
+        chunk = candidates[i:i + 1000]
+        existing = {d["_id"] for d in db["bookings"].find({"_id": {"$in": chunk}}, {"_id": 1})}
+        orphans = [b for b in chunk if b not in existing]
+        if not orphans:
+            continue
+        keys = [d["_id"] for d in db[SLOTS_COLLECTION].find({"bookingId": {"$in": orphans}}, {"_id": 1})]
+        removed += db[SLOTS_COLLECTION].delete_many({"_id": {"$in": keys}, "bookingId": {"$in": orphans}}).deleted_count
+        _touch(db, keys)
+    return removed
+
+def backfill_slots(db):
+    """
+    Genera los bloques de las reservas existentes (creadas antes de booking_slots).
+    Devuelve las reservas que se traslapan con otra y no pudieron tomar sus bloques.
+    """
+    conflicts = []
+    for booking in db["bookings"].find({}, {"instalacion": 1, "fechaInicio": 1, "fechaFin": 1}).sort("fechaInicio", 1):
+        inicio, fin = booking.get("fechaInicio"), booking.get("fechaFin")
+        if isinstance(inicio, str):
+            inicio = datetime.fromisoformat(inicio)
+        if isinstance(fin, str):
+            fin = datetime.fromisoformat(fin)
+        if not isinstance(inicio, datetime) or not isinstance(fin, datetime):
+            continue
+        owned = owned_slots(db, booking["_id"])
+        try:
+            claim_slots(db, booking["_id"], booking.get("instalacion", ""), inicio, fin, owned=owned)
+        except HTTPException:
+            conflicts.append(str(booking["_id"]))
+    return conflicts
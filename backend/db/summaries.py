@@ -0,0 +1,79 @@
+# backend/db/summaries.py
+#
+# Resúmenes para dashboards calculados en MongoDB con un solo $facet:
+# total, por estatus, por concepto, por apartamento y por mes. El $match
+# inicial usa los mismos filtros que el listado (y por lo tanto sus índices).
+
+import os
+from typing import List, Optional
+
+from bson import ObjectId
+from pydantic import BaseModel
+
+# Máximo de grupos por concepto/apartamento (los de mayor monto)
+SUMMARY_TOP = int(os.getenv("SUMMARY_TOP", 50))
+
+class SummaryGroup(BaseModel):
+    key: Optional[str] = None
+    count: int
+    amount: float
+
+class Summary(BaseModel):
+    count: int
+    amount: float
+    byStatus: List[SummaryGroup]
+    byConcept: List[SummaryGroup]
+    byApartment: List[SummaryGroup]
+    byMonth: List[SummaryGroup]
+
+def _group(key):
+    return {"$group": {"_id": key, "count": {"$sum": 1}, "amount": {"$sum": "$_amount"}}}
+
+def summary_pipeline(query: dict, amount: str, status: str, concept: str, apartment: str, date: str, top: int = SUMMARY_TOP):
+    month = {"$dateToString": {
+        "format": "%Y-%m",
+        # Fechas guardadas como string se convierten; las inválidas caen en null
+        "date": {"$convert": {"input": f"${date}", "to": "date", "onError": None, "onNull": None}},
+    }}
+    by_amount = [{"$sort": {"amount": -1, "_id": 1}}, {"$limit": top}]
+    return [
+        {"$match": query},
+        {"$project": {
+            "_amount": {"$convert": {"input": f"${amount}", "to": "double", "onError": 0, "onNull": 0}},
+            "_status": f"${status}",
+            "_concept": f"${concept}",
+            "_apartment": f"${apartment}",
+            "_month": month,
+        }},
+        {"$facet": {
+            "total": [_group(None)],
+            "byStatus": [_group("$_status"), {"$sort": {"_id": 1}}],
+            "byConcept": [_group("$_concept")] + by_amount,
+            "byApartment": [_group("$_apartment")] + by_amount,
+            "byMonth": [_group("$_month"), {"$sort": {"_id": 1}}],
+        }},
+    ]
+
+def _groups(rows):
+    return [
+        {"key": str(r["_id"]) if isinstance(r["_id"], ObjectId) else r["_id"], "count": r["count"], "amount": r["amount"]}
+        for r in rows
+    ]
+
+def shape_summary(result: dict) -> dict:
+    total = result["total"][0] if result["total"] else {"count": 0, "amount": 0.0}
+    return {
+        "count": total["count"],
+        "amount": total["amount"],
+        "byStatus": _groups(result["byStatus"]),
+        "byConcept": _groups(result["byConcept"]),
+        "byApartment": _groups(result["byApartment"]),
+        "byMonth": _groups(result["byMonth"]),
+    }
+
+def summarize(collection, query: dict, **fields) -> dict:
+    return shape_summary(next(collection.aggregate(summary_pipeline(query, **fields))))
+
+async def asummarize(collection, query: dict, **fields) -> dict:
+    cursor = await collection.aggregate(summary_pipeline(query, **fields))
+    return shape_summary((await cursor.to_list(1))[0])
@@ -0,0 +1,22 @@
+# backend/db/versions.py
+#
+# Contador de versión por colección, guardado en Mongo para que todos los
+# workers lo compartan. Cada escritura hecha por las rutas lo incrementa y
+# los ETag de list/get se derivan de él (backend/utils/etag.py): revalidar un
+# listado cuesta una lectura por _id en vez de la consulta completa.
+
+VERSIONS_COLLECTION = "collection_versions"
+
+def bump_version(db, name: str):
+    db[VERSIONS_COLLECTION].update_one({"_id": name}, {"$inc": {"v": 1}}, upsert=True)
+
+def get_version(db, name: str) -> int:
+    doc = db[VERSIONS_COLLECTION].find_one({"_id": name})
+    return doc["v"] if doc else 0
+
+async def abump_version(db, name: str):
+    await db[VERSIONS_COLLECTION].update_one({"_id": name}, {"$inc": {"v": 1}}, upsert=True)
+
+async def aget_version(db, name: str) -> int:
+    doc = await db[VERSIONS_COLLECTION].find_one({"_id": name})
+    return doc["v"] if doc else 0
@@ -1,15 +1,54 @@
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from backend.db import mongo
+from backend.db.indexes import ensure_indexes
+from backend.db.slots import sweep_orphan_slots
+from backend.routes.async_crud import with_handlers
 from backend.routes import users, auth, apartments, bookings, deliveries, documents, incidents, payments, providers, reserves, announcements, fines
-from backend.routes import visits
+from backend.routes import visits, health, live, metrics, debug
+from backend.db.changes import hub
+from backend.db.gate import gate
+from backend.utils.qr import shutdown_pool
+from backend.utils.responses import FAST_JSON, FastJSONResponse
+from backend.utils.logs import configure_logging
+from backend.utils.metrics import METRICS_ENABLED, MetricsMiddleware
+from backend.db.profiler import SLOW_QUERY_ENABLED, ProfilerMiddleware
+from fastapi.responses import JSONResponse
+
+ASYNC_MODE = mongo.MONGO_MODE == "async"
+
+configure_logging()
+
+# Un solo cliente MongoDB (con su pool) para todas las rutas
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    mongo.connect()
+    if ASYNC_MODE:
+        mongo.connect_async()
+    if os.getenv("MONGO_ENSURE_INDEXES", "false").lower() == "true":
+        ensure_indexes(mongo.get_db())
+        # Bloques de reservas borradas cuya liberación falló
+        sweep_orphan_slots(mongo.get_db())
+    yield
+    hub.stop()
+    gate.stop()
+    shutdown_pool()
+    if ASYNC_MODE:
+        await mongo.close_async()
+    mongo.close()
 
 app = FastAPI(
     title="Milovat API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # FAST_JSON=true: orjson para todas las respuestas
+    default_response_class=FastJSONResponse if FAST_JSON else JSONResponse,
 )
 
 app.add_middleware(
@@ -18,22 +57,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
-# Rutas
-app.include_router(users.router, prefix="/users", tags=["Usuarios"])
-app.include_router(auth.router, prefix="/auth", tags=["Autenticación"])
-app.include_router(apartments.router, prefix="/apartments", tags=["Apartments"])
-app.include_router(bookings.router, prefix="/bookings", tags=["Bookings"])
-app.include_router(deliveries.router, prefix="/deliveries", tags=["Deliveries"])
-app.include_router(documents.router, prefix="/documents", tags=["Documents"])
-app.include_router(incidents.router, prefix="/incidents", tags=["Incidents"])
-app.include_router(payments.router, prefix="/payments", tags=["Payments"])
-app.include_router(providers.router, prefix="/providers", tags=["Providers"])
-app.include_router(reserves.router, prefix="/reserves", tags=["Reserves"])
-app.include_router(announcements.router, prefix="/announcements", tags=["Announcements"])
-app.include_router(fines.router, prefix="/fines", tags=["Multas"])
-app.include_router(visits.router, prefix="/visits", tags=["Visits"])
+# Latencia por ruta (GET /metrics); va por fuera de CORS para medir también los preflight
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Ruta de origen de cada consulta lenta (GET /debug/slow-queries)
+if SLOW_QUERY_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
+# Rutas — en MONGO_MODE=async se montan los handlers async de cada módulo
+def mount(module, prefix, tags):
+    router = module.router
+    if ASYNC_MODE and hasattr(module, "async_handlers"):
+        router = with_handlers(router, module.async_handlers)
+    app.include_router(router, prefix=prefix, tags=tags)
+
+mount(users, "/users", ["Usuarios"])
+mount(auth, "/auth", ["Autenticación"])
+mount(apartments, "/apartments", ["Apartments"])
+mount(bookings, "/bookings", ["Bookings"])
+mount(deliveries, "/deliveries", ["Deliveries"])
+mount(documents, "/documents", ["Documents"])
+mount(incidents, "/incidents", ["Incidents"])
+mount(payments, "/payments", ["Payments"])
+mount(providers, "/providers", ["Providers"])
+mount(reserves, "/reserves", ["Reserves"])
+mount(announcements, "/announcements", ["Announcements"])
+mount(fines, "/fines", ["Multas"])
+mount(visits, "/visits", ["Visits"])
+app.include_router(health.router, prefix="/health", tags=["Health"])
+app.include_router(live.router, prefix="/live", tags=["Live"])
+app.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
+app.include_router(debug.router, prefix="/debug", tags=["Debug"])
 
 @app.get("/")
 def root():
@@ -1,28 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pymongo.database import Database
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Optional
 from datetime import datetime
-from bson import ObjectId
-
-from backend.db.mongo import get_db
-from backend.utils.security import verify_token
-
-router = APIRouter()
-
-# Serializador robusto
-def serialize_announcement(a):
-    return {
-        "_id": str(a.get("_id", "")),
-        "title": a.get("title", "Sin título"),
-        "description": a.get("description", "Sin descripción"),
-        "category": a.get("category", "general"),
-        "highlight": a.get("highlight", False),
-        "imageUrl": a.get("imageUrl", ""),
-        "date": a.get("date", datetime.utcnow()),
-        "createdAt": a.get("createdAt", datetime.utcnow()),
-        "updatedAt": a.get("updatedAt", datetime.utcnow()),
-    }
+
+from backend.routes.async_crud import crud_handlers
+from backend.routes.factory import CollectionSpec, build_router
+from backend.utils.pagination import date_range
+from backend.utils.serializers import Field, compile_serializer, ID, NOW
+
+# Serializador robusto (compilado)
+serialize_announcement = compile_serializer([
+    Field("_id", ID, ""),
+    Field("title", default="Sin título"),
+    Field("description", default="Sin descripción"),
+    Field("category", default="general"),
+    Field("highlight", default=False),
+    Field("imageUrl", default=""),
+    Field("date", default=NOW),
+    Field("createdAt", default=NOW),
+    Field("updatedAt", default=NOW),
+], "serialize_announcement")
 
 # Modelos de entrada y salida
 class AnnouncementIn(BaseModel):
@@ -37,24 +33,38 @@ class AnnouncementOut(AnnouncementIn):
     createdAt: datetime
     updatedAt: datetime
 
-# GET /announcements
-@router.get("", response_model=List[AnnouncementOut], dependencies=[Depends(verify_token)])
-def get_announcements(db: Database = Depends(get_db)):
-    try:
-        data = db["announcements"].find().sort("date", -1)
-        return [serialize_announcement(a) for a in data]
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener anuncios: {str(e)}")
-
-# POST /announcements
-@router.post("", response_model=AnnouncementOut, dependencies=[Depends(verify_token)])
-def create_announcement(data: AnnouncementIn, db: Database = Depends(get_db)):
-    try:
-        now = datetime.utcnow()
-        anuncio = data.dict()
-        anuncio.update({"createdAt": now, "updatedAt": now})
-        result = db["announcements"].insert_one(anuncio)
-        new = db["announcements"].find_one({"_id": result.inserted_id})
-        return serialize_announcement(new)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al crear anuncio: {str(e)}")
\ No newline at end of file
+# Filtros de GET /announcements
+async def announcement_filters(
+    category: Optional[str] = None,
+    highlight: Optional[bool] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+) -> dict:
+    query = date_range("date", desde, hasta)
+    if category:
+        query["category"] = category
+    if highlight is not None:
+        query["highlight"] = highlight
+    return query
+
+spec = CollectionSpec(
+    name="announcements",
+    singular="announcement",
+    serializer=serialize_announcement,
+    model_in=AnnouncementIn,
+    model_out=AnnouncementOut,
+    filters=announcement_filters,
+    etag=True,
+    cache=True,
+    sort_field="date",
+    label="anuncio",
+    label_plural="anuncios",
+    root="",
+    operations=("list", "export", "create"),
+)
+
+# GET/POST /announcements, GET /announcements/export
+router = build_router(spec)
+
+# Variante async (MONGO_MODE=async)
+async_handlers = crud_handlers(spec)
@@ -1,22 +1,23 @@
 # backend/routes/apartments.py
 
-from fastapi import APIRouter, HTTPException, Depends
-from pymongo.database import Database
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel
+from typing import Optional
 from datetime import datetime
-from bson import ObjectId
-from backend.db.mongo import get_db
-from backend.utils.security import verify_token
+from backend.db.owners import forget_owners, aforget_owners
+from backend.routes.async_crud import crud_handlers
+from backend.routes.factory import CollectionSpec, build_router
+from backend.utils.pagination import id_filter
+from backend.utils.serializers import Field, compile_serializer, ID
 
-router = APIRouter()
-
-# Utilidad para convertir ObjectId a string
-def serialize_apartment(apartment):
-    apartment["_id"] = str(apartment["_id"])
-    if "userId" in apartment and apartment["userId"]:
-        apartment["userId"] = str(apartment["userId"])
-    return apartment
+# Convierte ObjectId a string sin mutar el documento
+serialize_apartment = compile_serializer([
+    Field("_id", ID),
+    Field("number"),
+    Field("level"),
+    Field("userId", ID),
+    Field("createdAt"),
+    Field("updatedAt"),
+], "serialize_apartment")
 
 # Pydantic model para entrada
 class ApartmentIn(BaseModel):
@@ -30,46 +31,38 @@ class ApartmentOut(ApartmentIn):
     createdAt: datetime
     updatedAt: datetime
 
-# GET /apartments — Listar todos
-@router.get("/", response_model=List[ApartmentOut], dependencies=[Depends(verify_token)])
-def get_apartments(db: Database = Depends(get_db)):
-    apartments = list(db["apartments"].find())
-    return [serialize_apartment(a) for a in apartments]
-
-# GET /apartments/{id} — Obtener por ID
-@router.get("/{id}", response_model=ApartmentOut, dependencies=[Depends(verify_token)])
-def get_apartment(id: str, db: Database = Depends(get_db)):
-    apartment = db["apartments"].find_one({"_id": ObjectId(id)})
-    if not apartment:
-        raise HTTPException(status_code=404, detail="Apartamento no encontrado")
-    return serialize_apartment(apartment)
+# Filtros de GET /apartments
+async def apartment_filters(
+    level: Optional[int] = None,
+    userId: Optional[str] = None,
+) -> dict:
+    query = {}
+    if level is not None:
+        query["level"] = level
+    if userId:
+        query["userId"] = id_filter(userId)
+    return query
 
-# POST /apartments — Crear
-@router.post("/", response_model=ApartmentOut, dependencies=[Depends(verify_token)])
-def create_apartment(data: ApartmentIn, db: Database = Depends(get_db)):
-    now = datetime.utcnow()
-    apartment = data.dict()
-    apartment.update({"createdAt": now, "updatedAt": now})
-    result = db["apartments"].insert_one(apartment)
-    apartment["_id"] = str(result.inserted_id)
-    apartment["createdAt"] = now
-    apartment["updatedAt"] = now
-    return apartment
+spec = CollectionSpec(
+    name="apartments",
+    singular="apartment",
+    serializer=serialize_apartment,
+    model_in=ApartmentIn,
+    model_out=ApartmentOut,
+    filters=apartment_filters,
+    etag=True,
+    cache=True,
+    label="apartamento",
+    label_plural="apartamentos",
+    not_found="Apartamento no encontrado",
+    deleted="Apartamento eliminado",
+    # Cambia el dueño de un apartamento -> se recalcula su alcance en /mine
+    on_change=forget_owners,
+    aon_change=aforget_owners,
+)
 
-# PATCH /apartments/{id} — Actualizar
-@router.patch("/{id}", response_model=ApartmentOut, dependencies=[Depends(verify_token)])
-def update_apartment(id: str, data: ApartmentIn, db: Database = Depends(get_db)):
-    update_data = {k: v for k, v in data.dict().items() if v is not None}
-    update_data["updatedAt"] = datetime.utcnow()
-    result = db["apartments"].update_one({"_id": ObjectId(id)}, {"$set": update_data})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Apartamento no encontrado")
-    return serialize_apartment(db["apartments"].find_one({"_id": ObjectId(id)}))
+# GET/POST /apartments, GET /apartments/export, GET/PATCH/DELETE /apartments/{id}
+router = build_router(spec)
 
-# DELETE /apartments/{id} — Eliminar
-@router.delete("/{id}", dependencies=[Depends(verify_token)])
-def delete_apartment(id: str, db: Database = Depends(get_db)):
-    result = db["apartments"].delete_one({"_id": ObjectId(id)})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Apartamento no encontrado")
-    return {"msg": "Apartamento eliminado"}
\ No newline at end of file
+# Variante async (MONGO_MODE=async)
+async_handlers = crud_handlers(spec)
@@ -0,0 +1,194 @@
+# backend/routes/async_crud.py
+#
+# Handlers async (AsyncMongoClient) para el modo MONGO_MODE=async.
+# crud_handlers() construye los equivalentes async de un CollectionSpec y
+# main.py los monta con with_handlers(), que conserva rutas, orden y response_model.
+
+from typing import Any, List
+
+from fastapi import APIRouter, Body, HTTPException, Depends, Request, Response
+from fastapi.routing import APIRoute
+from pymongo.asynchronous.database import AsyncDatabase
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from backend.db.bulk import BulkIds, bulk_result, check_bulk_size, adelete_docs, ainsert_docs, aupdate_docs, validate_items
+from backend.db.crud import ainsert_returning, aupdate_returning, aupdate_with_before
+from backend.db.mongo import get_async_db
+from backend.db.owners import aowner_filter
+from backend.db.versions import aget_version
+from backend.utils.pagination import PageParams, page_params, apaginate
+from backend.utils.responses import json_response, trusted
+from backend.utils.cache import acached_response, query_key
+from backend.utils.etag import aconditional, make_etag
+from backend.utils.security import verify_token
+from backend.routes.factory import anotify_change, anotify_changes, bulk_create_item, bulk_update_item, bulk_id
+
+def crud_handlers(spec):
+    """
+    Construye list/get/create/update/delete async para `spec`, nombrados
+    igual que las rutas sync (get_payments, get_payment, ...).
+    """
+    coll = spec.name
+    serialize = spec.serializer
+    handlers = {}
+
+    async def list_docs(request: Request, response: Response, query: dict = Depends(spec.filters), page: PageParams = Depends(page_params), db: AsyncDatabase = Depends(get_async_db)):
+        async def load():
+            if spec.cache:
+                key = query_key(query, page.limit, page.cursor, page.fields)
+                return await acached_response(coll, key, lambda: apaginate(db[coll], query, page, serialize, sort_field=spec.sort_field, model=spec.model_out))
+            return await apaginate(db[coll], query, page, serialize, sort_field=spec.sort_field, model=spec.model_out)
+
+        try:
+            etag = make_etag(await aget_version(db, coll), query, page.limit, page.cursor, page.fields) if spec.etag else None
+            return await aconditional(request, response, etag, load)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al obtener {spec.label_plural}: {str(e)}")
+
+    async def list_mine(request: Request, query: dict = Depends(spec.filters), page: PageParams = Depends(page_params), payload: dict = Depends(verify_token), db: AsyncDatabase = Depends(get_async_db)):
+        try:
+            requested = request.query_params.get(spec.owner_field)
+            query = {**query, spec.owner_field: await aowner_filter(db, spec.owner_field, payload, requested)}
+            return await apaginate(db[coll], query, page, serialize, sort_field=spec.sort_field, model=spec.model_out)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al obtener {spec.label_plural}: {str(e)}")
+
+    async def find_doc(id: str, db: AsyncDatabase):
+        try:
+            doc = await db[coll].find_one({"_id": ObjectId(id)})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al obtener {spec.label}: {str(e)}")
+        if not doc:
+            raise HTTPException(status_code=404, detail=spec.not_found)
+        return serialize(doc)
+
+    async def get_doc(id: str, request: Request, response: Response, db: AsyncDatabase = Depends(get_async_db)):
+        async def encoded():
+            return json_response(await find_doc(id, db))
+
+        async def load():
+            if spec.cache:
+                return await acached_response(coll, f"id:{id}", encoded)
+            return trusted(await find_doc(id, db))
+
+        etag = make_etag(await aget_version(db, coll), id) if spec.etag else None
+        return await aconditional(request, response, etag, load)
+
+    async def delete_doc(id: str, db: AsyncDatabase = Depends(get_async_db)):
+        try:
+            if spec.aon_change is None:
+                before = None
+                deleted = (await db[coll].delete_one({"_id": ObjectId(id)})).deleted_count
+            else:
+                before = await db[coll].find_one_and_delete({"_id": ObjectId(id)})
+                deleted = before is not None
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al eliminar {spec.label}: {str(e)}")
+        if not deleted:
+            raise HTTPException(status_code=404, detail=spec.not_found)
+        if spec.aon_change is not None or spec.cache or spec.etag:
+            await anotify_change(spec, db, before, None)
+        return {"msg": spec.deleted}
+
+    async def delete_many(body: BulkIds, db: AsyncDatabase = Depends(get_async_db)):
+        check_bulk_size(body.ids)
+        try:
+            valid, results = validate_items(body.ids, bulk_id)
+            written, changes = await adelete_docs(db[coll], valid, with_before=spec.aon_change is not None or spec.aon_changes is not None)
+            results.update(written)
+            await anotify_changes(spec, db, changes)
+            return bulk_result(results, len(body.ids))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al eliminar {spec.label_plural}: {str(e)}")
+
+    handlers[f"get_{coll}"] = list_docs
+    if spec.owner_field:
+        handlers[f"get_my_{coll}"] = list_mine
+    handlers[f"get_{spec.singular}"] = get_doc
+    handlers[f"delete_{spec.singular}"] = delete_doc
+    handlers[f"delete_{coll}_bulk"] = delete_many
+
+    if spec.model_in is not None:
+        model_in = spec.model_in
+        patch_model = spec.update_model or model_in
+
+        async def create_doc(data: model_in, db: AsyncDatabase = Depends(get_async_db)):
+            try:
+                doc = await ainsert_returning(db[coll], spec.to_object_ids(data.dict()))
+                await anotify_change(spec, db, None, doc)
+                return trusted(serialize(doc))
+            except InvalidId:
+                raise HTTPException(status_code=400, detail="ID inválido")
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error al crear {spec.label}: {str(e)}")
+
+        async def update_doc(id: str, data: patch_model, db: AsyncDatabase = Depends(get_async_db)):
+            try:
+                update_data = spec.to_object_ids({k: v for k, v in data.dict().items() if v is not None})
+                if spec.aon_change is None:
+                    before = None
+                    updated = await aupdate_returning(db[coll], id, update_data)
+                else:
+                    before, updated = await aupdate_with_before(db[coll], id, update_data)
+                if updated is None:
+                    raise HTTPException(status_code=404, detail=spec.not_found)
+                if spec.aon_change is not None or spec.cache or spec.etag:
+                    await anotify_change(spec, db, before, updated)
+                return trusted(serialize(updated))
+            except HTTPException:
+                raise
+            except InvalidId:
+                raise HTTPException(status_code=400, detail="ID inválido")
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error al actualizar {spec.label}: {str(e)}")
+
+        async def create_many(items: List[Any] = Body(...), db: AsyncDatabase = Depends(get_async_db)):
+            check_bulk_size(items)
+            try:
+                valid, results = validate_items(items, lambda raw: bulk_create_item(spec, raw))
+                written, inserted = await ainsert_docs(db[coll], valid)
+                results.update(written)
+                await anotify_changes(spec, db, [(None, doc) for doc in inserted])
+                return bulk_result(results, len(items))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error al crear {spec.label_plural}: {str(e)}")
+
+        async def update_many(items: List[Any] = Body(...), db: AsyncDatabase = Depends(get_async_db)):
+            check_bulk_size(items)
+            try:
+                valid, results = validate_items(items, lambda raw: bulk_update_item(spec, raw))
+                written, changes = await aupdate_docs(db[coll], valid, with_before=spec.aon_change is not None or spec.aon_changes is not None)
+                results.update(written)
+                await anotify_changes(spec, db, changes)
+                return bulk_result(results, len(items))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error al actualizar {spec.label_plural}: {str(e)}")
+
+        handlers[f"create_{spec.singular}"] = create_doc
+        handlers[f"update_{spec.singular}"] = update_doc
+        handlers[f"create_{coll}_bulk"] = create_many
+        handlers[f"update_{coll}_bulk"] = update_many
+
+    return handlers
+
+def with_handlers(router: APIRouter, handlers: dict) -> APIRouter:
+    """Copia `router` reemplazando los endpoints cuyo nombre esté en `handlers`."""
+    swapped = APIRouter()
+    for route in router.routes:
+        if isinstance(route, APIRoute) and route.name in handlers:
+            swapped.add_api_route(
+                route.path,
+                handlers[route.name],
+                methods=list(route.methods),
+                response_model=route.response_model,
+                dependencies=route.dependencies,
+                name=route.name,
+            )
+        else:
+            swapped.routes.append(route)
+    return swapped
@@ -2,8 +2,9 @@
 
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from backend.db.mongo import get_db
+from backend.db.mongo import get_db, get_async_db
 from pymongo.database import Database
+from pymongo.asynchronous.database import AsyncDatabase
 from backend.utils.jwt_handler import create_access_token
 from backend.utils.security import verify_token  # sigue igual
 
@@ -14,11 +15,7 @@ class LoginRequest(BaseModel):
     username: str
     password: str
 
-# Login — genera JWT si las credenciales son válidas
-@router.post("/login")
-def login(payload: LoginRequest, db: Database = Depends(get_db)):
-    user = db["users"].find_one({"username": payload.username})
-
+def _login_response(user, payload: LoginRequest):
     if not user or user["password"] != payload.password:
         raise HTTPException(status_code=401, detail="Credenciales inválidas")
 
@@ -35,6 +32,16 @@ def login(payload: LoginRequest, db: Database = Depends(get_db)):
         "userId": token_data["user_id"]
     }
 
+# Login — genera JWT si las credenciales son válidas
+@router.post("/login")
+def login(payload: LoginRequest, db: Database = Depends(get_db)):
+    user = db["users"].find_one({"username": payload.username})
+    return _login_response(user, payload)
+
+async def login_async(payload: LoginRequest, db: AsyncDatabase = Depends(get_async_db)):
+    user = await db["users"].find_one({"username": payload.username})
+    return _login_response(user, payload)
+
 # Ruta protegida
 @router.get("/me")
 def get_me(payload: dict = Depends(verify_token)):
@@ -47,3 +54,6 @@ def get_me(payload: dict = Depends(verify_token)):
 def get_current_user(payload: dict = Depends(verify_token)):
     return payload
 
+# Variante async (MONGO_MODE=async)
+async_handlers = {"login": login_async}
+
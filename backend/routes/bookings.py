@@ -1,42 +1,34 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pymongo.database import Database
+from pymongo.asynchronous.database import AsyncDatabase
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 from bson import ObjectId
 
-from backend.db.mongo import get_db
+from backend.db.crud import insert_returning, update_returning, ainsert_returning, aupdate_returning
+from backend.db.slots import (
+    BOOKING_SLOT_MINUTES, SLOTS_PER_DAY, day_bitmaps, aday_bitmaps,
+    claim_slots, release_slots, owned_slots, aclaim_slots, arelease_slots, aowned_slots,
+)
+from backend.db.mongo import get_db, get_async_db
 from backend.utils.security import verify_token
+from backend.routes.async_crud import crud_handlers
+from backend.routes.factory import CollectionSpec, build_router
+from backend.utils.pagination import id_filter, date_range
+from backend.utils.serializers import Field, compile_serializer, ID, DATE, NOW
+from backend.utils.responses import trusted
 
-router = APIRouter()
-
-# ✅ Serializador actualizado
-def serialize_booking(booking):
-    try:
-        booking["_id"] = str(booking["_id"])
-        booking["userId"] = str(booking.get("userId", "")) if booking.get("userId") else None
-        booking["instalacion"] = booking.get("instalacion", "")
-
-        fecha_inicio = booking.get("fechaInicio")
-        if isinstance(fecha_inicio, str):
-            fecha_inicio = datetime.fromisoformat(fecha_inicio)
-        elif not isinstance(fecha_inicio, datetime):
-            fecha_inicio = datetime.utcnow()
-
-        fecha_fin = booking.get("fechaFin")
-        if isinstance(fecha_fin, str):
-            fecha_fin = datetime.fromisoformat(fecha_fin)
-        elif not isinstance(fecha_fin, datetime):
-            fecha_fin = datetime.utcnow()
-
-        booking["fechaInicio"] = fecha_inicio
-        booking["fechaFin"] = fecha_fin
-        booking["createdAt"] = booking.get("createdAt", datetime.utcnow())
-        booking["updatedAt"] = booking.get("updatedAt", datetime.utcnow())
-        return booking
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al serializar reserva: {str(e)}")
+# ✅ Serializador compilado
+serialize_booking = compile_serializer([
+    Field("_id", ID),
+    Field("userId", ID),
+    Field("instalacion", default=""),
+    Field("fechaInicio", DATE),
+    Field("fechaFin", DATE),
+    Field("createdAt", default=NOW),
+    Field("updatedAt", default=NOW),
+], "serialize_booking")
 
 # ✅ Modelos
 class BookingIn(BaseModel):
@@ -55,68 +47,150 @@ class HorarioOcupado(BaseModel):
     inicio: int
     fin: int
 
-# ✅ GET /bookings
-@router.get("/", response_model=List[BookingOut], dependencies=[Depends(verify_token)])
-def get_bookings(db: Database = Depends(get_db)):
+class DisponibilidadDia(BaseModel):
+    fecha: date
+    slotMinutes: int
+    ocupado: str        # un carácter por bloque del día: "1" ocupado, "0" libre
+    libres: List[str]   # "HH:MM" libres entre apertura y cierre, cada `paso` minutos
+
+# Filtros de GET /bookings
+async def booking_filters(
+    instalacion: Optional[str] = None,
+    userId: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+) -> dict:
+    query = date_range("fechaInicio", desde, hasta)
+    if instalacion:
+        query["instalacion"] = instalacion
+    if userId:
+        query["userId"] = id_filter(userId)
+    return query
+
+spec = CollectionSpec(
+    name="bookings",
+    singular="booking",
+    serializer=serialize_booking,
+    model_in=BookingIn,
+    model_out=BookingOut,
+    filters=booking_filters,
+    sort_field="fechaInicio",
+    label="la reserva",
+    label_plural="reservas",
+    not_found="Reserva no encontrada",
+    deleted="Reserva eliminada",
+    operations=("list", "export", "get"),
+)
+
+router = APIRouter()
+
+# Horas ocupadas (compatibilidad con useAvailableTimes): tramos continuos de
+# bloques ocupados, redondeados a horas completas hacia afuera.
+def _ocupados_por_hora(bits: int):
+    per_hour = 60 // BOOKING_SLOT_MINUTES
+    ocupados, i = [], 0
+    while i < SLOTS_PER_DAY:
+        if bits >> i & 1:
+            j = i
+            while j < SLOTS_PER_DAY and bits >> j & 1:
+                j += 1
+            ocupados.append({"inicio": i // per_hour, "fin": -(-j // per_hour)})
+            i = j
+        else:
+            i += 1
+    return ocupados
+
+def _disponibilidad(day, bits: int, apertura: int, cierre: int, paso: int):
+    step = paso // BOOKING_SLOT_MINUTES
+    mask = (1 << step) - 1
+    libres = [
+        f"{i * BOOKING_SLOT_MINUTES // 60:02d}:{i * BOOKING_SLOT_MINUTES % 60:02d}"
+        for i in range(apertura * 60 // BOOKING_SLOT_MINUTES, cierre * 60 // BOOKING_SLOT_MINUTES - step + 1, step)
+        if not (bits >> i) & mask
+    ]
+    ocupado = "".join("1" if bits >> i & 1 else "0" for i in range(SLOTS_PER_DAY))
+    return {"fecha": day, "slotMinutes": BOOKING_SLOT_MINUTES, "ocupado": ocupado, "libres": libres}
+
+def _check_paso(apertura: int, cierre: int, paso: int):
+    if paso % BOOKING_SLOT_MINUTES or paso <= 0:
+        raise HTTPException(status_code=400, detail=f"paso debe ser múltiplo de {BOOKING_SLOT_MINUTES} minutos")
+    if not 0 <= apertura < cierre <= 24:
+        raise HTTPException(status_code=400, detail="Horario de apertura/cierre inválido")
+
+# ✅ GET /bookings/horarios — antes de /{id} para que no quede sombreada
+@router.get("/horarios", response_model=List[HorarioOcupado], dependencies=[Depends(verify_token)])
+def get_disponibilidad(instalacion: str, fecha: date, db: Database = Depends(get_db)):
     try:
-        bookings_cursor = db["bookings"].find()
-        bookings = [serialize_booking(b) for b in bookings_cursor]
-        return bookings
+        return _ocupados_por_hora(day_bitmaps(db, instalacion, fecha, fecha)[fecha])
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener reservas: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error al obtener horarios: {str(e)}")
 
-# ✅ GET /bookings/{id}
-@router.get("/{id}", response_model=BookingOut, dependencies=[Depends(verify_token)])
-def get_booking(id: str, db: Database = Depends(get_db)):
+# ✅ GET /bookings/disponibilidad — calendario de varios días desde los bitmaps
+@router.get("/disponibilidad", response_model=List[DisponibilidadDia], dependencies=[Depends(verify_token)])
+def get_calendario(
+    instalacion: str,
+    desde: date,
+    hasta: Optional[date] = None,
+    apertura: int = Query(8, ge=0, le=23),
+    cierre: int = Query(20, ge=1, le=24),
+    paso: int = Query(60),
+    db: Database = Depends(get_db),
+):
     try:
-        booking = db["bookings"].find_one({"_id": ObjectId(id)})
-        if not booking:
-            raise HTTPException(status_code=404, detail="Reserva no encontrada")
-        return serialize_booking(booking)
+        _check_paso(apertura, cierre, paso)
+        bitmaps = day_bitmaps(db, instalacion, desde, hasta or desde)
+        return [_disponibilidad(day, bits, apertura, cierre, paso) for day, bits in bitmaps.items()]
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener la reserva: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error al obtener disponibilidad: {str(e)}")
 
-# ✅ POST /bookings
+# ✅ GET /bookings, GET /bookings/export, GET /bookings/{id}
+build_router(spec, router)
+
+# Las escrituras toman/liberan bloques en booking_slots (ver backend/db/slots.py)
+
+# ✅ POST /bookings — el conflicto se detecta al tomar los bloques (atómico)
 @router.post("/", response_model=BookingOut, dependencies=[Depends(verify_token)])
 def create_booking(data: BookingIn, db: Database = Depends(get_db)):
     try:
-        conflict = db["bookings"].find_one({
-            "instalacion": data.instalacion,
-            "$or": [
-                {
-                    "fechaInicio": {"$lt": data.fechaFin},
-                    "fechaFin": {"$gt": data.fechaInicio}
-                }
-            ]
-        })
-        if conflict:
-            raise HTTPException(status_code=409, detail="Conflicto: ya existe una reserva en ese horario.")
-
-        now = datetime.utcnow()
         booking = data.dict()
-        booking.update({
-            "createdAt": now,
-            "updatedAt": now
-        })
-        result = db["bookings"].insert_one(booking)
-        booking["_id"] = str(result.inserted_id)
-        return serialize_booking(booking)
+        booking["_id"] = ObjectId()
+        claim_slots(db, booking["_id"], data.instalacion, data.fechaInicio, data.fechaFin)
+        try:
+            return trusted(serialize_booking(insert_returning(db["bookings"], booking)))
+        except Exception:
+            release_slots(db, booking["_id"])
+            raise
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al crear la reserva: {str(e)}")
 
-# ✅ PATCH /bookings/{id}
+# ✅ PATCH /bookings/{id} — toma los bloques nuevos antes de soltar los anteriores
 @router.patch("/{id}", response_model=BookingOut, dependencies=[Depends(verify_token)])
 def update_booking(id: str, data: BookingIn, db: Database = Depends(get_db)):
     try:
+        booking_id = ObjectId(id)
+        if db["bookings"].find_one({"_id": booking_id}, {"_id": 1}) is None:
+            raise HTTPException(status_code=404, detail="Reserva no encontrada")
+        owned = owned_slots(db, booking_id)
+        keep = claim_slots(db, booking_id, data.instalacion, data.fechaInicio, data.fechaFin, owned=owned)
         update_data = {k: v for k, v in data.dict().items() if v is not None}
-        update_data["updatedAt"] = datetime.utcnow()
-        result = db["bookings"].update_one({"_id": ObjectId(id)}, {"$set": update_data})
-        if result.matched_count == 0:
+        try:
+            updated = update_returning(db["bookings"], id, update_data)
+        except Exception:
+            release_slots(db, booking_id, keep=owned)
+            raise
+        if updated is None:
+            release_slots(db, booking_id)
             raise HTTPException(status_code=404, detail="Reserva no encontrada")
-        updated = db["bookings"].find_one({"_id": ObjectId(id)})
-        return serialize_booking(updated)
+        release_slots(db, booking_id, keep=keep)
+        return trusted(serialize_booking(updated))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al actualizar la reserva: {str(e)}")
 
@@ -125,42 +199,100 @@ def update_booking(id: str, data: BookingIn, db: Database = Depends(get_db)):
 def delete_booking(id: str, db: Database = Depends(get_db)):
     try:
         result = db["bookings"].delete_one({"_id": ObjectId(id)})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Reserva no encontrada")
-        return {"msg": "Reserva eliminada"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al eliminar la reserva: {str(e)}")
-
-# ✅ GET /bookings/horarios
-@router.get("/horarios", response_model=List[HorarioOcupado], dependencies=[Depends(verify_token)])
-def get_disponibilidad(instalacion: str, fecha: str, db: Database = Depends(get_db)):
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Reserva no encontrada")
     try:
-        dia_inicio = datetime.fromisoformat(fecha)
-        dia_fin = dia_inicio.replace(hour=23, minute=59, second=59)
+        release_slots(db, ObjectId(id))
+    except Exception as e:
+        # La reserva ya no existe: sweep_orphan_slots libera los bloques que queden
+        raise HTTPException(status_code=500, detail=f"Error al liberar los horarios de la reserva: {str(e)}")
+    return {"msg": "Reserva eliminada"}
 
-        reservas = list(db["bookings"].find({
-            "instalacion": instalacion,
-            "fechaInicio": {"$gte": dia_inicio, "$lte": dia_fin}
-        }))
+# Variante async (MONGO_MODE=async)
+async_handlers = crud_handlers(spec)
 
-        ocupados = []
-        for r in reservas:
-            fecha_inicio = r.get("fechaInicio")
-            fecha_fin = r.get("fechaFin")
+async def create_booking_async(data: BookingIn, db: AsyncDatabase = Depends(get_async_db)):
+    try:
+        booking = data.dict()
+        booking["_id"] = ObjectId()
+        await aclaim_slots(db, booking["_id"], data.instalacion, data.fechaInicio, data.fechaFin)
+        try:
+            return trusted(serialize_booking(await ainsert_returning(db["bookings"], booking)))
+        except Exception:
+            await arelease_slots(db, booking["_id"])
+            raise
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al crear la reserva: {str(e)}")
 
-            if not fecha_inicio or not fecha_fin:
-                continue
+async def update_booking_async(id: str, data: BookingIn, db: AsyncDatabase = Depends(get_async_db)):
+    try:
+        booking_id = ObjectId(id)
+        if await db["bookings"].find_one({"_id": booking_id}, {"_id": 1}) is None:
+            raise HTTPException(status_code=404, detail="Reserva no encontrada")
+        owned = await aowned_slots(db, booking_id)
+        keep = await aclaim_slots(db, booking_id, data.instalacion, data.fechaInicio, data.fechaFin, owned=owned)
+        update_data = {k: v for k, v in data.dict().items() if v is not None}
+        try:
+            updated = await aupdate_returning(db["bookings"], id, update_data)
+        except Exception:
+            await arelease_slots(db, booking_id, keep=owned)
+            raise
+        if updated is None:
+            await arelease_slots(db, booking_id)
+            raise HTTPException(status_code=404, detail="Reserva no encontrada")
+        await arelease_slots(db, booking_id, keep=keep)
+        return trusted(serialize_booking(updated))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al actualizar la reserva: {str(e)}")
 
-            if isinstance(fecha_inicio, str):
-                fecha_inicio = datetime.fromisoformat(fecha_inicio)
-            if isinstance(fecha_fin, str):
-                fecha_fin = datetime.fromisoformat(fecha_fin)
+async def delete_booking_async(id: str, db: AsyncDatabase = Depends(get_async_db)):
+    try:
+        result = await db["bookings"].delete_one({"_id": ObjectId(id)})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al eliminar la reserva: {str(e)}")
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Reserva no encontrada")
+    try:
+        await arelease_slots(db, ObjectId(id))
+    except Exception as e:
+        # La reserva ya no existe: sweep_orphan_slots libera los bloques que queden
+        raise HTTPException(status_code=500, detail=f"Error al liberar los horarios de la reserva: {str(e)}")
+    return {"msg": "Reserva eliminada"}
 
-            ocupados.append({
-                "inicio": fecha_inicio.hour,
-                "fin": fecha_fin.hour
-            })
+async def get_disponibilidad_async(instalacion: str, fecha: date, db: AsyncDatabase = Depends(get_async_db)):
+    try:
+        return _ocupados_por_hora((await aday_bitmaps(db, instalacion, fecha, fecha))[fecha])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener horarios: {str(e)}")
 
-        return ocupados
+async def get_calendario_async(
+    instalacion: str,
+    desde: date,
+    hasta: Optional[date] = None,
+    apertura: int = Query(8, ge=0, le=23),
+    cierre: int = Query(20, ge=1, le=24),
+    paso: int = Query(60),
+    db: AsyncDatabase = Depends(get_async_db),
+):
+    try:
+        _check_paso(apertura, cierre, paso)
+        bitmaps = await aday_bitmaps(db, instalacion, desde, hasta or desde)
+        return [_disponibilidad(day, bits, apertura, cierre, paso) for day, bits in bitmaps.items()]
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener horarios: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error al obtener disponibilidad: {str(e)}")
+
+async_handlers["get_disponibilidad"] = get_disponibilidad_async
+async_handlers["get_calendario"] = get_calendario_async
+async_handlers["create_booking"] = create_booking_async
+async_handlers["update_booking"] = update_booking_async
+async_handlers["delete_booking"] = delete_booking_async
@@ -0,0 +1,48 @@
+# backend/routes/debug.py
+#
+#   GET    /debug/slow-queries  — formas de consulta más lentas, con ruta de origen y explain()
+#   PATCH  /debug/slow-queries  — umbral (ms) y cantidad de formas guardadas, en caliente
+#   DELETE /debug/slow-queries  — vacía lo capturado
+#
+# Solo administradores (backend/db/profiler.py hace la captura).
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, conint, confloat
+from pymongo.database import Database
+
+from backend.db.mongo import get_db
+from backend.db.profiler import SLOW_QUERY_ENABLED, profiler
+from backend.utils.security import require_admin
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+class SlowQueryConfig(BaseModel):
+    thresholdMs: Optional[confloat(ge=0)] = None
+    top: Optional[conint(ge=1, le=1000)] = None
+
+def _config():
+    return {"enabled": SLOW_QUERY_ENABLED, "thresholdMs": profiler.threshold_ms, "top": profiler.top}
+
+# GET /debug/slow-queries?min_ms=&limit=&explain=
+@router.get("/slow-queries")
+def get_slow_queries(min_ms: float = 0, limit: Optional[int] = None, explain: bool = True, refresh: bool = False, db: Database = Depends(get_db)):
+    try:
+        if explain:
+            profiler.explain(db, refresh=refresh)  # una vez por forma, salvo refresh=true
+        return {**_config(), "queries": profiler.report(min_ms, limit)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener consultas lentas: {str(e)}")
+
+# PATCH /debug/slow-queries
+@router.patch("/slow-queries")
+def configure_slow_queries(data: SlowQueryConfig):
+    profiler.configure(threshold_ms=data.thresholdMs, top=data.top)
+    return _config()
+
+# DELETE /debug/slow-queries
+@router.delete("/slow-queries")
+def reset_slow_queries():
+    profiler.reset()
+    return {"msg": "Consultas lentas eliminadas"}
@@ -0,0 +1,313 @@
+# backend/routes/factory.py
+#
+# Fábrica de routers CRUD: cada módulo de backend/routes declara un
+# CollectionSpec (modelos, serializador compilado, filtros, campos ObjectId)
+# y build_router() genera list/export/get/create/patch/delete con los mismos
+# paths y nombres que tenían los handlers escritos a mano.
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Literal, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response
+from pymongo.database import Database
+
+from backend.db.bulk import BulkIds, BulkResult, BulkUpdate, bulk_result, check_bulk_size, delete_docs, insert_docs, update_docs, validate_items
+from backend.db.crud import insert_returning, update_returning, update_with_before
+from backend.db.mongo import get_db
+from backend.db.owners import owner_filter
+from backend.db.versions import bump_version, abump_version, get_version
+from backend.utils.export import stream_export
+from backend.utils.pagination import PageParams, page_params, paginate
+from backend.utils.security import verify_token
+from backend.utils.responses import json_response, trusted
+from backend.utils.cache import cached_response, invalidate, query_key
+from backend.utils.etag import conditional, make_etag
+from backend.utils.logs import get_logger
+
+logger = get_logger("routes")
+
+ALL_OPERATIONS = ("list", "export", "get", "create", "update", "delete")
+# "bulk" habilita POST /bulk, PATCH /bulk y POST /bulk/delete (según create/update/delete)
+WITH_BULK = ALL_OPERATIONS + ("bulk",)
+
+async def no_filters() -> dict:
+    return {}
+
+@dataclass
+class CollectionSpec:
+    name: str                     # colección y prefijo plural: "payments"
+    singular: str                 # "payment" -> get_payment, create_payment...
+    serializer: Callable[[dict], dict]
+    model_in: Any = None
+    model_out: Any = None
+    update_model: Any = None      # por defecto model_in
+    filters: Callable = no_filters
+    sort_field: str = "_id"
+    id_fields: Tuple[str, ...] = ()
+    label: str = "documento"      # para mensajes de error: "Error al crear pago"
+    label_plural: str = "documentos"
+    not_found: str = "Documento no encontrado"
+    deleted: str = "Documento eliminado"
+    root: str = "/"               # algunos routers usan "" como raíz
+    operations: Tuple[str, ...] = field(default=ALL_OPERATIONS)
+    # Hooks tras cada escritura: (db, antes, después); antes=None al crear, después=None al borrar
+    on_change: Optional[Callable] = None
+    aon_change: Optional[Callable] = None
+    # Versión en lote de los hooks: (db, [(antes, después), ...]); sin ella se llama on_change por documento
+    on_changes: Optional[Callable] = None
+    aon_changes: Optional[Callable] = None
+    # Campo que liga el documento al residente ("userId" o "apartmentId"): habilita GET /mine
+    owner_field: Optional[str] = None
+    # Caché read-through de list/get (backend/utils/cache.py), invalidado por cada escritura
+    cache: bool = False
+    # ETag/If-None-Match en list/get (backend/utils/etag.py). Solo si todas las
+    # escrituras de la colección pasan por notify_change/notify_changes
+    etag: bool = False
+
+    def to_object_ids(self, doc: dict) -> dict:
+        for f in self.id_fields:
+            if doc.get(f):
+                doc[f] = ObjectId(doc[f])
+        return doc
+
+def _run_hook(spec: CollectionSpec, hook, *args):
+    # Un hook que falla no revierte la escritura: queda en el log (el rollup se repara con rebuild)
+    if hook is None:
+        return
+    try:
+        hook(*args)
+    except Exception as e:
+        logger.error("event=on_change_failed collection=%s hook=%s error=%s", spec.name, getattr(hook, "__name__", hook), e)
+
+async def _arun_hook(spec: CollectionSpec, hook, *args):
+    if hook is None:
+        return
+    try:
+        await hook(*args)
+    except Exception as e:
+        logger.error("event=on_change_failed collection=%s hook=%s error=%s", spec.name, getattr(hook, "__name__", hook), e)
+
+def _written(spec: CollectionSpec, db):
+    if spec.cache:
+        invalidate(spec.name)
+    if spec.etag:
+        _run_hook(spec, bump_version, db, spec.name)
+
+async def _awritten(spec: CollectionSpec, db):
+    if spec.cache:
+        invalidate(spec.name)
+    if spec.etag:
+        await _arun_hook(spec, abump_version, db, spec.name)
+
+def notify_change(spec: CollectionSpec, db, before, after):
+    _written(spec, db)
+    _run_hook(spec, spec.on_change, db, before, after)
+
+async def anotify_change(spec: CollectionSpec, db, before, after):
+    await _awritten(spec, db)
+    await _arun_hook(spec, spec.aon_change, db, before, after)
+
+def notify_changes(spec: CollectionSpec, db, changes):
+    if not changes:
+        return
+    _written(spec, db)
+    if spec.on_changes is not None:
+        _run_hook(spec, spec.on_changes, db, changes)
+        return
+    for before, after in changes:
+        _run_hook(spec, spec.on_change, db, before, after)
+
+async def anotify_changes(spec: CollectionSpec, db, changes):
+    if not changes:
+        return
+    await _awritten(spec, db)
+    if spec.aon_changes is not None:
+        await _arun_hook(spec, spec.aon_changes, db, changes)
+        return
+    for before, after in changes:
+        await _arun_hook(spec, spec.aon_change, db, before, after)
+
+# Constructores por elemento de las rutas /bulk: validan uno a uno para reportar errores por índice
+def _mapping(raw):
+    if not isinstance(raw, dict):
+        raise ValueError("Se esperaba un objeto JSON")
+    return raw
+
+def bulk_create_item(spec: CollectionSpec, raw):
+    raw = _mapping(raw)
+    return spec.to_object_ids(spec.model_in(**raw).dict())
+
+def bulk_update_item(spec: CollectionSpec, raw):
+    item = BulkUpdate(**_mapping(raw))
+    data = (spec.update_model or spec.model_in)(**item.data)
+    return str(ObjectId(item.id)), spec.to_object_ids({k: v for k, v in data.dict().items() if v is not None})
+
+def bulk_id(raw):
+    return str(ObjectId(raw))
+
+def build_router(spec: CollectionSpec, router: Optional[APIRouter] = None) -> APIRouter:
+    """Registra en `router` (o en uno nuevo) los handlers CRUD de `spec`."""
+    router = router or APIRouter()
+    deps = [Depends(verify_token)]
+    coll = spec.name
+    serialize = spec.serializer
+    list_model = List[spec.model_out] if spec.model_out else None
+
+    def list_docs(request: Request, response: Response, query: dict = Depends(spec.filters), page: PageParams = Depends(page_params), db: Database = Depends(get_db)):
+        def load():
+            if spec.cache:
+                key = query_key(query, page.limit, page.cursor, page.fields)
+                return cached_response(coll, key, lambda: paginate(db[coll], query, page, serialize, sort_field=spec.sort_field, model=spec.model_out))
+            return paginate(db[coll], query, page, serialize, sort_field=spec.sort_field, model=spec.model_out)
+
+        try:
+            # La versión se lee antes que los datos: el ETag nunca es más nuevo que la respuesta
+            etag = make_etag(get_version(db, coll), query, page.limit, page.cursor, page.fields) if spec.etag else None
+            return conditional(request, response, etag, load)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al obtener {spec.label_plural}: {str(e)}")
+
+    def list_mine(request: Request, query: dict = Depends(spec.filters), page: PageParams = Depends(page_params), payload: dict = Depends(verify_token), db: Database = Depends(get_db)):
+        try:
+            # El filtro del dueño reemplaza al de la query; un userId/apartmentId ajeno es 403
+            requested = request.query_params.get(spec.owner_field)
+            query = {**query, spec.owner_field: owner_filter(db, spec.owner_field, payload, requested)}
+            return paginate(db[coll], query, page, serialize, sort_field=spec.sort_field, model=spec.model_out)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al obtener {spec.label_plural}: {str(e)}")
+
+    def export_docs(formato: Literal["ndjson", "csv"] = "ndjson", query: dict = Depends(spec.filters), db: Database = Depends(get_db)):
+        return stream_export(db[coll], query, serialize, formato, coll, sort_field=spec.sort_field)
+
+    def find_doc(id: str, db: Database):
+        try:
+            doc = db[coll].find_one({"_id": ObjectId(id)})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al obtener {spec.label}: {str(e)}")
+        if not doc:
+            raise HTTPException(status_code=404, detail=spec.not_found)
+        return serialize(doc)
+
+    def get_doc(id: str, request: Request, response: Response, db: Database = Depends(get_db)):
+        def load():
+            if spec.cache:
+                return cached_response(coll, f"id:{id}", lambda: json_response(find_doc(id, db)))
+            return trusted(find_doc(id, db))
+
+        etag = make_etag(get_version(db, coll), id) if spec.etag else None
+        return conditional(request, response, etag, load)
+
+    def delete_doc(id: str, db: Database = Depends(get_db)):
+        try:
+            if spec.on_change is None:
+                before = None
+                deleted = db[coll].delete_one({"_id": ObjectId(id)}).deleted_count
+            else:
+                before = db[coll].find_one_and_delete({"_id": ObjectId(id)})
+                deleted = before is not None
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al eliminar {spec.label}: {str(e)}")
+        if not deleted:
+            raise HTTPException(status_code=404, detail=spec.not_found)
+        if spec.on_change is not None or spec.cache or spec.etag:
+            notify_change(spec, db, before, None)
+        return {"msg": spec.deleted}
+
+    ops = spec.operations
+    if "list" in ops:
+        router.add_api_route(spec.root, list_docs, methods=["GET"], response_model=list_model, dependencies=deps, name=f"get_{coll}")
+    if "export" in ops:
+        router.add_api_route("/export", export_docs, methods=["GET"], dependencies=deps, name=f"export_{coll}")
+    if "list" in ops and spec.owner_field:
+        router.add_api_route("/mine", list_mine, methods=["GET"], response_model=list_model, name=f"get_my_{coll}")
+    if "get" in ops:
+        router.add_api_route("/{id}", get_doc, methods=["GET"], response_model=spec.model_out, dependencies=deps, name=f"get_{spec.singular}")
+
+    if spec.model_in is not None:
+        model_in = spec.model_in
+        patch_model = spec.update_model or model_in
+
+        def create_doc(data: model_in, db: Database = Depends(get_db)):
+            try:
+                doc = insert_returning(db[coll], spec.to_object_ids(data.dict()))
+                notify_change(spec, db, None, doc)
+                return trusted(serialize(doc))
+            except InvalidId:
+                raise HTTPException(status_code=400, detail="ID inválido")
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error al crear {spec.label}: {str(e)}")
+
+        def update_doc(id: str, data: patch_model, db: Database = Depends(get_db)):
+            try:
+                update_data = spec.to_object_ids({k: v for k, v in data.dict().items() if v is not None})
+                if spec.on_change is None:
+                    before = None
+                    updated = update_returning(db[coll], id, update_data)
+                else:
+                    before, updated = update_with_before(db[coll], id, update_data)
+                if updated is None:
+                    raise HTTPException(status_code=404, detail=spec.not_found)
+                if spec.on_change is not None or spec.cache or spec.etag:
+                    notify_change(spec, db, before, updated)
+                return trusted(serialize(updated))
+            except HTTPException:
+                raise
+            except InvalidId:
+                raise HTTPException(status_code=400, detail="ID inválido")
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error al actualizar {spec.label}: {str(e)}")
+
+        def create_many(items: List[Any] = Body(...), db: Database = Depends(get_db)):
+            check_bulk_size(items)
+            try:
+                valid, results = validate_items(items, lambda raw: bulk_create_item(spec, raw))
+                written, inserted = insert_docs(db[coll], valid)
+                results.update(written)
+                notify_changes(spec, db, [(None, doc) for doc in inserted])
+                return bulk_result(results, len(items))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error al crear {spec.label_plural}: {str(e)}")
+
+        def update_many(items: List[Any] = Body(...), db: Database = Depends(get_db)):
+            check_bulk_size(items)
+            try:
+                valid, results = validate_items(items, lambda raw: bulk_update_item(spec, raw))
+                written, changes = update_docs(db[coll], valid, with_before=spec.on_change is not None or spec.on_changes is not None)
+                results.update(written)
+                notify_changes(spec, db, changes)
+                return bulk_result(results, len(items))
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Error al actualizar {spec.label_plural}: {str(e)}")
+
+        if "bulk" in ops and "create" in ops:
+            router.add_api_route("/bulk", create_many, methods=["POST"], response_model=BulkResult, dependencies=deps, name=f"create_{coll}_bulk")
+        if "bulk" in ops and "update" in ops:
+            router.add_api_route("/bulk", update_many, methods=["PATCH"], response_model=BulkResult, dependencies=deps, name=f"update_{coll}_bulk")
+        if "create" in ops:
+            router.add_api_route(spec.root, create_doc, methods=["POST"], response_model=spec.model_out, dependencies=deps, name=f"create_{spec.singular}")
+        if "update" in ops:
+            router.add_api_route("/{id}", update_doc, methods=["PATCH"], response_model=spec.model_out, dependencies=deps, name=f"update_{spec.singular}")
+
+    def delete_many(body: BulkIds, db: Database = Depends(get_db)):
+        check_bulk_size(body.ids)
+        try:
+            valid, results = validate_items(body.ids, bulk_id)
+            written, changes = delete_docs(db[coll], valid, with_before=spec.on_change is not None or spec.on_changes is not None)
+            results.update(written)
+            notify_changes(spec, db, changes)
+            return bulk_result(results, len(body.ids))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al eliminar {spec.label_plural}: {str(e)}")
+
+    if "bulk" in ops and "delete" in ops:
+        router.add_api_route("/bulk/delete", delete_many, methods=["POST"], response_model=BulkResult, dependencies=deps, name=f"delete_{coll}_bulk")
+    if "delete" in ops:
+        router.add_api_route("/{id}", delete_doc, methods=["DELETE"], dependencies=deps, name=f"delete_{spec.singular}")
+
+    return router
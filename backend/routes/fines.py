@@ -1,26 +1,32 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pymongo.database import Database
+from pymongo.asynchronous.database import AsyncDatabase
 from pydantic import BaseModel
-from typing import List, Literal
+from typing import Literal, Optional
 from datetime import datetime
-from bson import ObjectId
 
-from backend.db.mongo import get_db
+from backend.db.crud import update_with_before, aupdate_with_before
+from backend.db.rollups import on_fine_change, aon_fine_change, on_fine_changes, aon_fine_changes
+from backend.db.bulk import BulkIds, BulkResult, bulk_result, check_bulk_size, validate_items, update_docs, aupdate_docs
+from backend.db.mongo import get_db, get_async_db
+from backend.db.summaries import Summary, summarize, asummarize
 from backend.utils.security import verify_token
-
-router = APIRouter()
+from backend.routes.async_crud import crud_handlers
+from backend.routes.factory import CollectionSpec, build_router, bulk_id, notify_change, anotify_change, notify_changes, anotify_changes
+from backend.utils.pagination import date_range
+from backend.utils.serializers import Field, compile_serializer, ID
+from backend.utils.responses import trusted
 
 # Utils
-def serialize_fine(fine):
-    return {
-        "id": str(fine["_id"]),
-        "departamento": fine["departamento"],
-        "propietario": fine["propietario"],
-        "monto": fine["monto"],
-        "descripcion": fine["descripcion"],
-        "fecha": fine["fecha"],
-        "estatus": fine["estatus"],
-    }
+serialize_fine = compile_serializer([
+    Field("id", ID, source="_id"),
+    Field("departamento"),
+    Field("propietario"),
+    Field("monto"),
+    Field("descripcion"),
+    Field("fecha"),
+    Field("estatus"),
+], "serialize_fine")
 
 # Schemas
 class FineIn(BaseModel):
@@ -34,48 +40,118 @@ class FineIn(BaseModel):
 class FineOut(FineIn):
     id: str
 
-# GET /fines
-@router.get("/", response_model=List[FineOut], dependencies=[Depends(verify_token)])
-def get_fines(db: Database = Depends(get_db)):
+# Filtros de GET /fines
+async def fine_filters(
+    estatus: Optional[Literal['Completo', 'Incompleto']] = None,
+    departamento: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+) -> dict:
+    query = date_range("fecha", desde, hasta)
+    if estatus:
+        query["estatus"] = estatus
+    if departamento:
+        query["departamento"] = departamento
+    return query
+
+spec = CollectionSpec(
+    name="fines",
+    singular="fine",
+    serializer=serialize_fine,
+    model_in=FineIn,
+    model_out=FineOut,
+    filters=fine_filters,
+    etag=True,
+    sort_field="fecha",
+    label="multa",
+    label_plural="multas",
+    not_found="Multa no encontrada",
+    deleted="Multa eliminada",
+    operations=("list", "export", "create", "delete", "bulk"),
+    on_change=on_fine_change,
+    aon_change=aon_fine_change,
+    on_changes=on_fine_changes,
+    aon_changes=aon_fine_changes,
+)
+
+router = APIRouter()
+
+# Campos que agrupa el resumen
+FINE_SUMMARY = dict(amount="monto", status="estatus", concept="descripcion", apartment="departamento", date="fecha")
+
+# GET /fines/summary — totales agregados en Mongo (antes de /{id})
+@router.get("/summary", response_model=Summary, dependencies=[Depends(verify_token)])
+def get_fines_summary(query: dict = Depends(fine_filters), db: Database = Depends(get_db)):
     try:
-        fines = db["fines"].find()
-        return [serialize_fine(f) for f in fines]
+        return summarize(db["fines"], query, **FINE_SUMMARY)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener multas: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error al resumir multas: {str(e)}")
+
+# GET/POST /fines, GET /fines/export, POST /fines/bulk, POST /fines/bulk/delete, DELETE /fines/{id}
+build_router(spec, router)
+
+def _paid(id):
+    return bulk_id(id), {"estatus": "Completo"}
 
-# POST /fines
-@router.post("/", response_model=FineOut, dependencies=[Depends(verify_token)])
-def create_fine(data: FineIn, db: Database = Depends(get_db)):
+# PATCH /fines/bulk — marca varias multas como pagadas (antes de /{id})
+@router.patch("/bulk", response_model=BulkResult, dependencies=[Depends(verify_token)])
+def update_fines_bulk(body: BulkIds, db: Database = Depends(get_db)):
+    check_bulk_size(body.ids)
     try:
-        fine = data.dict()
-        result = db["fines"].insert_one(fine)
-        new_fine = db["fines"].find_one({"_id": result.inserted_id})
-        return serialize_fine(new_fine)
+        valid, results = validate_items(body.ids, _paid)
+        written, changes = update_docs(db["fines"], valid, with_before=True)
+        results.update(written)
+        notify_changes(spec, db, changes)
+        return bulk_result(results, len(body.ids))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al crear multa: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error al actualizar multas: {str(e)}")
 
-# PATCH /fines/{id}
+# PATCH /fines/{id} — marca la multa como pagada
 @router.patch("/{id}", response_model=FineOut, dependencies=[Depends(verify_token)])
 def update_fine(id: str, db: Database = Depends(get_db)):
     try:
-        result = db["fines"].update_one(
-            {"_id": ObjectId(id)},
-            {"$set": {"estatus": "Completo"}}
-        )
-        if result.matched_count == 0:
+        before, updated = update_with_before(db["fines"], id, {"estatus": "Completo"})
+        if updated is None:
             raise HTTPException(status_code=404, detail="Multa no encontrada")
-        updated = db["fines"].find_one({"_id": ObjectId(id)})
-        return serialize_fine(updated)
+        notify_change(spec, db, before, updated)
+        return trusted(serialize_fine(updated))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al actualizar multa: {str(e)}")
 
-# DELETE /fines/{id} (opcional)
-@router.delete("/{id}", dependencies=[Depends(verify_token)])
-def delete_fine(id: str, db: Database = Depends(get_db)):
+# Variante async (MONGO_MODE=async)
+async_handlers = crud_handlers(spec)
+
+async def update_fine_async(id: str, db: AsyncDatabase = Depends(get_async_db)):
     try:
-        result = db["fines"].delete_one({"_id": ObjectId(id)})
-        if result.deleted_count == 0:
+        before, updated = await aupdate_with_before(db["fines"], id, {"estatus": "Completo"})
+        if updated is None:
             raise HTTPException(status_code=404, detail="Multa no encontrada")
-        return {"msg": "Multa eliminada"}
+        await anotify_change(spec, db, before, updated)
+        return trusted(serialize_fine(updated))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al actualizar multa: {str(e)}")
+
+async def update_fines_bulk_async(body: BulkIds, db: AsyncDatabase = Depends(get_async_db)):
+    check_bulk_size(body.ids)
+    try:
+        valid, results = validate_items(body.ids, _paid)
+        written, changes = await aupdate_docs(db["fines"], valid, with_before=True)
+        results.update(written)
+        await anotify_changes(spec, db, changes)
+        return bulk_result(results, len(body.ids))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al eliminar multa: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error al actualizar multas: {str(e)}")
+
+async def get_fines_summary_async(query: dict = Depends(fine_filters), db: AsyncDatabase = Depends(get_async_db)):
+    try:
+        return await asummarize(db["fines"], query, **FINE_SUMMARY)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al resumir multas: {str(e)}")
+
+async_handlers["update_fine"] = update_fine_async
+async_handlers["update_fines_bulk"] = update_fines_bulk_async
+async_handlers["get_fines_summary"] = get_fines_summary_async
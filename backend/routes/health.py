@@ -0,0 +1,26 @@
+# backend/routes/health.py
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from backend.db import mongo
+from backend.utils.cache import cache_stats
+from backend.utils.security import require_admin
+
+router = APIRouter()
+
+# GET /health/live — el proceso está arriba (no toca la base de datos)
+@router.get("/live")
+def liveness():
+    return {"status": "ok"}
+
+# GET /health/ready — reutiliza el cliente compartido para hacer ping a MongoDB
+@router.get("/ready")
+def readiness():
+    if not mongo.ping():
+        raise HTTPException(status_code=503, detail="MongoDB no disponible")
+    return {"status": "ok", "db": mongo.DB_NAME}
+
+# GET /health/cache — hits/misses/invalidaciones del caché read-through por colección (solo administradores)
+@router.get("/cache", dependencies=[Depends(require_admin)])
+def cache_metrics():
+    return cache_stats()
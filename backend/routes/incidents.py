@@ -1,25 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pymongo.database import Database
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Optional
 from datetime import datetime
-from bson import ObjectId
 
-from backend.db.mongo import get_db
-from backend.utils.security import verify_token
+from backend.routes.async_crud import crud_handlers
+from backend.routes.factory import CollectionSpec, build_router
+from backend.utils.pagination import id_filter, date_range
+from backend.utils.serializers import Field, compile_serializer, ID, NOW
 
-router = APIRouter()
-
-# Serializador
-def serialize_incident(incident):
-    incident["_id"] = str(incident["_id"])
-    incident["userId"] = str(incident.get("userId", ""))
-    incident["status"] = incident.get("status", "open")
-    incident["priority"] = incident.get("priority", "medium")
-    incident["category"] = incident.get("category", "general")
-    incident["createdAt"] = incident.get("createdAt", datetime.utcnow())
-    incident["updatedAt"] = incident.get("updatedAt", datetime.utcnow())
-    return incident
+# Serializador compilado
+serialize_incident = compile_serializer([
+    Field("_id", ID),
+    Field("userId", ID, ""),
+    Field("title"),
+    Field("description", default=""),
+    Field("status", default="open"),
+    Field("priority", default="medium"),
+    Field("category", default="general"),
+    Field("createdAt", default=NOW),
+    Field("updatedAt", default=NOW),
+], "serialize_incident")
 
 # Modelos
 class IncidentIn(BaseModel):
@@ -43,63 +42,45 @@ class IncidentOut(IncidentIn):
     createdAt: datetime
     updatedAt: datetime
 
-# GET /incidents
-@router.get("/", response_model=List[IncidentOut], dependencies=[Depends(verify_token)])
-def get_incidents(db: Database = Depends(get_db)):
-    try:
-        incidents = [serialize_incident(i) for i in db["incidents"].find()]
-        return incidents
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener reportes: {str(e)}")
-
-# GET /incidents/{id}
-@router.get("/{id}", response_model=IncidentOut, dependencies=[Depends(verify_token)])
-def get_incident(id: str, db: Database = Depends(get_db)):
-    try:
-        incident = db["incidents"].find_one({"_id": ObjectId(id)})
-        if not incident:
-            raise HTTPException(status_code=404, detail="Reporte no encontrado")
-        return serialize_incident(incident)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener reporte: {str(e)}")
+# Filtros de GET /incidents
+async def incident_filters(
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    category: Optional[str] = None,
+    userId: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+) -> dict:
+    query = date_range("createdAt", desde, hasta)
+    if status:
+        query["status"] = status
+    if priority:
+        query["priority"] = priority
+    if category:
+        query["category"] = category
+    if userId:
+        query["userId"] = id_filter(userId)
+    return query
 
-# POST /incidents
-@router.post("/", response_model=IncidentOut, dependencies=[Depends(verify_token)])
-def create_incident(data: IncidentIn, db: Database = Depends(get_db)):
-    try:
-        now = datetime.utcnow()
-        incident = data.dict()
-        incident["userId"] = ObjectId(incident["userId"])
-        incident.update({"createdAt": now, "updatedAt": now})
-        result = db["incidents"].insert_one(incident)
-        new_incident = db["incidents"].find_one({"_id": result.inserted_id})
-        return serialize_incident(new_incident)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al crear reporte: {str(e)}")
+spec = CollectionSpec(
+    name="incidents",
+    singular="incident",
+    serializer=serialize_incident,
+    model_in=IncidentIn,
+    model_out=IncidentOut,
+    update_model=IncidentUpdate,
+    filters=incident_filters,
+    etag=True,
+    owner_field="userId",
+    id_fields=("userId",),
+    label="reporte",
+    label_plural="reportes",
+    not_found="Reporte no encontrado",
+    deleted="Reporte eliminado",
+)
 
-# PATCH /incidents/{id}
-@router.patch("/{id}", response_model=IncidentOut, dependencies=[Depends(verify_token)])
-def update_incident(id: str, data: IncidentUpdate, db: Database = Depends(get_db)):
-    try:
-        update_data = {k: v for k, v in data.dict().items() if v is not None}
-        if "userId" in update_data:
-            update_data["userId"] = ObjectId(update_data["userId"])
-        update_data["updatedAt"] = datetime.utcnow()
-        result = db["incidents"].update_one({"_id": ObjectId(id)}, {"$set": update_data})
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Reporte no encontrado")
-        updated = db["incidents"].find_one({"_id": ObjectId(id)})
-        return serialize_incident(updated)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al actualizar reporte: {str(e)}")
+# GET/POST /incidents, GET /incidents/export, GET /incidents/mine, GET/PATCH/DELETE /incidents/{id}
+router = build_router(spec)
 
-# DELETE /incidents/{id}
-@router.delete("/{id}", dependencies=[Depends(verify_token)])
-def delete_incident(id: str, db: Database = Depends(get_db)):
-    try:
-        result = db["incidents"].delete_one({"_id": ObjectId(id)})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Reporte no encontrado")
-        return {"msg": "Reporte eliminado"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al eliminar reporte: {str(e)}")
\ No newline at end of file
+# Variante async (MONGO_MODE=async)
+async_handlers = crud_handlers(spec)
@@ -0,0 +1,157 @@
+# backend/routes/live.py
+#
+# Actualizaciones en vivo para el dashboard (backend/db/changes.py):
+#   GET /live/events  — Server-Sent Events (EventSource)
+#   WS  /live/ws      — WebSocket, mismos mensajes en JSON
+#   GET /live/status  — fuente activa, suscriptores y eventos publicados
+#
+# Parámetros: collections=incidents,fines (por defecto todas), apartmentId=<id>
+# (solo cambios de ese apartamento) o mine=true (apartamentos y documentos del
+# usuario del token). Quien no es administrador queda siempre en mine=true y
+# solo puede pedir apartmentId de sus propios apartamentos. Las colecciones sin
+# dueño (announcements, providers...) llegan siempre. EventSource no puede mandar headers, así que el JWT puede
+# venir en ?token= además de Authorization: Bearer.
+#
+# Mensajes: {"type": "ready"}, {"type": "change", "collection", "op", "id",
+# "doc"} y {"type": "resync"} (el cliente debe recargar el listado).
+
+import asyncio
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from backend.db.changes import hub
+from backend.db.mongo import get_db
+from backend.db.owners import current_user_id, user_apartments
+from backend.routes import announcements, apartments, bookings, deliveries, documents, fines, incidents, payments, providers, reserves, visits
+from backend.utils.jwt_handler import decode_access_token
+from backend.utils.pagination import id_filter
+from backend.utils.responses import dumps
+from backend.utils.security import verify_token
+
+LIVE_HEARTBEAT = float(os.getenv("LIVE_HEARTBEAT", 15))
+
+# Colecciones publicadas, con el serializador y el campo dueño de su CollectionSpec
+for module in (announcements, apartments, bookings, deliveries, documents, fines, incidents, payments, providers, reserves, visits):
+    hub.watch(module.spec.name, module.spec.serializer, module.spec.owner_field)
+
+router = APIRouter()
+
+def _payload(token: Optional[str], authorization: Optional[str]):
+    if not token and authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    return decode_access_token(token) if token else None
+
+def _collections(collections: Optional[str]):
+    if not collections:
+        return hub.collections
+    names = [c.strip() for c in collections.split(",") if c.strip()]
+    unknown = [c for c in names if c not in hub.collections]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Colecciones no disponibles: {', '.join(unknown)}")
+    return names
+
+def _apartment_owners(db, apartment_id: str):
+    doc = db["apartments"].find_one({"_id": id_filter(apartment_id)}, {"userId": 1})
+    return {str(doc["userId"])} if doc and doc.get("userId") else set()
+
+async def _owners(payload: dict, apartmentId: Optional[str], mine: bool):
+    # Solo un administrador ve todo el residencial; el resto queda siempre en "mine"
+    admin = payload.get("role") == "admin"
+    if mine or not admin:
+        user_id = current_user_id(payload)
+        apartment_ids = await run_in_threadpool(user_apartments, get_db(), user_id)
+        if apartmentId:
+            if apartmentId not in apartment_ids:
+                raise HTTPException(status_code=403, detail="El apartamento no pertenece al usuario")
+            apartment_ids = (apartmentId,)
+        return {"apartmentId": set(apartment_ids), "userId": {user_id}}
+    if apartmentId:
+        # Colecciones por userId: las del dueño del apartamento
+        return {"apartmentId": {apartmentId}, "userId": await run_in_threadpool(_apartment_owners, get_db(), apartmentId)}
+    return None
+
+def _ready(collections) -> bytes:
+    return dumps({"type": "ready", "collections": list(collections)})
+
+async def _subscribe(payload: dict, collections: Optional[str], apartmentId: Optional[str], mine: bool):
+    if not hub.enabled:
+        raise HTTPException(status_code=503, detail="Actualizaciones en vivo deshabilitadas")
+    names = _collections(collections)
+    return names, hub.subscribe(names, await _owners(payload, apartmentId, mine))
+
+# GET /live/events — text/event-stream; un comentario cada LIVE_HEARTBEAT mantiene viva la conexión
+@router.get("/events")
+async def live_events(
+    request: Request,
+    collections: Optional[str] = None,
+    apartmentId: Optional[str] = None,
+    mine: bool = False,
+    token: Optional[str] = None,
+):
+    payload = _payload(token, request.headers.get("authorization"))
+    if payload is None:
+        raise HTTPException(status_code=401, detail="Token inválido o expirado")
+    names, sub = await _subscribe(payload, collections, apartmentId, mine)
+
+    async def stream():
+        try:
+            yield b"event: ready\ndata: " + _ready(names) + b"\n\n"
+            while True:
+                try:
+                    kind, data = await asyncio.wait_for(sub.queue.get(), LIVE_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": ping\n\n"
+                    continue
+                yield b"event: " + kind.encode() + b"\ndata: " + data + b"\n\n"
+        finally:
+            hub.unsubscribe(sub)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}  # sin buffer en nginx
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=headers)
+
+# WS /live/ws — el cliente no necesita mandar nada; solo se escucha el cierre
+@router.websocket("/ws")
+async def live_ws(
+    websocket: WebSocket,
+    collections: Optional[str] = None,
+    apartmentId: Optional[str] = None,
+    mine: bool = False,
+    token: Optional[str] = None,
+):
+    payload = _payload(token, websocket.headers.get("authorization"))
+    if payload is None:
+        await websocket.close(code=1008)
+        return
+    try:
+        names, sub = await _subscribe(payload, collections, apartmentId, mine)
+    except HTTPException as e:
+        await websocket.close(code=1008 if e.status_code < 500 else 1011, reason=str(e.detail))
+        return
+
+    async def send():
+        while True:
+            _, data = await sub.queue.get()
+            await websocket.send_text(data.decode())
+
+    await websocket.accept()
+    sender = None
+    try:
+        await websocket.send_text(_ready(names).decode())
+        sender = asyncio.create_task(send())
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        if sender is not None:
+            sender.cancel()
+        hub.unsubscribe(sub)
+
+# GET /live/status
+@router.get("/status")
+def live_status(payload: dict = Depends(verify_token)):
+    return hub.status()
@@ -0,0 +1,57 @@
+# backend/routes/metrics.py
+#
+#   GET /metrics          — texto de Prometheus (rutas, comandos de Mongo, caché, live, puerta)
+#   GET /metrics/summary  — lo mismo en JSON con p50/p95/p99 por ruta y comando
+#
+# async: leen los histogramas en el event loop, el mismo hilo que los escribe.
+# Sin JWT, como /health: lo consulta el scraper. Con METRICS_TOKEN definido se
+# exige "Authorization: Bearer <METRICS_TOKEN>".
+
+import hmac
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from backend.db.changes import hub
+from backend.db.gate import gate
+from backend.utils.cache import cache_stats
+from backend.utils.metrics import metrics_summary, render_prometheus
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+router = APIRouter()
+
+def _check(authorization: Optional[str]):
+    if METRICS_TOKEN and not hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Token de métricas inválido")
+
+def _subsystems():
+    cache = cache_stats()["collections"]
+    live = hub.status()
+    door = gate.status()
+    return [
+        ("milovat_cache_requests_total", "counter",
+         {(ns, result): values[result] for ns, values in cache.items() for result in ("hits", "misses")}, ("collection", "result")),
+        ("milovat_cache_invalidations_total", "counter", {(ns,): values["invalidations"] for ns, values in cache.items()}, ("collection",)),
+        ("milovat_live_subscribers", "gauge", {(): live["subscribers"]}, ()),
+        ("milovat_live_events_total", "counter", {(): live["events"]}, ()),
+        ("milovat_live_dropped_total", "counter", {(): live["dropped"]}, ()),
+        ("milovat_gate_passes", "gauge", {(): door["passes"]}, ()),
+        ("milovat_gate_pending_writes", "gauge", {(): door["pending"]}, ()),
+        ("milovat_gate_scans_total", "counter", {(result,): door[result] for result in ("hits", "misses", "invalid")}, ("result",)),
+        ("milovat_gate_written_total", "counter", {(): door["written"]}, ()),
+    ]
+
+# GET /metrics
+@router.get("", response_class=PlainTextResponse)
+async def prometheus_metrics(authorization: Optional[str] = Header(None)):
+    _check(authorization)
+    return PlainTextResponse(render_prometheus(_subsystems()), media_type="text/plain; version=0.0.4")
+
+# GET /metrics/summary
+@router.get("/summary")
+async def summary_metrics(authorization: Optional[str] = Header(None)):
+    _check(authorization)
+    return {**metrics_summary(), "cache": cache_stats(), "live": hub.status(), "gate": gate.status()}
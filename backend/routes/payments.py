@@ -1,31 +1,32 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pymongo.database import Database
-from pydantic import BaseModel
+from pymongo.asynchronous.database import AsyncDatabase
+from pydantic import BaseModel, conint, constr
 from typing import List, Optional
 from datetime import datetime
-from bson import ObjectId
 
-from backend.db.mongo import get_db
+from backend.db.mongo import get_db, get_async_db
+from backend.db.summaries import Summary, summarize, asummarize
+from backend.db.rollups import ROLLUPS_COLLECTION, on_payment_change, aon_payment_change, on_payment_changes, aon_payment_changes
+from backend.db.charges import DEFAULT_CONCEPT, DEFAULT_DUE_DAY, monthly_charges, amonthly_charges
 from backend.utils.security import verify_token
+from backend.routes.async_crud import crud_handlers
+from backend.routes.factory import CollectionSpec, build_router, WITH_BULK
+from backend.utils.pagination import id_filter, date_range
+from backend.utils.serializers import Field, compile_serializer, ID, FLOAT, NOW
 
-router = APIRouter()
-
-# ✅ Serializador actualizado 🔥
-def serialize_payment(payment):
-    try:
-        return {
-            "_id": str(payment["_id"]),
-            "apartmentId": str(payment.get("apartmentId") or ""),
-            "concept": payment.get("concept", ""),
-            "amount": float(payment.get("amount", 0)),
-            "dueDate": payment.get("dueDate", datetime.utcnow()),
-            "status": payment.get("status", "pending"),
-            "paymentDate": payment.get("paymentDate", None),
-            "createdAt": payment.get("createdAt", datetime.utcnow()),
-            "updatedAt": payment.get("updatedAt", datetime.utcnow()),
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al serializar pago: {str(e)}")
+# ✅ Serializador compilado 🔥
+serialize_payment = compile_serializer([
+    Field("_id", ID),
+    Field("apartmentId", ID, ""),
+    Field("concept", default=""),
+    Field("amount", FLOAT, 0.0),
+    Field("dueDate", default=NOW),
+    Field("status", default="pending"),
+    Field("paymentDate"),
+    Field("createdAt", default=NOW),
+    Field("updatedAt", default=NOW),
+], "serialize_payment")
 
 # 📦 Modelos
 class PaymentIn(BaseModel):
@@ -41,64 +42,149 @@ class PaymentOut(PaymentIn):
     createdAt: datetime
     updatedAt: datetime
 
-# GET /payments
-@router.get("/", response_model=List[PaymentOut], dependencies=[Depends(verify_token)])
-def get_payments(db: Database = Depends(get_db)):
+Month = constr(pattern=r"^\d{4}-\d{2}$")
+
+class MonthlyChargesIn(BaseModel):
+    month: Month
+    amount: float
+    concept: str = DEFAULT_CONCEPT
+    dueDay: conint(ge=1, le=28) = DEFAULT_DUE_DAY
+
+class MonthlyChargesOut(BaseModel):
+    month: str
+    created: int
+    skipped: int
+    failed: int
+
+class LedgerMonth(BaseModel):
+    apartment: str
+    month: str
+    billed: float = 0.0
+    paid: float = 0.0
+    pending: float = 0.0
+    overdue: float = 0.0
+    payments: int = 0
+    fines: float = 0.0
+    finesPaid: float = 0.0
+    finesCount: int = 0
+
+# Filtros de GET /payments
+async def payment_filters(
+    status: Optional[str] = None,
+    apartmentId: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+) -> dict:
+    query = date_range("dueDate", desde, hasta)
+    if status:
+        query["status"] = status
+    if apartmentId:
+        query["apartmentId"] = id_filter(apartmentId)
+    return query
+
+spec = CollectionSpec(
+    name="payments",
+    singular="payment",
+    serializer=serialize_payment,
+    model_in=PaymentIn,
+    model_out=PaymentOut,
+    filters=payment_filters,
+    etag=True,
+    owner_field="apartmentId",
+    sort_field="dueDate",
+    id_fields=("apartmentId",),
+    label="pago",
+    label_plural="pagos",
+    not_found="Pago no encontrado",
+    deleted="Pago eliminado",
+    on_change=on_payment_change,
+    aon_change=aon_payment_change,
+    on_changes=on_payment_changes,
+    aon_changes=aon_payment_changes,
+    operations=WITH_BULK,
+)
+
+router = APIRouter()
+
+# Campos que agrupa el resumen
+PAYMENT_SUMMARY = dict(amount="amount", status="status", concept="concept", apartment="apartmentId", date="dueDate")
+
+# GET /payments/summary — totales agregados en Mongo (antes de /{id})
+@router.get("/summary", response_model=Summary, dependencies=[Depends(verify_token)])
+def get_payments_summary(query: dict = Depends(payment_filters), db: Database = Depends(get_db)):
     try:
-        payments = [serialize_payment(p) for p in db["payments"].find()]
-        return payments
+        return summarize(db["payments"], query, **PAYMENT_SUMMARY)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener pagos: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error al resumir pagos: {str(e)}")
 
-# GET /payments/{id}
-@router.get("/{id}", response_model=PaymentOut, dependencies=[Depends(verify_token)])
-def get_payment(id: str, db: Database = Depends(get_db)):
+# Filtros de GET /payments/ledger (meses "YYYY-MM")
+async def ledger_filters(
+    apartmentId: Optional[str] = None,
+    desde: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    hasta: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+) -> dict:
+    query = {}
+    if apartmentId:
+        query["apartment"] = apartmentId
+    if desde or hasta:
+        query["month"] = {}
+        if desde:
+            query["month"]["$gte"] = desde
+        if hasta:
+            query["month"]["$lte"] = hasta
+    return query
+
+def _ledger_month(doc):
+    doc.pop("_id", None)
+    doc.pop("updatedAt", None)
+    return doc
+
+# GET /payments/ledger — estado de cuenta mensual desde ledger_rollups (antes de /{id})
+@router.get("/ledger", response_model=List[LedgerMonth], dependencies=[Depends(verify_token)])
+def get_ledger(query: dict = Depends(ledger_filters), db: Database = Depends(get_db)):
     try:
-        payment = db["payments"].find_one({"_id": ObjectId(id)})
-        if not payment:
-            raise HTTPException(status_code=404, detail="Pago no encontrado")
-        return serialize_payment(payment)
+        return [_ledger_month(d) for d in db[ROLLUPS_COLLECTION].find(query).sort([("apartment", 1), ("month", 1)])]
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener pago: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error al obtener estado de cuenta: {str(e)}")
 
-# POST /payments
-@router.post("/", response_model=PaymentOut, dependencies=[Depends(verify_token)])
-def create_payment(data: PaymentIn, db: Database = Depends(get_db)):
+# POST /payments/monthly-charges — cargo del mes para todos los apartamentos (idempotente)
+@router.post("/monthly-charges", response_model=MonthlyChargesOut, dependencies=[Depends(verify_token)])
+def create_monthly_charges(data: MonthlyChargesIn, db: Database = Depends(get_db)):
     try:
-        now = datetime.utcnow()
-        payment = data.dict()
-        if payment.get("apartmentId"):
-            payment["apartmentId"] = ObjectId(payment["apartmentId"])
-        payment.update({"createdAt": now, "updatedAt": now})
-        result = db["payments"].insert_one(payment)
-        new_payment = db["payments"].find_one({"_id": result.inserted_id})
-        return serialize_payment(new_payment)
+        return monthly_charges(db, data.month, data.amount, data.concept, data.dueDay)
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al crear pago: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error al generar cargos mensuales: {str(e)}")
+
+# GET/POST /payments, GET /payments/export, GET /payments/mine, POST/PATCH /payments/bulk, POST /payments/bulk/delete,
+# GET/PATCH/DELETE /payments/{id}
+build_router(spec, router)
 
-# PATCH /payments/{id}
-@router.patch("/{id}", response_model=PaymentOut, dependencies=[Depends(verify_token)])
-def update_payment(id: str, data: PaymentIn, db: Database = Depends(get_db)):
+# Variante async (MONGO_MODE=async)
+async_handlers = crud_handlers(spec)
+
+async def get_payments_summary_async(query: dict = Depends(payment_filters), db: AsyncDatabase = Depends(get_async_db)):
     try:
-        update_data = {k: v for k, v in data.dict().items() if v is not None}
-        if update_data.get("apartmentId"):
-            update_data["apartmentId"] = ObjectId(update_data["apartmentId"])
-        update_data["updatedAt"] = datetime.utcnow()
-        result = db["payments"].update_one({"_id": ObjectId(id)}, {"$set": update_data})
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Pago no encontrado")
-        updated = db["payments"].find_one({"_id": ObjectId(id)})
-        return serialize_payment(updated)
+        return await asummarize(db["payments"], query, **PAYMENT_SUMMARY)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al actualizar pago: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error al resumir pagos: {str(e)}")
 
-# DELETE /payments/{id}
-@router.delete("/{id}", dependencies=[Depends(verify_token)])
-def delete_payment(id: str, db: Database = Depends(get_db)):
+async def get_ledger_async(query: dict = Depends(ledger_filters), db: AsyncDatabase = Depends(get_async_db)):
     try:
-        result = db["payments"].delete_one({"_id": ObjectId(id)})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Pago no encontrado")
-        return {"msg": "Pago eliminado"}
+        cursor = db[ROLLUPS_COLLECTION].find(query).sort([("apartment", 1), ("month", 1)])
+        return [_ledger_month(d) async for d in cursor]
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al eliminar pago: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error al obtener estado de cuenta: {str(e)}")
+
+async def create_monthly_charges_async(data: MonthlyChargesIn, db: AsyncDatabase = Depends(get_async_db)):
+    try:
+        return await amonthly_charges(db, data.month, data.amount, data.concept, data.dueDay)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al generar cargos mensuales: {str(e)}")
+
+async_handlers["get_payments_summary"] = get_payments_summary_async
+async_handlers["get_ledger"] = get_ledger_async
+async_handlers["create_monthly_charges"] = create_monthly_charges_async
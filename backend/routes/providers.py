@@ -1,27 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pymongo.database import Database
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Optional
 from datetime import datetime
-from bson import ObjectId
 
-from backend.db.mongo import get_db
-from backend.utils.security import verify_token
+from backend.routes.async_crud import crud_handlers
+from backend.routes.factory import CollectionSpec, build_router
+from backend.utils.serializers import Field, compile_serializer, ID, FLOAT, NOW
 
-router = APIRouter()
-
-# Serializador
-def serialize_provider(provider):
-    provider["_id"] = str(provider["_id"])
-    provider["documentId"] = str(provider.get("documentId", ""))
-    provider["name"] = provider.get("name", "")
-    provider["service"] = provider.get("service", "")
-    provider["email"] = provider.get("email", "")
-    provider["phone"] = provider.get("phone", "")
-    provider["amount"] = float(provider.get("amount", 0))
-    provider["createdAt"] = provider.get("createdAt", datetime.utcnow())
-    provider["updatedAt"] = provider.get("updatedAt", datetime.utcnow())
-    return provider
+# Serializador compilado
+serialize_provider = compile_serializer([
+    Field("_id", ID),
+    Field("documentId", ID, ""),
+    Field("name", default=""),
+    Field("service", default=""),
+    Field("email", default=""),
+    Field("phone", default=""),
+    Field("amount", FLOAT, 0.0),
+    Field("createdAt", default=NOW),
+    Field("updatedAt", default=NOW),
+], "serialize_provider")
 
 # Modelos
 class ProviderIn(BaseModel):
@@ -37,65 +33,34 @@ class ProviderOut(ProviderIn):
     createdAt: datetime
     updatedAt: datetime
 
-# GET /providers
-@router.get("", response_model=List[ProviderOut], dependencies=[Depends(verify_token)])
-def get_providers(db: Database = Depends(get_db)):
-    try:
-        providers = [serialize_provider(p) for p in db["providers"].find()]
-        return providers
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener proveedores: {str(e)}")
-
-# GET /providers/{id}
-@router.get("/{id}", response_model=ProviderOut, dependencies=[Depends(verify_token)])
-def get_provider(id: str, db: Database = Depends(get_db)):
-    try:
-        provider = db["providers"].find_one({"_id": ObjectId(id)})
-        if not provider:
-            raise HTTPException(status_code=404, detail="Proveedor no encontrado")
-        return serialize_provider(provider)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener proveedor: {str(e)}")
-
-# POST /providers
-@router.post("", response_model=ProviderOut, dependencies=[Depends(verify_token)])
-def create_provider(data: ProviderIn, db: Database = Depends(get_db)):
-    try:
-        now = datetime.utcnow()
-        provider = data.dict()
+# Filtros de GET /providers
+async def provider_filters(
+    service: Optional[str] = None,
+) -> dict:
+    query = {}
+    if service:
+        query["service"] = service
+    return query
 
-        if provider.get("documentId"):
-            provider["documentId"] = ObjectId(provider["documentId"])
-        provider.update({"createdAt": now, "updatedAt": now})
-        result = db["providers"].insert_one(provider)
-        new_provider = db["providers"].find_one({"_id": result.inserted_id})
-        return serialize_provider(new_provider)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al crear proveedor: {str(e)}")
+spec = CollectionSpec(
+    name="providers",
+    singular="provider",
+    serializer=serialize_provider,
+    model_in=ProviderIn,
+    model_out=ProviderOut,
+    filters=provider_filters,
+    etag=True,
+    cache=True,
+    id_fields=("documentId",),
+    label="proveedor",
+    label_plural="proveedores",
+    not_found="Proveedor no encontrado",
+    deleted="Proveedor eliminado",
+    root="",
+)
 
-# PATCH /providers/{id}
-@router.patch("/{id}", response_model=ProviderOut, dependencies=[Depends(verify_token)])
-def update_provider(id: str, data: ProviderIn, db: Database = Depends(get_db)):
-    try:
-        update_data = {k: v for k, v in data.dict().items() if v is not None}
-        if "documentId" in update_data:
-            update_data["documentId"] = ObjectId(update_data["documentId"])
-        update_data["updatedAt"] = datetime.utcnow()
-        result = db["providers"].update_one({"_id": ObjectId(id)}, {"$set": update_data})
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Proveedor no encontrado")
-        updated = db["providers"].find_one({"_id": ObjectId(id)})
-        return serialize_provider(updated)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al actualizar proveedor: {str(e)}")
+# GET/POST /providers, GET /providers/export, GET/PATCH/DELETE /providers/{id}
+router = build_router(spec)
 
-# DELETE /providers/{id}
-@router.delete("/{id}", dependencies=[Depends(verify_token)])
-def delete_provider(id: str, db: Database = Depends(get_db)):
-    try:
-        result = db["providers"].delete_one({"_id": ObjectId(id)})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Proveedor no encontrado")
-        return {"msg": "Proveedor eliminado"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al eliminar proveedor: {str(e)}")
\ No newline at end of file
+# Variante async (MONGO_MODE=async)
+async_handlers = crud_handlers(spec)
@@ -1,25 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pymongo.database import Database
 from pydantic import BaseModel, EmailStr
-from typing import List, Optional
+from typing import Optional
 from datetime import datetime
-from bson import ObjectId
 
-from backend.db.mongo import get_db
-from backend.utils.security import verify_token
+from backend.routes.async_crud import crud_handlers
+from backend.routes.factory import CollectionSpec, build_router
+from backend.utils.serializers import Field, compile_serializer, ID, NOW
 
-router = APIRouter()
-
-# Serializador
-def serialize_user(user):
-    user["_id"] = str(user["_id"])
-    user["phone"] = user.get("phone", "")
-    user["role"] = user.get("role", "resident")
-    user["createdAt"] = user.get("createdAt", datetime.utcnow())
-    user["updatedAt"] = user.get("updatedAt", datetime.utcnow())
-    if "password" in user:
-        del user["password"]  # 🔐 Nunca enviar password
-    return user
+# Serializador compilado: 🔐 el password nunca forma parte de la salida
+serialize_user = compile_serializer([
+    Field("_id", ID),
+    Field("firstName"),
+    Field("lastName"),
+    Field("email"),
+    Field("phone", default=""),
+    Field("role", default="resident"),
+    Field("createdAt", default=NOW),
+    Field("updatedAt", default=NOW),
+], "serialize_user")
 
 # Modelos
 class UserIn(BaseModel):
@@ -40,60 +37,31 @@ class UserOut(BaseModel):
     createdAt: datetime
     updatedAt: datetime
 
-# GET /users
-@router.get("/", response_model=List[UserOut], dependencies=[Depends(verify_token)])
-def get_users(db: Database = Depends(get_db)):
-    try:
-        users = [serialize_user(u) for u in db["users"].find()]
-        return users
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener usuarios: {str(e)}")
-
-# GET /users/{id}
-@router.get("/{id}", response_model=UserOut, dependencies=[Depends(verify_token)])
-def get_user(id: str, db: Database = Depends(get_db)):
-    try:
-        user = db["users"].find_one({"_id": ObjectId(id)})
-        if not user:
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
-        return serialize_user(user)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al obtener usuario: {str(e)}")
+# Filtros de GET /users
+async def user_filters(
+    role: Optional[str] = None,
+) -> dict:
+    query = {}
+    if role:
+        query["role"] = role
+    return query
 
-# POST /users
-@router.post("/", response_model=UserOut, dependencies=[Depends(verify_token)])
-def create_user(data: UserIn, db: Database = Depends(get_db)):
-    try:
-        now = datetime.utcnow()
-        user = data.dict()
-        user.update({"createdAt": now, "updatedAt": now})
-        result = db["users"].insert_one(user)
-        new_user = db["users"].find_one({"_id": result.inserted_id})
-        return serialize_user(new_user)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al crear usuario: {str(e)}")
+spec = CollectionSpec(
+    name="users",
+    singular="user",
+    serializer=serialize_user,
+    model_in=UserIn,
+    model_out=UserOut,
+    filters=user_filters,
+    etag=True,
+    label="usuario",
+    label_plural="usuarios",
+    not_found="Usuario no encontrado",
+    deleted="Usuario eliminado",
+)
 
-# PATCH /users/{id}
-@router.patch("/{id}", response_model=UserOut, dependencies=[Depends(verify_token)])
-def update_user(id: str, data: UserIn, db: Database = Depends(get_db)):
-    try:
-        update_data = {k: v for k, v in data.dict().items() if v is not None}
-        update_data["updatedAt"] = datetime.utcnow()
-        result = db["users"].update_one({"_id": ObjectId(id)}, {"$set": update_data})
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
-        updated = db["users"].find_one({"_id": ObjectId(id)})
-        return serialize_user(updated)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al actualizar usuario: {str(e)}")
+# GET/POST /users, GET /users/export, GET/PATCH/DELETE /users/{id}
+router = build_router(spec)
 
-# DELETE /users/{id}
-@router.delete("/{id}", dependencies=[Depends(verify_token)])
-def delete_user(id: str, db: Database = Depends(get_db)):
-    try:
-        result = db["users"].delete_one({"_id": ObjectId(id)})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Usuario no encontrado")
-        return {"msg": "Usuario eliminado"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al eliminar usuario: {str(e)}")
\ No newline at end of file
+# Variante async (MONGO_MODE=async)
+async_handlers = crud_handlers(spec)
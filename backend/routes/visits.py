@@ -1,21 +1,247 @@
-from fastapi import APIRouter, Depends
-from backend.db.mongo import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pymongo.database import Database
-from backend.utils.security import verify_token
+from pymongo.asynchronous.database import AsyncDatabase
+from pydantic import BaseModel, constr, model_validator
+import pydantic
 from bson import ObjectId
+from datetime import datetime
+from typing import List, Literal, Optional
+import base64
+import os
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.db.bulk import insert_docs, ainsert_docs
+from backend.db.gate import gate
+from backend.db.mongo import get_db, get_async_db
+from backend.routes.async_crud import crud_handlers
+from backend.routes.factory import CollectionSpec, build_router, notify_changes, anotify_changes
+from backend.utils.etag import conditional, aconditional
+from backend.utils.pagination import id_filter, date_range
+from backend.utils.passes import pass_expiry, visit_expiry, visit_pass
+from backend.utils.qr import MEDIA_TYPES, qr_key, qr_image, aqr_image, qr_images, aqr_images
+from backend.utils.security import verify_token
+from backend.utils.serializers import Field, compile_serializer, ID
+
+# Máximo de invitados por POST /visits/passes (cada uno es un render de QR)
+QR_BATCH_MAX = int(os.getenv("QR_BATCH_MAX", 500))
+
+serialize_visit = compile_serializer([
+    Field("_id", ID),
+    Field("apartmentId", ID, ""),  # Forzamos string aquí también
+    Field("visitorName", default=""),
+    Field("entryTime"),
+    Field("exitTime"),
+    Field("passExpiresAt"),
+    Field("status"),  # "inside" / "left" según los escaneos en la puerta
+], "serialize_visit")
+
+# Modelos
+class VisitIn(BaseModel):
+    apartmentId: str
+    visitorName: str
+    entryTime: Optional[datetime] = None     # por defecto: ahora
+    exitTime: Optional[datetime] = None
+    passExpiresAt: Optional[datetime] = None  # por defecto: exitTime o entryTime + QR_PASS_HOURS
+
+    @model_validator(mode="after")
+    def _pass_expiry(self):
+        if self.entryTime is None:
+            self.entryTime = datetime.utcnow()
+        if self.passExpiresAt is None:
+            self.passExpiresAt = pass_expiry(self.entryTime, self.exitTime)
+        return self
+
+class VisitOut(BaseModel):
+    # Alias: un campo "_id" sería privado para pydantic y se perdería en la respuesta de POST /visits
+    id: str = pydantic.Field(alias="_id")
+    apartmentId: str
+    visitorName: str
+    entryTime: Optional[datetime] = None
+    exitTime: Optional[datetime] = None
+    passExpiresAt: Optional[datetime] = None
+    status: Optional[str] = None
+
+class GuestListIn(BaseModel):
+    apartmentId: str
+    guests: List[constr(strip_whitespace=True, min_length=1)]
+    entryTime: Optional[datetime] = None
+    exitTime: Optional[datetime] = None
+
+class VisitPass(BaseModel):
+    id: str
+    visitorName: str
+    passExpiresAt: datetime
+    token: str  # el pase firmado: lo que codifica el QR y lo que valida el guardia
+    qr: str     # data URI (image/png o image/svg+xml en base64)
+
+class VisitPassesOut(BaseModel):
+    items: List[VisitPass]
+
+class VerifyIn(BaseModel):
+    token: str
+    action: Optional[Literal["entry", "exit"]] = None  # sin action: entrada si no está dentro, si no salida
+
+class VerifyOut(BaseModel):
+    valid: bool
+    message: str
+    action: Optional[str] = None
+    visit: Optional[VisitOut] = None
+
+# Filtros de GET /visits
+async def visit_filters(
+    apartmentId: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+) -> dict:
+    query = date_range("entryTime", desde, hasta)
+    if apartmentId:
+        query["apartmentId"] = id_filter(apartmentId)
+    return query
+
+spec = CollectionSpec(
+    name="visits",
+    singular="visit",
+    serializer=serialize_visit,
+    model_in=VisitIn,
+    model_out=VisitOut,
+    filters=visit_filters,
+    id_fields=("apartmentId",),
+    owner_field="apartmentId",
+    sort_field="entryTime",
+    label="visita",
+    label_plural="visitas",
+    not_found="Visita no encontrada",
+    operations=("list", "export", "get", "create"),
+    etag=True,
+)
 
 router = APIRouter()
 
-@router.get("/", dependencies=[Depends(verify_token)])
-def get_visits(db: Database = Depends(get_db)):
-    visitas_cursor = db["visits"].find()
-    visitas = []
-    for visita in visitas_cursor:
-        visitas.append({
-            "_id": str(visita["_id"]),
-            "apartmentId": str(visita.get("apartmentId", "")),  # Forzamos string aquí también
-            "visitorName": visita.get("visitorName", ""),
-            "entryTime": visita.get("entryTime"),
-            "exitTime": visita.get("exitTime", None)
-        })
-    return visitas
\ No newline at end of file
+# Lo único que hace falta para firmar el pase
+PASS_FIELDS = {"passExpiresAt": 1, "entryTime": 1, "exitTime": 1}
+
+def _pass_doc(doc):
+    if not doc:
+        raise HTTPException(status_code=404, detail=spec.not_found)
+    if visit_expiry(doc) < datetime.utcnow():
+        raise HTTPException(status_code=410, detail="El pase de esta visita ya venció")
+    return visit_pass(doc)
+
+def _qr_etag(token: str, formato: str) -> str:
+    # La imagen de un pase nunca cambia: su huella es un ETag fuerte
+    return f'"{qr_key(token, formato)[:32]}"'
+
+def _visit_id(id: str) -> ObjectId:
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=400, detail="ID inválido")
+    return ObjectId(id)
+
+def _guest_visits(data: GuestListIn):
+    entry = data.entryTime or datetime.utcnow()
+    expires = pass_expiry(entry, data.exitTime)
+    apartment = ObjectId(data.apartmentId)
+    return [
+        (i, {"apartmentId": apartment, "visitorName": guest, "entryTime": entry, "exitTime": data.exitTime, "passExpiresAt": expires})
+        for i, guest in enumerate(data.guests)
+    ]
+
+def _check_guests(data: GuestListIn):
+    if not ObjectId.is_valid(data.apartmentId):
+        raise HTTPException(status_code=400, detail="ID inválido")
+    if not data.guests:
+        raise HTTPException(status_code=400, detail="La lista de invitados está vacía")
+    if len(data.guests) > QR_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"Máximo {QR_BATCH_MAX} invitados por solicitud")
+
+def _pass_items(docs, tokens, images, formato: str):
+    prefix = f"data:{MEDIA_TYPES[formato]};base64,"
+    return [
+        {"id": str(doc["_id"]), "visitorName": doc["visitorName"], "passExpiresAt": doc["passExpiresAt"], "token": token, "qr": prefix + base64.b64encode(image).decode()}
+        for doc, token, image in zip(docs, tokens, images)
+    ]
+
+# GET /visits/{id}/qr — pase de la visita como imagen (formato=png|svg)
+@router.get("/{id}/qr", dependencies=[Depends(verify_token)])
+def get_visit_qr(id: str, request: Request, response: Response, formato: Literal["png", "svg"] = "png", db: Database = Depends(get_db)):
+    visit_id = _visit_id(id)
+    try:
+        doc = db["visits"].find_one({"_id": visit_id}, PASS_FIELDS)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener visita: {str(e)}")
+    token = _pass_doc(doc)
+    return conditional(request, response, _qr_etag(token, formato), lambda: Response(qr_image(token, formato), media_type=MEDIA_TYPES[formato]))
+
+# POST /visits/passes — una visita y su pase por invitado (eventos), QR renderizados en paralelo
+@router.post("/passes", response_model=VisitPassesOut, dependencies=[Depends(verify_token)])
+def create_visit_passes(data: GuestListIn, formato: Literal["png", "svg"] = "png", db: Database = Depends(get_db)):
+    _check_guests(data)
+    try:
+        _, inserted = insert_docs(db["visits"], _guest_visits(data))
+        notify_changes(spec, db, [(None, doc) for doc in inserted])
+        tokens = [visit_pass(doc) for doc in inserted]
+        return {"items": _pass_items(inserted, tokens, qr_images(tokens, formato), formato)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al generar pases: {str(e)}")
+
+def _verify_out(result: dict):
+    if result["visit"] is not None:
+        result["visit"] = serialize_visit(result["visit"])
+    return result
+
+# POST /visits/verify — escaneo del guardia. async: un pase en el hot set se
+# resuelve en el event loop, sin threadpool ni Mongo (backend/db/gate.py)
+@router.post("/verify", response_model=VerifyOut, dependencies=[Depends(verify_token)])
+async def verify_visit(data: VerifyIn):
+    try:
+        result, visit_id, doc = gate.lookup(data.token)
+        if result is None:
+            if doc is None:
+                doc = await run_in_threadpool(gate.find, get_db(), visit_id)
+            result = gate.record(visit_id, doc, data.action)
+        return _verify_out(result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al verificar pase: {str(e)}")
+
+# GET /visits, POST /visits, GET /visits/export, GET /visits/mine, GET /visits/{id}
+build_router(spec, router)
+
+# Variante async (MONGO_MODE=async)
+async_handlers = crud_handlers(spec)
+
+async def get_visit_qr_async(id: str, request: Request, response: Response, formato: Literal["png", "svg"] = "png", db: AsyncDatabase = Depends(get_async_db)):
+    visit_id = _visit_id(id)
+    try:
+        doc = await db["visits"].find_one({"_id": visit_id}, PASS_FIELDS)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al obtener visita: {str(e)}")
+    token = _pass_doc(doc)
+
+    async def load():
+        return Response(await aqr_image(token, formato), media_type=MEDIA_TYPES[formato])
+
+    return await aconditional(request, response, _qr_etag(token, formato), load)
+
+async def create_visit_passes_async(data: GuestListIn, formato: Literal["png", "svg"] = "png", db: AsyncDatabase = Depends(get_async_db)):
+    _check_guests(data)
+    try:
+        _, inserted = await ainsert_docs(db["visits"], _guest_visits(data))
+        await anotify_changes(spec, db, [(None, doc) for doc in inserted])
+        tokens = [visit_pass(doc) for doc in inserted]
+        return {"items": _pass_items(inserted, tokens, await aqr_images(tokens, formato), formato)}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al generar pases: {str(e)}")
+
+async def verify_visit_async(data: VerifyIn, db: AsyncDatabase = Depends(get_async_db)):
+    try:
+        return _verify_out(await gate.averify(db, data.token, data.action))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al verificar pase: {str(e)}")
+
+async_handlers["get_visit_qr"] = get_visit_qr_async
+async_handlers["create_visit_passes"] = create_visit_passes_async
+async_handlers["verify_visit"] = verify_visit_async
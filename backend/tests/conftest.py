@@ -0,0 +1,60 @@
+# backend/tests/conftest.py
+#
+# Las pruebas corren contra mongomock: nunca tocan el MONGO_URI del .env.
+# Las marcadas con @pytest.mark.mongod corren además contra un mongod real si
+# MONGO_URI viene del entorno (CI), en una base desechable que se borra al final:
+#   MONGO_URI=mongodb://localhost:27017 python -m pytest -q backend/tests -m mongod
+# Requiere: pip install pytest mongomock
+
+import os
+
+# Solo la del entorno del proceso: el .env todavía no se ha cargado
+REAL_MONGO_URI = os.environ.get("MONGO_URI")
+os.environ["MONGO_URI"] = "mongodb://127.0.0.1:1"  # antes de importar backend (load_dotenv no la pisa)
+os.environ.setdefault("JWT_SECRET", "tests")
+
+import mongomock
+import mongomock.collection
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+
+from backend.db import mongo
+
+# mongomock 4.3 no acepta sort= en UpdateOne (pymongo >= 4.11)
+_add_update = mongomock.collection.BulkOperationBuilder.add_update
+mongomock.collection.BulkOperationBuilder.add_update = lambda self, *a, sort=None, **k: _add_update(self, *a, **k)
+
+@pytest.fixture
+def db(monkeypatch):
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(mongo, "_client", client)
+    monkeypatch.setattr(mongo, "connect", lambda: client)
+    monkeypatch.setattr(mongo, "close", lambda: None)
+    return client[mongo.DB_NAME]
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "mongod: también corre contra un mongod real cuando MONGO_URI está definido")
+
+@pytest.fixture
+def real_db():
+    if not REAL_MONGO_URI:
+        pytest.skip("MONGO_URI no definido: se necesita un mongod real")
+    client = MongoClient(REAL_MONGO_URI, serverSelectionTimeoutMS=5000)
+    name = f"{mongo.DB_NAME}_test_{ObjectId()}"
+    try:
+        yield client[name]
+    finally:
+        client.drop_database(name)
+        client.close()
+
+@pytest.fixture
+def client(db):
+    from backend.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+def auth_headers(user_id="u1", role="admin"):
+    from backend.utils.jwt_handler import create_access_token
+    return {"Authorization": f"Bearer {create_access_token({'user_id': user_id, 'role': role})}"}
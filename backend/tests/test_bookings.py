@@ -0,0 +1,122 @@
+# backend/tests/test_bookings.py
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from backend.db.slots import SLOTS_COLLECTION, clear_availability_cache, slot_key, sweep_orphan_slots
+from backend.tests.conftest import auth_headers
+
+H = auth_headers()
+
+@pytest.fixture(autouse=True)
+def _fresh_bitmaps():
+    clear_availability_cache()
+    yield
+    clear_availability_cache()
+
+def _booking(inicio, horas=1, instalacion="alberca"):
+    return {"instalacion": instalacion, "fechaInicio": inicio.isoformat(), "fechaFin": (inicio + timedelta(hours=horas)).isoformat()}
+
+def test_concurrent_overlapping_posts_only_one_wins(client, db):
+    base = datetime(2030, 3, 1, 10, 0)
+    # Todas se traslapan en 11:00-12:00 con inicios y duraciones distintas
+    bodies = [_booking(base + timedelta(minutes=30 * (i % 3)), horas=2) for i in range(12)]
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        codes = list(pool.map(lambda b: client.post("/bookings/", json=b, headers=H).status_code, bodies))
+    assert codes.count(200) == 1
+    assert codes.count(409) == len(bodies) - 1
+    booking = db.bookings.find_one()
+    assert db.bookings.count_documents({}) == 1
+    assert {d["bookingId"] for d in db[SLOTS_COLLECTION].find()} == {booking["_id"]}
+
+def test_patch_onto_occupied_slot_keeps_original_slots(client, db):
+    for hour in (10, 14):
+        assert client.post("/bookings/", json=_booking(datetime(2030, 3, 2, hour, 0)), headers=H).status_code == 200
+    # BookingOut no expone _id (atributo privado de pydantic): se toman de la base
+    first_id, second_id = (d["_id"] for d in db.bookings.find().sort("fechaInicio", 1))
+    before = sorted(d["_id"] for d in db[SLOTS_COLLECTION].find({"bookingId": second_id}))
+
+    r = client.patch(f"/bookings/{second_id}", json=_booking(datetime(2030, 3, 2, 10, 30)), headers=H)
+    assert r.status_code == 409
+    assert sorted(d["_id"] for d in db[SLOTS_COLLECTION].find({"bookingId": second_id})) == before
+    assert db.bookings.find_one({"_id": second_id})["fechaInicio"] == datetime(2030, 3, 2, 14, 0)
+    assert db[SLOTS_COLLECTION].count_documents({"bookingId": first_id}) == len(before)
+
+    # Los horarios de ambas reservas siguen ocupados
+    horarios = client.get("/bookings/horarios", params={"instalacion": "alberca", "fecha": "2030-03-02"}, headers=H).json()
+    assert horarios == [{"inicio": 10, "fin": 11}, {"inicio": 14, "fin": 15}]
+
+def test_sweep_releases_slots_of_missing_bookings(db):
+    old, recent, alive = ObjectId.from_datetime(datetime(2020, 1, 1)), ObjectId(), ObjectId.from_datetime(datetime(2020, 1, 2))
+    db.bookings.insert_one({"_id": alive})
+    db[SLOTS_COLLECTION].insert_many([
+        {"_id": slot_key("gym", datetime(2030, 1, 1, h)), "bookingId": b}
+        for h, b in ((8, old), (9, recent), (10, alive))
+    ])
+    assert sweep_orphan_slots(db) == 1
+    assert {d["bookingId"] for d in db[SLOTS_COLLECTION].find()} == {recent, alive}
+
+def test_claim_rolls_back_on_connection_error(db, monkeypatch):
+    from pymongo.errors import AutoReconnect
+    from backend.db.slots import SLOT, claim_slots
+
+    slots = db[SLOTS_COLLECTION]
+    insert_many = slots.insert_many
+
+    def drop_midway(docs, ordered=True):
+        insert_many(docs[:1], ordered=ordered)
+        raise AutoReconnect("conexión perdida")
+
+    monkeypatch.setattr(type(slots), "insert_many", lambda self, docs, ordered=True: drop_midway(docs, ordered))
+    with pytest.raises(AutoReconnect):
+        claim_slots(db, ObjectId(), "gym", datetime(2030, 1, 1, 8), datetime(2030, 1, 1, 10))
+    assert slots.count_documents({}) == 0
+
+def test_availability_follows_writes_from_other_workers(db):
+    from datetime import date
+    from backend.db.slots import day_bitmaps
+    from backend.db.versions import bump_version
+
+    day = date(2030, 1, 1)
+    assert day_bitmaps(db, "gym", day, day)[day] == 0
+    # Otro worker toma un bloque: no pasa por la caché de este proceso, solo sube la versión
+    db[SLOTS_COLLECTION].insert_one({"_id": slot_key("gym", datetime(2030, 1, 1, 0, 0)), "bookingId": ObjectId()})
+    assert day_bitmaps(db, "gym", day, day)[day] == 0  # sin versión nueva sigue cacheado
+    bump_version(db, f"{SLOTS_COLLECTION}:gym")
+    assert day_bitmaps(db, "gym", day, day)[day] == 1
+
+@pytest.fixture(params=["mongomock", pytest.param("mongod", marks=pytest.mark.mongod)])
+def slots_db(request):
+    return request.getfixturevalue("db" if request.param == "mongomock" else "real_db")
+
+def test_concurrent_claims_on_overlapping_ranges_only_one_wins(slots_db):
+    from threading import Barrier
+    from fastapi import HTTPException
+    from backend.db.slots import SLOT, claim_slots
+
+    # Inicios distintos y el mismo último bloque: todas se traslapan y quien
+    # toma ese bloque ya tiene los anteriores, así que siempre hay un ganador
+    fin = datetime(2030, 4, 1, 12, 0)
+    claims = [(ObjectId(), fin - SLOT * (1 + i % 4)) for i in range(16)]
+    start = Barrier(len(claims))
+
+    def claim(booking_id, inicio):
+        start.wait()
+        try:
+            claim_slots(slots_db, booking_id, "cancha", inicio, fin)
+            return booking_id
+        except HTTPException as e:
+            assert e.status_code == 409
+            return None
+
+    with ThreadPoolExecutor(max_workers=len(claims)) as pool:
+        winners = [b for b in pool.map(lambda c: claim(*c), claims) if b is not None]
+    assert len(winners) == 1
+    inicio = dict(claims)[winners[0]]
+    # Los perdedores deshicieron lo que alcanzaron a tomar
+    slots = list(slots_db[SLOTS_COLLECTION].find())
+    assert {d["bookingId"] for d in slots} == set(winners)
+    assert len(slots) == (fin - inicio) // SLOT
@@ -0,0 +1,67 @@
+# backend/tests/test_bulk.py
+
+from bson import ObjectId
+
+from backend.db.bulk import insert_docs
+from backend.db.charges import monthly_charges
+from backend.db.rollups import check_rollups
+from backend.tests.conftest import auth_headers
+
+APT = "0000000000000000000000a1"
+PAYMENT = {"apartmentId": APT, "amount": 100, "concept": "Cuota", "dueDate": "2026-01-10T00:00:00"}
+
+def test_bulk_create_reports_each_item(client, db):
+    body = [PAYMENT, {"concept": "Sin monto"}, {**PAYMENT, "apartmentId": "no-es-id"}, {**PAYMENT, "amount": 5}]
+    result = client.post("/payments/bulk", json=body, headers=auth_headers()).json()
+    assert (result["ok"], result["failed"]) == (2, 2)
+    items = result["items"]
+    assert [(i["index"], i["ok"]) for i in items] == [(0, True), (1, False), (2, False), (3, True)]
+    assert ObjectId.is_valid(items[0]["id"])
+    assert "amount" in items[1]["error"]
+    assert "ObjectId" in items[2]["error"]
+    assert db.payments.count_documents({}) == 2
+
+def test_bulk_update_and_delete_report_missing_and_malformed_ids(client, db):
+    H = auth_headers()
+    ids = [str(i) for i in db.payments.insert_many([dict(PAYMENT), dict(PAYMENT)]).inserted_ids]
+    missing = str(ObjectId())
+
+    result = client.patch("/payments/bulk", json=[
+        {"id": ids[0], "data": {**PAYMENT, "status": "paid"}},
+        {"id": missing, "data": PAYMENT},
+        {"id": "x", "data": PAYMENT},
+        {"id": ids[1], "data": {"status": "paid"}},  # PaymentIn incompleto
+    ], headers=H).json()
+    assert [i["ok"] for i in result["items"]] == [True, False, False, False]
+    assert result["items"][1]["error"] == "No encontrado"
+    assert db.payments.find_one({"_id": ObjectId(ids[0])})["status"] == "paid"
+
+    result = client.post("/payments/bulk/delete", json={"ids": [ids[0], ids[0], missing, "x"]}, headers=H).json()
+    assert [i["ok"] for i in result["items"]] == [True, False, False, False]
+    assert db.payments.count_documents({}) == 1
+
+def test_write_errors_only_fail_their_own_item(db):
+    taken = db.payments.insert_one({"amount": 1}).inserted_id
+    results, inserted = insert_docs(db.payments, [(0, {"amount": 2}), (1, {"_id": taken, "amount": 3}), (2, {"amount": 4})])
+    assert [results[i].ok for i in range(3)] == [True, False, True]
+    assert results[1].error
+    assert sorted(d["amount"] for d in inserted) == [2, 4]
+
+def test_monthly_charges_are_idempotent(db):
+    db.apartments.insert_many([{"number": "101"}, {"number": "102"}, {"number": "103"}])
+    first = monthly_charges(db, "2026-03", 1200)
+    assert first == {"month": "2026-03", "created": 3, "skipped": 0, "failed": 0}
+
+    db.apartments.insert_one({"number": "104"})
+    second = monthly_charges(db, "2026-03", 1200)
+    assert second == {"month": "2026-03", "created": 1, "skipped": 3, "failed": 0}
+    assert db.payments.count_documents({"concept": "Mantenimiento mensual"}) == 4
+
+    # Otro concepto u otro mes sí se factura aparte
+    assert monthly_charges(db, "2026-04", 1200)["created"] == 4
+    assert check_rollups(db) == []
+
+def test_monthly_charges_route_validates_the_month(client, db):
+    H = auth_headers()
+    assert client.post("/payments/monthly-charges", json={"month": "2026-13", "amount": 1}, headers=H).status_code == 400
+    assert client.post("/payments/monthly-charges", json={"month": "marzo", "amount": 1}, headers=H).status_code == 422
@@ -0,0 +1,93 @@
+# backend/tests/test_cache.py
+
+from datetime import datetime
+
+import pytest
+
+from backend.tests.conftest import auth_headers
+from backend.utils import responses
+from backend.utils.cache import cache_stats, reset_cache
+
+H = auth_headers()
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    reset_cache()
+    yield
+    reset_cache()
+
+@pytest.mark.parametrize("fast_json", [False, True])
+def test_cache_hit_matches_miss(client, db, monkeypatch, fast_json):
+    monkeypatch.setattr(responses, "FAST_JSON", fast_json)
+    result = db.providers.insert_many([
+        {"name": f"Proveedor {i}", "service": "agua", "phone": "555", "createdAt": datetime(2025, 1, 1)} for i in range(3)
+    ])
+    for path in ("/providers/?limit=2", f"/providers/{result.inserted_ids[0]}"):
+        miss, hit = (client.get(path, headers=H) for _ in range(2))
+        assert miss.status_code == hit.status_code == 200
+        assert hit.content == miss.content
+        assert hit.headers.get("content-type") == miss.headers.get("content-type")
+        assert hit.headers.get("x-next-cursor") == miss.headers.get("x-next-cursor")
+    assert cache_stats()["collections"]["providers"]["hits"] == 2
+
+class RedisLike:
+    """Lo mínimo de redis-py que usa el caché, con su validación de `ex`."""
+
+    def __init__(self, down=False):
+        self.data = {}
+        self.down = down
+
+    def _check(self):
+        if self.down:
+            raise ConnectionRefusedError("redis caído")
+
+    def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self._check()
+        if ex is not None and not isinstance(ex, int):
+            raise TypeError("ex must be datetime.timedelta or int")
+        self.data[key] = value
+
+    def incr(self, key):
+        self._check()
+        self.data[key] = str(int(self.data.get(key, b"0")) + 1).encode()
+        return int(self.data[key])
+
+def test_redis_backend_stores_with_integer_ttl(monkeypatch):
+    from fastapi.responses import Response
+    from backend.utils import cache
+
+    monkeypatch.setattr(cache, "backend", RedisLike())
+    loads = []
+
+    def load():
+        loads.append(1)
+        return Response(b"[1]", media_type="application/json")
+
+    for _ in range(2):
+        assert cache.cached_response("providers", "k", load).body == b"[1]"
+    assert len(loads) == 1
+    assert cache.cache_stats()["collections"]["providers"]["errors"] == 0
+
+def test_only_outages_count_as_cache_errors(monkeypatch):
+    from fastapi.responses import Response
+    from backend.utils import cache
+
+    monkeypatch.setattr(cache, "backend", RedisLike(down=True))
+    response = cache.cached_response("providers", "k", lambda: Response(b"[]"))
+    assert response.body == b"[]"
+    assert cache.cache_stats()["collections"]["providers"]["errors"] == 1  # el get falla: no se intenta guardar
+
+    broken = RedisLike()
+    broken.set = lambda key, value, ex=None: (_ for _ in ()).throw(TypeError("mal uso"))
+    monkeypatch.setattr(cache, "backend", broken)
+    with pytest.raises(TypeError):
+        cache.cached_response("providers", "k2", lambda: Response(b"[]"))
+
+def test_cache_stats_require_admin(client):
+    assert client.get("/health/cache").status_code in (401, 403)
+    assert client.get("/health/cache", headers=auth_headers(role="resident")).status_code == 403
+    assert client.get("/health/cache", headers=H).json()["backend"] == "local"
@@ -0,0 +1,21 @@
+# backend/tests/test_crud.py
+
+from backend.db.crud import insert_returning, update_returning, update_with_before
+from backend.tests.conftest import auth_headers
+
+def test_returned_timestamps_match_what_mongo_stores(db):
+    doc = insert_returning(db.providers, {"name": "Gas"})
+    assert doc["createdAt"].microsecond % 1000 == 0
+    assert db.providers.find_one({"_id": doc["_id"]})["createdAt"] == doc["createdAt"]
+
+    _, after = update_with_before(db.providers, str(doc["_id"]), {"name": "Gas LP"})
+    assert after["updatedAt"].microsecond % 1000 == 0
+    assert update_returning(db.providers, str(doc["_id"]), {})["updatedAt"].microsecond % 1000 == 0
+
+def test_post_and_get_return_the_same_timestamps(client, db):
+    H = auth_headers()
+    created = client.post("/incidents/", json={"userId": "0000000000000000000000a1", "title": "Fuga"}, headers=H)
+    assert created.status_code == 200, created.text
+    incident_id = db.incidents.find_one()["_id"]  # IncidentOut no expone _id (atributo privado)
+    fetched = client.get(f"/incidents/{incident_id}", headers=H).json()
+    assert created.json()["createdAt"] == fetched["createdAt"]
@@ -0,0 +1,49 @@
+# backend/tests/test_etag.py
+
+from backend.tests.conftest import auth_headers
+from backend.utils.etag import _matches
+
+PAYMENT = {"apartmentId": "0000000000000000000000a1", "amount": 100, "concept": "Cuota", "dueDate": "2026-01-10T00:00:00"}
+
+def test_list_answers_304_until_a_write(client, db):
+    H = auth_headers()
+    client.post("/payments/", json=PAYMENT, headers=H)
+
+    first = client.get("/payments/", headers=H)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+    assert first.headers["Cache-Control"].startswith("private")
+
+    cached = client.get("/payments/", headers={**H, "If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    # Otra consulta, otra huella
+    assert client.get("/payments/?status=paid", headers=H).headers["ETag"] != etag
+
+    client.post("/payments/", json={**PAYMENT, "amount": 5}, headers=H)
+    fresh = client.get("/payments/", headers={**H, "If-None-Match": etag})
+    assert fresh.status_code == 200 and len(fresh.json()) == 2
+    assert fresh.headers["ETag"] != etag
+
+def test_detail_gets_a_new_etag_after_an_update(client, db):
+    H = auth_headers()
+    client.post("/payments/", json=PAYMENT, headers=H)
+    payment_id = db.payments.find_one()["_id"]  # PaymentOut no expone _id
+
+    etag = client.get(f"/payments/{payment_id}", headers=H).headers["ETag"]
+    assert client.get(f"/payments/{payment_id}", headers={**H, "If-None-Match": etag}).status_code == 304
+
+    client.patch(f"/payments/{payment_id}", json={**PAYMENT, "status": "paid"}, headers=H)
+    updated = client.get(f"/payments/{payment_id}", headers={**H, "If-None-Match": etag})
+    assert updated.status_code == 200 and updated.json()["status"] == "paid"
+    assert updated.headers["ETag"] != etag
+
+def test_if_none_match_uses_weak_comparison():
+    etag = 'W/"3-abc"'
+    assert _matches('W/"3-abc"', etag)
+    assert _matches('"3-abc"', etag)
+    assert _matches('"1-x", W/"3-abc"', etag)
+    assert _matches("*", etag)
+    assert not _matches('W/"2-abc"', etag)
+    assert not _matches(None, etag)
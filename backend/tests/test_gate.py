@@ -0,0 +1,41 @@
+# backend/tests/test_gate.py
+
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from backend.db.gate import Gate
+
+@pytest.fixture
+def visit(db):
+    visit_id = ObjectId()
+    db.visits.insert_one({"_id": visit_id, "visitorName": "Ana", "entryTime": datetime(2030, 1, 1)})
+    return str(visit_id), db.visits.find_one({"_id": visit_id})
+
+def test_pass_cannot_reenter_after_exit(visit):
+    gate = Gate()
+    visit_id, doc = visit
+    assert gate.record(visit_id, doc, None)["action"] == "entry"
+    entry_time = gate.record(visit_id, doc, None)["visit"]["entryTime"]
+    for action in (None, "entry"):
+        result = gate.record(visit_id, doc, action)
+        assert not result["valid"]
+        assert result["visit"]["entryTime"] == entry_time
+
+def test_flush_requeues_batch_on_any_error(db, visit, monkeypatch):
+    gate = Gate()
+    visit_id, doc = visit
+    gate.record(visit_id, doc, "entry")
+
+    def broken(*args, **kwargs):
+        raise ValueError("inesperado")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(type(db.visits), "bulk_write", broken)
+        gate.flush(db)
+    assert visit_id in gate._pending and gate.stats["write_errors"] == 1
+
+    gate.flush(db)
+    assert not gate._pending
+    assert db.visits.find_one({"_id": ObjectId(visit_id)})["status"] == "inside"
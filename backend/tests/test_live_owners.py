@@ -0,0 +1,78 @@
+# backend/tests/test_live_owners.py
+
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from backend.db.changes import Subscription
+from backend.db.owners import clear_owner_cache
+from backend.routes.live import _owners
+
+@pytest.fixture
+def apartments(db):
+    clear_owner_cache()
+    mine, other = ObjectId(), ObjectId()
+    db.apartments.insert_many([
+        {"_id": mine, "userId": ObjectId("0000000000000000000000a1")},
+        {"_id": other, "userId": ObjectId("0000000000000000000000b2")},
+    ])
+    yield str(mine), str(other)
+    clear_owner_cache()
+
+def _resident():
+    return {"user_id": "0000000000000000000000a1", "role": "resident"}
+
+def test_resident_is_always_scoped_to_own_apartments(apartments):
+    mine, _ = apartments
+    owners = asyncio.run(_owners(_resident(), None, False))
+    assert owners == {"apartmentId": {mine}, "userId": {"0000000000000000000000a1"}}
+
+def test_resident_cannot_subscribe_to_another_apartment(apartments):
+    _, other = apartments
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(_owners(_resident(), other, False))
+    assert e.value.status_code == 403
+
+def test_admin_apartment_filter_also_scopes_user_collections(apartments):
+    _, other = apartments
+    owners = asyncio.run(_owners({"user_id": "x", "role": "admin"}, other, False))
+    assert owners == {"apartmentId": {other}, "userId": {"0000000000000000000000b2"}}
+    assert asyncio.run(_owners({"user_id": "x", "role": "admin"}, None, False)) is None
+
+def test_subscription_filters_every_owned_field():
+    sub = Subscription(None, ["payments", "incidents", "announcements"], {"apartmentId": {"a1"}})
+    assert sub.matches("payments", "apartmentId", "a1", "insert")
+    assert not sub.matches("payments", "apartmentId", "b2", "update")
+    assert not sub.matches("incidents", "userId", "u9", "insert")  # sin dueños de userId: nada
+    assert sub.matches("announcements", None, None, "insert")
+    assert Subscription(None, ["incidents"]).matches("incidents", "userId", "u9", "insert")
+
+def test_payment_without_apartment_only_reaches_unscoped_subscribers():
+    scoped = Subscription(None, ["payments"], {"apartmentId": {"a1"}, "userId": {"u1"}})
+    admin = Subscription(None, ["payments"])
+    for op in ("insert", "update"):
+        assert not scoped.matches("payments", "apartmentId", None, op)
+        assert admin.matches("payments", "apartmentId", None, op)
+    assert scoped.matches("payments", "apartmentId", None, "delete")  # solo el _id
+
+def test_publish_keeps_ownerless_payment_from_residents(monkeypatch):
+    from backend.db import changes
+    from backend.db.changes import ChangeHub
+
+    hub = ChangeHub()
+    hub.watch("payments", lambda d: d, "apartmentId")
+    delivered = []
+    monkeypatch.setattr(changes, "_deliver", lambda subs, data: delivered.extend(subs))
+
+    class Loop:
+        def call_soon_threadsafe(self, fn, *args):
+            fn(*args)
+
+    scoped = Subscription(Loop(), ["payments"], {"apartmentId": {"a1"}})
+    admin = Subscription(Loop(), ["payments"])
+    hub._subscribers.update({scoped, admin})
+    for doc in ({"_id": 1}, {"_id": 2, "apartmentId": None}, {"_id": 3, "apartmentId": ""}):
+        hub.publish("payments", "insert", doc["_id"], doc)
+    assert delivered == [admin, admin, admin]
@@ -0,0 +1,42 @@
+# backend/tests/test_live_poll.py
+
+from datetime import datetime
+
+from bson import ObjectId
+
+from backend.db import changes
+from backend.db.changes import ChangeHub
+
+def test_poll_walks_past_batch_with_same_updated_at(db, monkeypatch):
+    monkeypatch.setattr(changes, "LIVE_POLL_BATCH", 50)
+    stamp = datetime(2025, 1, 1, 12, 0, 0)
+    ids = [ObjectId() for _ in range(130)]
+    db.payments.insert_many([{"_id": i, "createdAt": stamp, "updatedAt": stamp} for i in ids])
+
+    hub = ChangeHub()
+    hub.watch("payments", lambda d: d)
+    published = []
+    monkeypatch.setattr(hub, "publish", lambda name, op, doc_id, doc: published.append(doc_id))
+
+    mark = (stamp, None)
+    for _ in range(4):
+        mark = hub._poll_collection(db, "payments", *mark)
+    assert published == sorted(ids)
+
+    # Un cambio posterior se entrega una sola vez
+    later = datetime(2025, 1, 1, 12, 0, 1)
+    db.payments.update_one({"_id": ids[0]}, {"$set": {"updatedAt": later}})
+    mark = hub._poll_collection(db, "payments", *mark)
+    mark = hub._poll_collection(db, "payments", *mark)
+    assert published[len(ids):] == [ids[0]]
+    assert mark == (later, ids[0])
+
+def test_every_watched_collection_has_the_poll_index():
+    from backend.db.indexes import INDEXES, LIVE_POLLED, ROUTE_QUERIES
+    from backend.routes.live import hub
+
+    assert set(hub.collections) == set(LIVE_POLLED)
+    for name in LIVE_POLLED:
+        keys = [list(m.document["key"].items()) for m in INDEXES[name]]
+        assert [("updatedAt", 1), ("_id", 1)] in keys
+    assert {q[0] for q in ROUTE_QUERIES} >= {f"live.poll.{name}" for name in LIVE_POLLED}
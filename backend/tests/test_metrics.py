@@ -0,0 +1,38 @@
+# backend/tests/test_metrics.py
+
+import pytest
+
+from backend.utils.metrics import BUCKETS, Histogram
+
+def _histogram(*samples):
+    h = Histogram()
+    for seconds, times in samples:
+        for _ in range(times):
+            h.observe(seconds)
+    return h
+
+def test_empty_histogram_reports_zero():
+    assert Histogram().quantile(0.99) == 0.0
+    assert Histogram().summary() == {"count": 0, "avg_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+
+def test_quantile_interpolates_inside_the_bucket():
+    # 10 muestras en (0.005, 0.01]: se reparten linealmente dentro del bucket
+    h = _histogram((0.007, 10))
+    assert h.quantile(0.5) == pytest.approx(0.0075)
+    assert h.quantile(0.1) == pytest.approx(0.0055)
+    assert h.quantile(1.0) == pytest.approx(0.01)
+
+def test_quantile_against_known_buckets():
+    # 50 en [0, 0.0005] y 50 en (0.25, 0.5]
+    h = _histogram((0.0003, 50), (0.3, 50))
+    assert h.quantile(0.5) == pytest.approx(0.0005)
+    assert h.quantile(0.95) == pytest.approx(0.25 + 0.25 * 45 / 50)
+    assert h.quantile(0.99) == pytest.approx(0.25 + 0.25 * 49 / 50)
+    assert h.summary()["p95_ms"] == 475.0
+
+def test_bucket_edges_and_overflow():
+    h = _histogram((0.01, 1))  # le=0.01 incluye el borde, como en Prometheus
+    assert h.counts[BUCKETS.index(0.01)] == 1
+    # Por encima del último bucket no hay con qué interpolar: se reporta el límite
+    assert _histogram((30.0, 5)).quantile(0.5) == BUCKETS[-1]
+    assert _histogram((0.0003, 99), (30.0, 1)).quantile(0.99) == pytest.approx(0.0005)
@@ -0,0 +1,52 @@
+# backend/tests/test_mine.py
+
+import pytest
+from bson import ObjectId
+
+from backend.db.owners import clear_owner_cache
+from backend.tests.conftest import auth_headers
+
+ANA, LUIS = "0000000000000000000000b1", "0000000000000000000000b2"
+APT_ANA, APT_ANA_2, APT_LUIS = "0000000000000000000000a1", "0000000000000000000000a3", "0000000000000000000000a2"
+
+@pytest.fixture
+def residents(db):
+    clear_owner_cache()
+    db.apartments.insert_many([
+        {"_id": ObjectId(APT_ANA), "number": "101", "userId": ObjectId(ANA)},
+        {"_id": ObjectId(APT_ANA_2), "number": "103", "userId": ANA},  # userId guardado como string
+        {"_id": ObjectId(APT_LUIS), "number": "102", "userId": ObjectId(LUIS)},
+    ])
+    db.payments.insert_many([
+        {"apartmentId": ObjectId(APT_ANA), "amount": 10, "concept": "Cuota", "dueDate": "2026-01-01T00:00:00"},
+        {"apartmentId": APT_ANA_2, "amount": 20, "concept": "Cuota", "dueDate": "2026-01-02T00:00:00"},
+        {"apartmentId": ObjectId(APT_LUIS), "amount": 30, "concept": "Cuota", "dueDate": "2026-01-03T00:00:00"},
+    ])
+    db.incidents.insert_many([
+        {"userId": ObjectId(ANA), "title": "Fuga"},
+        {"userId": ObjectId(LUIS), "title": "Ruido"},
+    ])
+    yield
+    clear_owner_cache()
+
+def test_mine_only_returns_the_callers_documents(client, residents):
+    H = auth_headers(ANA, "resident")
+    assert sorted(p["amount"] for p in client.get("/payments/mine", headers=H).json()) == [10, 20]
+    assert [i["title"] for i in client.get("/incidents/mine", headers=H).json()] == ["Fuga"]
+
+    # Acotar a uno de sus apartamentos sí se permite
+    rows = client.get(f"/payments/mine?apartmentId={APT_ANA_2}", headers=H).json()
+    assert [p["amount"] for p in rows] == [20]
+
+def test_mine_rejects_a_foreign_apartment_or_user(client, residents):
+    H = auth_headers(ANA, "resident")
+    response = client.get(f"/payments/mine?apartmentId={APT_LUIS}", headers=H)
+    assert response.status_code == 403
+    assert response.json()["detail"] == "El apartamento no pertenece al usuario"
+    assert client.get(f"/incidents/mine?userId={LUIS}", headers=H).status_code == 403
+    assert client.get(f"/incidents/mine?userId={ANA}", headers=H).status_code == 200
+
+def test_mine_needs_a_user_in_the_token(client, residents):
+    from backend.utils.jwt_handler import create_access_token
+    H = {"Authorization": f"Bearer {create_access_token({'role': 'resident'})}"}
+    assert client.get("/payments/mine", headers=H).status_code == 401
@@ -0,0 +1,34 @@
+# backend/tests/test_pagination.py
+
+import json
+
+from bson import ObjectId
+
+from backend.routes.users import UserOut
+from backend.tests.conftest import auth_headers
+from backend.utils import responses
+from backend.utils.pagination import PageParams, _page_response
+
+def _leaky(doc):
+    # Serializador que deja pasar de más: response_model debe seguir filtrando
+    return {**doc, "_id": str(doc["_id"])}
+
+def _user(**extra):
+    return {"_id": ObjectId(), "firstName": "Ana", "lastName": "Ruiz", "email": "ana@example.com",
+            "role": "resident", "phone": "", "createdAt": "2026-01-01T00:00:00", "updatedAt": "2026-01-01T00:00:00",
+            "password": "hash", **extra}
+
+def test_page_keeps_only_model_fields_when_fast_json_is_off(monkeypatch):
+    monkeypatch.setattr(responses, "FAST_JSON", False)
+    doc = _user(internalNote="x")
+    rows = json.loads(_page_response([doc], PageParams(limit=10), _leaky, "_id", UserOut).body)
+    assert rows[0]["_id"] == str(doc["_id"])
+    assert "password" not in rows[0] and "internalNote" not in rows[0]
+
+    rows = json.loads(_page_response([doc], PageParams(limit=10, fields="email,password"), _leaky, "_id", UserOut).body)
+    assert rows == [{"_id": str(doc["_id"]), "email": "ana@example.com"}]
+
+def test_users_list_never_returns_passwords(client, db):
+    db.users.insert_one(_user(internalNote="x"))
+    rows = client.get("/users/", headers=auth_headers()).json()
+    assert rows and all("password" not in r and "internalNote" not in r for r in rows)
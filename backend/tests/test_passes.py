@@ -0,0 +1,52 @@
+# backend/tests/test_passes.py
+
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from backend.db.gate import Gate
+from backend.utils import passes
+from backend.utils.passes import read_pass, sign_pass
+
+VISIT = ObjectId()
+EXPIRES = datetime(2030, 1, 1, 12, 0)
+
+def _swap(text: str, i: int) -> str:
+    return text[:i] + ("A" if text[i] != "A" else "B") + text[i + 1:]
+
+def test_signed_pass_round_trips():
+    token = sign_pass(VISIT, EXPIRES)
+    assert token == token.upper() and len(token) < 60
+    assert read_pass(token) == (str(VISIT), EXPIRES)
+    assert read_pass(f"  {token.lower()} ") == (str(VISIT), EXPIRES)  # el lector puede devolver minúsculas
+
+def test_tampered_pass_is_rejected():
+    token = sign_pass(VISIT, EXPIRES)
+    visit_id, expires, signature = token.split(".")
+    later = sign_pass(VISIT, EXPIRES + timedelta(days=365)).split(".")[1]
+    other = str(ObjectId()).upper()
+
+    assert read_pass(f"{other}.{expires}.{signature}") is None        # otra visita
+    assert read_pass(f"{visit_id}.{later}.{signature}") is None       # vencimiento extendido
+    assert read_pass(f"{visit_id}.{expires}.{_swap(signature, 0)}") is None
+    assert read_pass(f"{visit_id}.{expires}.{signature[:-1]}") is None
+    for bad in ("", "x", token + ".X", f"{visit_id[:-1]}.{expires}.{signature}"):
+        assert read_pass(bad) is None
+
+def test_pass_signed_with_another_secret_is_rejected(monkeypatch):
+    token = sign_pass(VISIT, EXPIRES)
+    monkeypatch.setattr(passes, "QR_SECRET", b"otro-secreto")
+    assert read_pass(token) is None
+    assert read_pass(sign_pass(VISIT, EXPIRES)) is not None
+
+@pytest.mark.parametrize("token, message", [
+    (lambda: _swap(sign_pass(VISIT, EXPIRES), -1), "Pase inválido"),
+    (lambda: sign_pass(VISIT, datetime(2020, 1, 1)), "Pase vencido"),
+])
+def test_gate_lookup_rejects_without_reading_mongo(monkeypatch, token, message):
+    monkeypatch.setattr(Gate, "start", lambda self: None)
+    gate = Gate()
+    result, visit_id, doc = gate.lookup(token())
+    assert (result["valid"], result["message"], visit_id) == (False, message, None)
+    assert gate.stats["invalid"] == 1
@@ -0,0 +1,57 @@
+# backend/tests/test_profiler.py
+
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+from backend.db.profiler import SlowQueryProfiler, query_shape, shape
+
+SECRET = "ana@example.com"
+
+def test_shape_replaces_every_value():
+    query = {
+        "email": SECRET,
+        "_id": ObjectId(),
+        "dueDate": {"$gte": datetime(2026, 1, 1), "$lt": datetime(2026, 2, 1)},
+        "$or": [{"status": "paid"}, {"amount": {"$gt": 100}}],
+        "apartmentId": {"$in": [ObjectId(), "a1", 3]},
+        "tags": [],
+        "deleted": None,
+    }
+    assert shape(query) == {
+        "email": "?",
+        "_id": "?",
+        "dueDate": {"$gte": "?", "$lt": "?"},
+        "$or": [{"status": "?"}, {"amount": {"$gt": "?"}}],
+        "apartmentId": {"$in": "?"},
+        "tags": "?",
+        "deleted": "?",
+    }
+
+def test_pipeline_keeps_its_stages_but_not_its_values():
+    pipeline = [{"$match": {"userId": SECRET}}, {"$group": {"_id": "$status", "n": {"$sum": 1}}}, {"$limit": 5}]
+    assert shape(pipeline) == [{"$match": {"userId": "?"}}, {"$group": {"_id": "?", "n": {"$sum": "?"}}}, {"$limit": "?"}]
+
+def test_same_query_with_other_values_is_one_shape():
+    a = query_shape("find", "users", {"filter": {"email": SECRET}, "sort": {"_id": -1}, "projection": {"password": 0}})
+    b = query_shape("find", "users", {"filter": {"email": "luis@example.com"}, "sort": {"_id": -1}, "projection": {"password": 0}})
+    assert a == b == {"collection": "users", "command": "find", "filter": {"email": "?"}, "sort": {"_id": -1}, "projection": ["password"]}
+
+def _run(profiler, command, ms, request_id):
+    common = dict(command_name="find", connection_id=("db", 27017), request_id=request_id)
+    profiler.started(SimpleNamespace(command=command, **common))
+    profiler.succeeded(SimpleNamespace(duration_micros=int(ms * 1000), reply={"cursor": {"firstBatch": [{}]}}, **common))
+
+def test_report_never_contains_values():
+    profiler = SlowQueryProfiler(threshold_ms=10)
+    _run(profiler, {"find": "users", "filter": {"email": SECRET}}, 50, 1)
+    _run(profiler, {"find": "users", "filter": {"email": "luis@example.com"}}, 80, 2)
+    _run(profiler, {"find": "users", "filter": {"phone": "5550000"}}, 5, 3)  # bajo el umbral
+
+    report = profiler.report()
+    assert len(report) == 1
+    assert (report[0]["count"], report[0]["maxMs"], report[0]["filter"]) == (2, 80, {"email": "?"})
+    dumped = json.dumps(report, default=str)
+    assert SECRET not in dumped and "luis@example.com" not in dumped and "_sample" not in dumped
@@ -0,0 +1,50 @@
+# backend/tests/test_rollups.py
+
+from bson import ObjectId
+
+from backend.db.rollups import ROLLUPS_COLLECTION, check_rollups, rebuild_rollups
+from backend.tests.conftest import auth_headers
+
+A1, A2 = "0000000000000000000000a1", "0000000000000000000000a2"
+
+def _rollups(db):
+    return {d["_id"]: {k: v for k, v in d.items() if k not in ("_id", "updatedAt") and v} for d in db[ROLLUPS_COLLECTION].find()}
+
+def test_incremental_rollups_match_a_full_rebuild(client, db):
+    H = auth_headers()
+    db.apartments.insert_one({"_id": ObjectId(A1), "number": "101"})
+
+    # Altas sueltas y en lote, un cambio de estatus y de mes, y un borrado
+    first = client.post("/payments/", json={"apartmentId": A1, "amount": 100, "concept": "Cuota", "dueDate": "2026-01-10T00:00:00"}, headers=H)
+    assert first.status_code == 200, first.text
+    bulk = client.post("/payments/bulk", json=[
+        {"apartmentId": A1, "amount": 80, "concept": "Cuota", "dueDate": "2026-02-10T00:00:00"},
+        {"apartmentId": A2, "amount": 50, "concept": "Agua", "dueDate": "2026-01-15T00:00:00", "status": "overdue"},
+        {"apartmentId": A2, "amount": 30, "concept": "Gas", "dueDate": "2026-01-20T00:00:00"},
+    ], headers=H)
+    assert bulk.json()["ok"] == 3, bulk.text
+    payments = {p["concept"] + str(p["amount"]): p["_id"] for p in db.payments.find()}
+    # PATCH /payments/{id} recibe el PaymentIn completo
+    paid = {"apartmentId": A1, "amount": 100, "concept": "Cuota", "dueDate": "2026-01-10T00:00:00", "status": "paid"}
+    moved = {"apartmentId": A2, "amount": 30, "concept": "Gas", "dueDate": "2026-03-01T00:00:00"}
+    assert client.patch(f"/payments/{payments['Cuota100.0']}", json=paid, headers=H).status_code == 200
+    assert client.patch(f"/payments/{payments['Gas30.0']}", json=moved, headers=H).status_code == 200
+    assert client.delete(f"/payments/{payments['Cuota80.0']}", headers=H).status_code == 200
+
+    fine = {"departamento": "101", "propietario": "Ana", "monto": 25, "descripcion": "Ruido", "fecha": "2026-01-05T00:00:00"}
+    assert client.post("/fines/", json=fine, headers=H).status_code == 200
+    assert client.post("/fines/", json={**fine, "departamento": "999", "estatus": "Completo"}, headers=H).status_code == 200
+
+    incremental = _rollups(db)
+    assert check_rollups(db) == []
+    assert f"{A1}|2026-02" not in incremental  # el mes que quedó vacío se borra
+    assert incremental[f"{A1}|2026-01"] == {"apartment": A1, "month": "2026-01", "billed": 100, "paid": 100, "payments": 1, "fines": 25, "finesCount": 1}
+
+    rebuild_rollups(db)
+    assert _rollups(db) == incremental
+
+def test_check_reports_drift_and_rebuild_fixes_it(db):
+    db.payments.insert_one({"apartmentId": A1, "amount": 40, "status": "pending", "dueDate": "2026-04-01"})
+    assert check_rollups(db) == [(f"{A1}|2026-04", "billed", 40, 0), (f"{A1}|2026-04", "pending", 40, 0), (f"{A1}|2026-04", "payments", 1, 0)]
+    assert rebuild_rollups(db) == 1
+    assert check_rollups(db) == []
@@ -0,0 +1,17 @@
+# backend/tests/test_seed.py
+
+import pytest
+
+from backend.db import init_db, mongo, seed
+
+def test_demo_seed_refuses_remote_uri(db, monkeypatch):
+    monkeypatch.setattr(mongo, "MONGO_URI", "mongodb://db.example.com:27017")
+    with pytest.raises(SystemExit):
+        init_db.main([])
+    assert db.users.count_documents({}) == 0
+
+def test_staff_never_gets_the_resident_password(db):
+    seed.seed_complex(db, towers=1, levels=1, units=2, years=0.1, workers=0, indexes=False, rollups=False)
+    staff = list(db.users.find({"role": {"$in": ["admin", "guard"]}}))
+    assert staff and all(u["password"] != "residente" for u in staff)
+    assert len({u["password"] for u in staff}) == 1
@@ -0,0 +1,32 @@
+# backend/tests/test_serializers.py
+
+from datetime import datetime
+
+from bson import ObjectId
+
+from backend.utils.serializers import DATE, FLOAT, ID, NOW, Field, compile_serializer
+
+serialize = compile_serializer([
+    Field("_id", ID),
+    Field("userId", ID),
+    Field("monto", FLOAT, 0.0, source="amount"),
+    Field("fecha", DATE),
+    Field("createdAt", default=NOW),
+    Field("updatedAt", default=NOW),
+    Field("notas", default=""),
+], "serialize_test")
+
+def test_converts_ids_defaults_and_source_keys():
+    oid = ObjectId()
+    row = serialize({"_id": oid, "userId": oid, "amount": "12.5", "fecha": "2025-01-02T03:04:05"})
+    assert row["_id"] == row["userId"] == str(oid)
+    assert row["monto"] == 12.5
+    assert row["fecha"] == datetime(2025, 1, 2, 3, 4, 5)
+    assert row["notas"] == ""
+    assert row["createdAt"] is row["updatedAt"]  # utcnow() una sola vez por documento
+    assert serialize.__name__ == "serialize_test"
+
+def test_malformed_stored_date_passes_through():
+    row = serialize({"_id": 1, "fecha": "2025-13-45"})
+    assert row["fecha"] == "2025-13-45"
+    assert serialize({"_id": 1, "fecha": None})["fecha"].__class__ is datetime
@@ -0,0 +1,42 @@
+# backend/tests/test_summaries.py
+#
+# mongomock no implementa $convert: el $facet se alimenta con documentos ya
+# proyectados (_amount, _status, ...), que es lo que entrega el $project real.
+
+from backend.db.summaries import Summary, shape_summary, summary_pipeline
+from backend.routes.payments import PAYMENT_SUMMARY
+
+ROWS = [
+    {"_amount": 100.0, "_status": "pending", "_concept": "Cuota", "_apartment": "a1", "_month": "2026-01"},
+    {"_amount": 50.5, "_status": "paid", "_concept": "Cuota", "_apartment": "a2", "_month": "2026-02"},
+    {"_amount": 20.0, "_status": "paid", "_concept": "Multa", "_apartment": "a1", "_month": "2026-02"},
+    {"_amount": 0.0, "_status": "paid", "_concept": "Multa", "_apartment": "a3", "_month": None},  # fecha inválida
+]
+
+def _summary(db, rows, top=50):
+    db.projected.insert_many(rows)
+    facet = summary_pipeline({}, top=top, **PAYMENT_SUMMARY)[2:]
+    return shape_summary(next(db.projected.aggregate(facet)))
+
+def test_facet_totals_agree_across_groups(db):
+    result = _summary(db, ROWS)
+    Summary.model_validate(result)
+    assert (result["count"], result["amount"]) == (4, 170.5)
+    for groups in ("byStatus", "byConcept", "byApartment", "byMonth"):
+        assert sum(g["count"] for g in result[groups]) == result["count"]
+        assert sum(g["amount"] for g in result[groups]) == result["amount"]
+    assert result["byStatus"] == [
+        {"key": "paid", "count": 3, "amount": 70.5},
+        {"key": "pending", "count": 1, "amount": 100.0},
+    ]
+    assert [g["key"] for g in result["byMonth"]] == [None, "2026-01", "2026-02"]
+
+def test_top_keeps_the_largest_groups(db):
+    result = _summary(db, ROWS, top=1)
+    assert result["byConcept"] == [{"key": "Cuota", "count": 2, "amount": 150.5}]
+    assert result["byApartment"] == [{"key": "a1", "count": 2, "amount": 120.0}]
+    assert result["count"] == 4  # el total no depende del top
+
+def test_empty_match_gives_zero_totals(db):
+    result = shape_summary(next(db.projected.aggregate(summary_pipeline({}, **PAYMENT_SUMMARY)[2:])))
+    assert result == {"count": 0, "amount": 0.0, "byStatus": [], "byConcept": [], "byApartment": [], "byMonth": []}
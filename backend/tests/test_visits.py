@@ -0,0 +1,12 @@
+# backend/tests/test_visits.py
+
+from backend.tests.conftest import auth_headers
+
+H = auth_headers()
+
+def test_malformed_ids_are_rejected_with_400(client):
+    assert client.get("/visits/no-es-un-id/qr", headers=H).status_code == 400
+    r = client.post("/visits/", json={"apartmentId": "123", "visitorName": "Ana"}, headers=H)
+    assert (r.status_code, r.json()["detail"]) == (400, "ID inválido")
+    r = client.post("/visits/passes", json={"apartmentId": "123", "guests": ["Ana"]}, headers=H)
+    assert r.status_code == 400
@@ -0,0 +1,197 @@
+# backend/utils/cache.py
+#
+# Caché read-through para colecciones casi estáticas (apartments, providers,
+# announcements). Se guardan las respuestas ya codificadas (bytes) por
+# consulta: filtros + página para los listados, _id para los detalles.
+#
+# Backends (CACHE_BACKEND):
+#   - local (por defecto): LRU en memoria con TTL, por proceso
+#   - redis: cualquier servidor compatible con GET/SET EX/INCR (CACHE_URL);
+#     requiere el paquete `redis`. Si no está instalado se usa el local.
+#   - off: sin caché
+#
+# Invalidación: cada colección tiene un número de generación que forma parte
+# de la clave; las escrituras lo incrementan (una sola operación) y las
+# entradas viejas dejan de leerse y expiran solas. Con varios workers y el
+# backend local, otro proceso puede servir datos viejos hasta CACHE_TTL.
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from bson import json_util
+from fastapi.responses import Response
+
+from backend.utils.logs import get_logger
+from backend.utils.pagination import NEXT_CURSOR_HEADER
+from backend.utils.responses import EncodedJSONResponse
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local").lower()
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+CACHE_TTL = int(os.getenv("CACHE_TTL", 300))  # entero: redis-py rechaza ex flotante
+CACHE_SIZE = int(os.getenv("CACHE_SIZE", 1024))
+
+logger = get_logger("cache")
+
+class LocalCache:
+    """LRU + TTL en memoria con la misma interfaz mínima que Redis (get/set/incr)."""
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()  # clave -> (valor, expira_en)
+        self._counters = {}            # generaciones: fuera del LRU para que nunca se pierdan
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._counters:
+                return str(self._counters[key]).encode()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ex: int = CACHE_TTL):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ex)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def flushdb(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+def _redis_backend():
+    """(cliente, errores que cuentan como caída del caché)."""
+    try:
+        import redis
+    except ImportError:
+        logger.warning("event=cache_backend_fallback reason=redis_not_installed backend=local")
+        return LocalCache(), (OSError,)
+    # Timeouts cortos: si Redis no responde se trata como miss y se lee de Mongo
+    client = redis.Redis.from_url(CACHE_URL, socket_timeout=0.2, socket_connect_timeout=0.2)
+    return client, (OSError, redis.ConnectionError, redis.TimeoutError)
+
+def _make_backend():
+    if CACHE_BACKEND == "off":
+        return None, (OSError,)
+    if CACHE_BACKEND == "redis":
+        return _redis_backend()
+    return LocalCache(), (OSError,)
+
+# Solo las caídas (red, timeout) se tratan como miss; un error de uso (tipo de
+# un argumento, DataError) sube y se ve en vez de vaciar el caché en silencio
+backend, OUTAGE_ERRORS = _make_backend()
+
+# --- Métricas -------------------------------------------------------------------
+
+_stats = defaultdict(lambda: {"hits": 0, "misses": 0, "invalidations": 0, "errors": 0})
+_stats_lock = threading.Lock()
+
+def _count(namespace: str, metric: str):
+    with _stats_lock:
+        _stats[namespace][metric] += 1
+
+def cache_stats() -> dict:
+    """{colección: {hits, misses, invalidations, errors, hit_ratio}} desde que arrancó el proceso."""
+    with _stats_lock:
+        stats = {ns: dict(values) for ns, values in _stats.items()}
+    for values in stats.values():
+        lookups = values["hits"] + values["misses"]
+        values["hit_ratio"] = round(values["hits"] / lookups, 3) if lookups else 0.0
+    return {"backend": CACHE_BACKEND if backend is not None else "off", "ttl": CACHE_TTL, "collections": stats}
+
+def reset_cache():
+    """Vacía el backend local y las métricas (benchmarks/pruebas)."""
+    if isinstance(backend, LocalCache):
+        backend.flushdb()
+    with _stats_lock:
+        _stats.clear()
+
+# --- Lectura / invalidación -------------------------------------------------
+
+def _generation(namespace: str) -> bytes:
+    return backend.get(f"{namespace}:gen") or b"0"
+
+def query_key(*parts) -> str:
+    """Huella estable de una consulta (filtros con datetime/ObjectId incluidos)."""
+    return hashlib.sha1(json_util.dumps(parts).encode()).hexdigest()
+
+def _read(namespace: str, key: str):
+    try:
+        full_key = f"{namespace}:{_generation(namespace).decode()}:{key}"
+        return full_key, backend.get(full_key)
+    except OUTAGE_ERRORS as e:
+        _count(namespace, "errors")
+        logger.warning("event=cache_error op=get namespace=%s error=%s", namespace, e)
+        return None, None
+
+def _write(namespace: str, full_key: str, value: bytes):
+    try:
+        backend.set(full_key, value, ex=CACHE_TTL)
+    except OUTAGE_ERRORS as e:
+        _count(namespace, "errors")
+        logger.warning("event=cache_error op=set namespace=%s error=%s", namespace, e)
+
+def _pack(response: Response) -> bytes:
+    # "<cursor>\n<body>": el cursor es base64 url-safe, nunca trae saltos de línea
+    return response.headers.get(NEXT_CURSOR_HEADER, "").encode() + b"\n" + bytes(response.body)
+
+def _unpack(value: bytes) -> Response:
+    cursor, _, body = value.partition(b"\n")
+    headers = {NEXT_CURSOR_HEADER: cursor.decode()} if cursor else None
+    # Los bytes salieron de json_response(): mismo cuerpo y headers que el fallo
+    return EncodedJSONResponse(body, headers=headers)
+
+def _hit(namespace: str, key: str):
+    if backend is None:
+        return None, None
+    full_key, value = _read(namespace, key)
+    if value is not None:
+        _count(namespace, "hits")
+        return full_key, _unpack(value)
+    _count(namespace, "misses")
+    return full_key, None
+
+def cached_response(namespace: str, key: str, load):
+    """Devuelve la respuesta cacheada para `key` o la genera con `load()` (una Response) y la guarda."""
+    full_key, cached = _hit(namespace, key)
+    if cached is not None:
+        return cached
+    response = load()
+    if full_key is not None and response.status_code == 200:
+        _write(namespace, full_key, _pack(response))
+    return response
+
+async def acached_response(namespace: str, key: str, load):
+    full_key, cached = _hit(namespace, key)
+    if cached is not None:
+        return cached
+    response = await load()
+    if full_key is not None and response.status_code == 200:
+        _write(namespace, full_key, _pack(response))
+    return response
+
+def invalidate(namespace: str):
+    """Descarta todas las entradas de la colección (nueva generación)."""
+    if backend is None:
+        return
+    try:
+        backend.incr(f"{namespace}:gen")
+        _count(namespace, "invalidations")
+    except OUTAGE_ERRORS as e:
+        _count(namespace, "errors")
+        logger.warning("event=cache_error op=invalidate namespace=%s error=%s", namespace, e)
@@ -0,0 +1,57 @@
+# backend/utils/etag.py
+#
+# Peticiones condicionales: ETag débil = versión de la colección + huella de
+# la consulta (filtros/página o _id). Si el cliente manda un If-None-Match que
+# coincide se responde 304 sin leer ni serializar los documentos.
+#
+# Cache-Control es "private" (respuestas autenticadas). Con ETAG_MAX_AGE=0
+# (por defecto) va "no-cache": el navegador revalida siempre, pero una
+# respuesta sin cambios es solo un round trip de headers.
+
+import os
+
+from fastapi import Request, Response
+
+from backend.utils.cache import query_key
+
+ETAG_MAX_AGE = int(os.getenv("ETAG_MAX_AGE", 0))
+
+CACHE_CONTROL = f"private, max-age={ETAG_MAX_AGE}" if ETAG_MAX_AGE > 0 else "private, no-cache"
+
+def make_etag(version: int, *parts) -> str:
+    return f'W/"{version}-{query_key(*parts)[:16]}"'
+
+def _matches(header, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Comparación débil: se ignora el prefijo W/
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+def _tag(result, response: Response, etag: str):
+    # Los handlers devuelven una Response (paginación, FAST_JSON) o un dict;
+    # en el segundo caso FastAPI copia los headers de `response`
+    target = result if isinstance(result, Response) else response
+    target.headers["ETag"] = etag
+    target.headers["Cache-Control"] = CACHE_CONTROL
+    return result
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+def conditional(request: Request, response: Response, etag, load):
+    """Responde 304 si If-None-Match coincide con `etag`; si no, `load()` con ETag y Cache-Control."""
+    if etag is None:
+        return load()
+    if _matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    return _tag(load(), response, etag)
+
+async def aconditional(request: Request, response: Response, etag, load):
+    if etag is None:
+        return await load()
+    if _matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    return _tag(await load(), response, etag)
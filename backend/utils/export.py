@@ -0,0 +1,79 @@
+# backend/utils/export.py
+
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+from bson import ObjectId
+from fastapi.responses import StreamingResponse
+
+from backend.utils.responses import json_default
+
+# Documentos por lote leídos del cursor y escritos por chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date, ObjectId, Decimal)):
+        return json_default(value)
+    return value
+
+def _ndjson_chunks(cursor, serializer, batch_size):
+    lines = []
+    for doc in cursor:
+        lines.append(json.dumps(serializer(doc), default=json_default, ensure_ascii=False))
+        if len(lines) >= batch_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+def _csv_chunks(cursor, serializer, batch_size):
+    buffer = io.StringIO()
+    writer = None
+    pending = 0
+    for doc in cursor:
+        row = serializer(doc)
+        if writer is None:
+            # Las columnas salen del primer documento serializado
+            writer = csv.DictWriter(buffer, fieldnames=list(row), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow({k: _csv_value(v) for k, v in row.items()})
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def stream_export(collection, query: dict, serializer, fmt: str, name: str, sort_field: str = "_id"):
+    """
+    Exporta la colección completa como NDJSON o CSV sin materializarla:
+    el cursor se recorre en lotes de EXPORT_BATCH_SIZE y cada lote se envía
+    como un chunk del StreamingResponse.
+    """
+    cursor = collection.find(query).sort(sort_field, 1).batch_size(EXPORT_BATCH_SIZE)
+    chunks = _csv_chunks if fmt == "csv" else _ndjson_chunks
+
+    def body():
+        try:
+            yield from chunks(cursor, serializer, EXPORT_BATCH_SIZE)
+        finally:
+            cursor.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
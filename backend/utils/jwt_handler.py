@@ -1,16 +1,28 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
+import hashlib
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
+from backend.utils.logs import get_logger
+
 load_dotenv()  # Asegura que .env esté cargado
 
+logger = get_logger("auth")
+
 # Configuración desde variables de entorno
 JWT_SECRET = os.getenv("JWT_SECRET")
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRES_MINUTES = int(os.getenv("JWT_EXPIRES", 30))
 
-print(f"TOKEN_SECRET_ACTUAL: {JWT_SECRET}")
+# Caché de tokens ya verificados (0 = desactivada)
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", 10000))
+
+if not JWT_SECRET:
+    logger.warning("event=jwt_secret_missing msg=\"JWT_SECRET no está definido\"")
 
 # Genera un JWT con expiración
 def create_access_token(data: dict):
@@ -20,11 +32,52 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
-# Decodifica y valida el JWT
+# sha256(token) -> (payload, expira_en). LRU acotado; cada entrada vence en su `exp`.
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _cache_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+def _cache_get(key: bytes):
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        payload, expires_at = entry
+        if expires_at <= time.time():
+            del _cache[key]
+            return None
+        _cache.move_to_end(key)
+        return payload
+
+def _cache_put(key: bytes, payload: dict):
+    expires_at = payload.get("exp")
+    if not isinstance(expires_at, (int, float)):
+        expires_at = time.time() + JWT_EXPIRES_MINUTES * 60
+    with _cache_lock:
+        _cache[key] = (payload, expires_at)
+        _cache.move_to_end(key)
+        while len(_cache) > JWT_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+def clear_token_cache():
+    with _cache_lock:
+        _cache.clear()
+
+# Decodifica y valida el JWT (solo la primera vez por token; luego sale de la caché)
 def decode_access_token(token: str):
+    if JWT_CACHE_SIZE > 0:
+        key = _cache_key(token)
+        payload = _cache_get(key)
+        if payload is not None:
+            return dict(payload)
     try:
         decoded = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return decoded
-    except JWTError:
+    except JWTError as e:
+        logger.info("event=jwt_invalid error=%s", type(e).__name__)
         return None
-    
\ No newline at end of file
+    if JWT_CACHE_SIZE > 0:
+        _cache_put(key, decoded)
+        decoded = dict(decoded)
+    return decoded
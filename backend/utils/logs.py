@@ -0,0 +1,21 @@
+# backend/utils/logs.py
+#
+# Logging con niveles (LOG_LEVEL=DEBUG|INFO|WARNING|ERROR) en formato
+# clave=valor, en lugar de print() por request.
+
+import logging
+import os
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = "ts=%(asctime)s level=%(levelname)s logger=%(name)s %(message)s"
+
+def configure_logging():
+    root = logging.getLogger("milovat")
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"milovat.{name}")
@@ -0,0 +1,232 @@
+# backend/utils/metrics.py
+#
+# Métricas del proceso en memoria, expuestas en GET /metrics (texto de
+# Prometheus) y GET /metrics/summary (JSON con p50/p95/p99):
+#   - por ruta: histograma de latencia, requests por status y en curso
+#     (MetricsMiddleware, ASGI puro: no bufferiza respuestas ni SSE)
+#   - por colección y comando de Mongo: histograma de duración, documentos
+#     devueltos y fallas (CommandMetrics, un CommandListener de pymongo)
+#
+# Los histogramas tienen buckets fijos: registrar una observación es un bisect
+# y un par de sumas, sin guardar las muestras. Los percentiles del resumen se
+# interpolan dentro del bucket (la misma estimación que histogram_quantile).
+# Las rutas se etiquetan con su plantilla (/visits/{id}), nunca con el path
+# real, para que la cardinalidad no crezca con los ids.
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from pymongo import monitoring
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Segundos; cubren desde un find_one por _id hasta un export grande
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+UNMATCHED = "<unmatched>"  # 404 de rutas que no existen: una sola serie
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # el último es +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                if i == len(BUCKETS):
+                    return BUCKETS[-1]
+                lower = BUCKETS[i - 1] if i else 0.0
+                return lower + (BUCKETS[i] - lower) * (rank - seen) / n
+            seen += n
+        return BUCKETS[-1]
+
+    def summary(self) -> dict:
+        out = {"count": self.count, "avg_ms": round(self.sum / self.count * 1000, 3) if self.count else 0.0}
+        for q in QUANTILES:
+            out[f"p{int(q * 100)}_ms"] = round(self.quantile(q) * 1000, 3)
+        return out
+
+# --- HTTP -----------------------------------------------------------------------
+
+# Solo se actualizan desde el event loop (el middleware): sin locks
+_routes = defaultdict(Histogram)      # (method, route) -> latencia
+_statuses = defaultdict(int)          # (method, route, status) -> requests
+_in_flight = defaultdict(int)         # method -> requests en curso
+
+def _route(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED
+
+class MetricsMiddleware:
+    """Latencia por plantilla de ruta, hasta el último byte de la respuesta."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        method = scope["method"]
+        status = 500
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        _in_flight[method] += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _in_flight[method] -= 1
+            # El router de Starlette deja la ruta encontrada en el mismo scope
+            route = _route(scope)
+            _routes[(method, route)].observe(elapsed)
+            _statuses[(method, route, status)] += 1
+
+# --- MongoDB --------------------------------------------------------------------
+
+_commands = defaultdict(Histogram)    # (collection, command) -> duración
+_documents = defaultdict(int)         # (collection, command) -> documentos devueltos
+_failures = defaultdict(int)          # (collection, command) -> fallas
+_commands_lock = threading.Lock()     # los eventos llegan desde los hilos del threadpool
+
+def _returned(reply) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or ())
+    return 0
+
+class CommandMetrics(monitoring.CommandListener):
+    """Duración y documentos devueltos por (colección, comando)."""
+
+    def __init__(self):
+        self._started = {}  # (connection, request_id) -> (colección, comando)
+
+    def started(self, event):
+        name = event.command_name
+        if name == "getMore":
+            collection = event.command.get("collection")
+        else:
+            collection = event.command.get(name)
+        self._started[(event.connection_id, event.request_id)] = (collection if isinstance(collection, str) else "-", name)
+
+    def succeeded(self, event):
+        key = self._started.pop((event.connection_id, event.request_id), None) or ("-", event.command_name)
+        with _commands_lock:
+            _commands[key].observe(event.duration_micros / 1e6)
+            _documents[key] += _returned(event.reply)
+
+    def failed(self, event):
+        key = self._started.pop((event.connection_id, event.request_id), None) or ("-", event.command_name)
+        with _commands_lock:
+            _commands[key].observe(event.duration_micros / 1e6)
+            _failures[key] += 1
+
+command_metrics = CommandMetrics()
+
+def event_listeners() -> list:
+    """Listeners para MongoClient/AsyncMongoClient (vacío con METRICS_ENABLED=false)."""
+    return [command_metrics] if METRICS_ENABLED else []
+
+# --- Exposición -----------------------------------------------------------------
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**labels) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+
+def _histogram_lines(name: str, histograms: dict, label_names) -> list:
+    lines = [f"# TYPE {name} histogram"]
+    for key, h in sorted(histograms.items()):
+        labels = _labels(**dict(zip(label_names, key)))
+        cumulative = 0
+        for bound, n in zip(BUCKETS, h.counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {h.count}')
+        lines.append(f"{name}_sum{{{labels}}} {h.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {h.count}")
+    return lines
+
+def _counter_lines(name: str, kind: str, values: dict, label_names) -> list:
+    lines = [f"# TYPE {name} {kind}"]
+    for key, value in sorted(values.items(), key=lambda item: tuple(map(str, item[0]))):
+        labels = _labels(**dict(zip(label_names, key)))
+        lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+    return lines
+
+def _snapshot():
+    # Copias: el listener puede seguir escribiendo mientras se arma la respuesta
+    with _commands_lock:
+        commands = {key: _copy(h) for key, h in _commands.items()}
+        documents, failures = dict(_documents), dict(_failures)
+    routes = {key: _copy(h) for key, h in _routes.items()}
+    return routes, dict(_statuses), dict(_in_flight), commands, documents, failures
+
+def _copy(h: Histogram) -> Histogram:
+    copy = Histogram()
+    copy.counts, copy.sum, copy.count = list(h.counts), h.sum, h.count
+    return copy
+
+def render_prometheus(extra=()) -> str:
+    """Texto de Prometheus (0.0.4). `extra`: (nombre, tipo, {labels tuple: valor}, nombres de labels)."""
+    routes, statuses, in_flight, commands, documents, failures = _snapshot()
+    lines = []
+    lines += _histogram_lines("milovat_http_request_duration_seconds", routes, ("method", "route"))
+    lines += _counter_lines("milovat_http_requests_total", "counter", statuses, ("method", "route", "status"))
+    lines += _counter_lines("milovat_http_requests_in_flight", "gauge", {(m,): n for m, n in in_flight.items()}, ("method",))
+    lines += _histogram_lines("milovat_mongo_command_duration_seconds", commands, ("collection", "command"))
+    lines += _counter_lines("milovat_mongo_documents_returned_total", "counter", documents, ("collection", "command"))
+    lines += _counter_lines("milovat_mongo_command_failures_total", "counter", failures, ("collection", "command"))
+    for name, kind, values, label_names in extra:
+        lines += _counter_lines(name, kind, values, label_names)
+    return "\n".join(lines) + "\n"
+
+def metrics_summary() -> dict:
+    """p50/p95/p99 por ruta y por comando (estimados con los buckets)."""
+    routes, statuses, in_flight, commands, documents, failures = _snapshot()
+    errors = defaultdict(int)
+    for (method, route, status), n in statuses.items():
+        if status >= 500:
+            errors[(method, route)] += n
+    return {
+        "in_flight": sum(in_flight.values()),
+        "routes": {
+            f"{method} {route}": {**h.summary(), "errors": errors[(method, route)]}
+            for (method, route), h in sorted(routes.items(), key=lambda item: -item[1].sum)
+        },
+        "mongo": {
+            f"{collection}.{command}": {**h.summary(), "documents": documents.get((collection, command), 0), "failures": failures.get((collection, command), 0)}
+            for (collection, command), h in sorted(commands.items(), key=lambda item: -item[1].sum)
+        },
+    }
+
+def reset_metrics():
+    """Vacía todo (benchmarks/pruebas)."""
+    _routes.clear()
+    _statuses.clear()
+    with _commands_lock:
+        _commands.clear()
+        _documents.clear()
+        _failures.clear()
@@ -0,0 +1,134 @@
+# backend/utils/pagination.py
+
+import base64
+import os
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId, json_util
+from fastapi import HTTPException, Query
+
+from backend.utils import responses
+from backend.utils.responses import json_response
+
+# Límites de página (configurables por entorno)
+DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", 100))
+MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", 500))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Parámetros comunes de paginación: ?limit=&cursor=&fields=
+class PageParams:
+    def __init__(self, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None, fields: Optional[str] = None):
+        self.limit = limit
+        self.cursor = cursor
+        self.fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+# Dependencia async para que no ocupe un hilo del threadpool en cada request
+async def page_params(
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="Token devuelto en X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por coma"),
+) -> PageParams:
+    return PageParams(limit, cursor, fields)
+
+# El cursor guarda el último (valor de orden, _id) visto; json_util conserva datetime/ObjectId
+def encode_cursor(value, _id) -> str:
+    raw = json_util.dumps([value, _id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        value, _id = json_util.loads(base64.urlsafe_b64decode(padded))
+        return value, _id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+# Filtro por id que acepta documentos guardados con ObjectId o con string
+def id_filter(value: str):
+    if ObjectId.is_valid(value):
+        return {"$in": [ObjectId(value), value]}
+    return value
+
+# Filtro de rango de fechas sobre un campo (?desde=&hasta=)
+def date_range(field: str, desde: Optional[datetime], hasta: Optional[datetime]) -> dict:
+    rango = {}
+    if desde:
+        rango["$gte"] = desde
+    if hasta:
+        rango["$lte"] = hasta
+    return {field: rango} if rango else {}
+
+def _keyset_filter(sort_field: str, direction: int, value, _id):
+    op = "$lt" if direction < 0 else "$gt"
+    if sort_field == "_id":
+        return {"_id": {op: _id}}
+    return {"$or": [
+        {sort_field: {op: value}},
+        {sort_field: value, "_id": {op: _id}},
+    ]}
+
+def _project(doc: dict, fields) -> dict:
+    return {k: v for k, v in doc.items() if k in fields}
+
+def _page_query(query: dict, page: PageParams, sort_field: str, direction: int):
+    if page.cursor:
+        value, last_id = decode_cursor(page.cursor)
+        query = {"$and": [query, _keyset_filter(sort_field, direction, value, last_id)]}
+
+    projection = None
+    if page.fields:
+        projection = dict.fromkeys(page.fields, 1)
+        projection[sort_field] = 1
+
+    return query, projection, [(sort_field, direction), ("_id", direction)]
+
+def _validated(items, model, fields):
+    """
+    Lo que haría response_model con FAST_JSON apagado: solo salen los campos del
+    modelo, validados. _id (atributo privado en los modelos *Out) se conserva.
+    Con ?fields= la fila está incompleta a propósito: solo se filtran las claves.
+    """
+    if fields:
+        allowed = set(model.model_fields) | {"_id", "id"}
+        return [{k: v for k, v in item.items() if k in allowed} for item in items]
+    rows = []
+    for item in items:
+        row = model.model_validate(item).model_dump()
+        if "_id" in item:
+            row = {"_id": item["_id"], **row}
+        rows.append(row)
+    return rows
+
+def _page_response(docs, page: PageParams, serializer, sort_field: str, model=None):
+    headers = {}
+    if len(docs) > page.limit:
+        docs = docs[:page.limit]
+        last = docs[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last.get(sort_field), last["_id"])
+
+    items = [serializer(d) for d in docs]
+    if page.fields:
+        keep = set(page.fields) | {"_id", "id"}
+        items = [_project(i, keep) for i in items]
+
+    # FAST_JSON confía en el serializador (lista blanca de campos); sin él se valida como antes
+    if model is not None and not responses.FAST_JSON:
+        items = _validated(items, model, page.fields)
+    return json_response(items, headers=headers)
+
+def paginate(collection, query: dict, page: PageParams, serializer, sort_field: str = "_id", direction: int = -1, model=None):
+    """
+    Devuelve una página ordenada por (sort_field, _id) usando keyset pagination.
+    El token de la siguiente página viaja en el header X-Next-Cursor.
+    """
+    query, projection, sort = _page_query(query, page, sort_field, direction)
+    docs = list(collection.find(query, projection).sort(sort).limit(page.limit + 1))
+    return _page_response(docs, page, serializer, sort_field, model)
+
+async def apaginate(collection, query: dict, page: PageParams, serializer, sort_field: str = "_id", direction: int = -1, model=None):
+    """Versión de paginate() para colecciones de AsyncMongoClient."""
+    query, projection, sort = _page_query(query, page, sort_field, direction)
+    docs = await collection.find(query, projection).sort(sort).limit(page.limit + 1).to_list()
+    return _page_response(docs, page, serializer, sort_field, model)
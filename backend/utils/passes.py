@@ -0,0 +1,76 @@
+# backend/utils/passes.py
+#
+# Pases de visita firmados. El QR no lleva el JSON de la visita: solo
+#   <_id en hex>.<vencimiento epoch en base 36>.<HMAC-SHA256 truncado en base 32>
+# en mayúsculas, ~56 caracteres del modo alfanumérico del QR (versión 3, que
+# se escanea bien incluso impresa en pequeño). El guardia valida la firma sin
+# consultar nada; los datos de la visita se leen de Mongo con el _id.
+
+import base64
+import hashlib
+import hmac
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from backend.utils.jwt_handler import JWT_SECRET
+
+# QR_SECRET permite rotar los pases sin invalidar las sesiones (por defecto se usa JWT_SECRET)
+QR_SECRET = (os.getenv("QR_SECRET") or JWT_SECRET or "").encode()
+# Vigencia del pase cuando la visita no trae hora de salida
+QR_PASS_HOURS = int(os.getenv("QR_PASS_HOURS", 24))
+
+SIGNATURE_BYTES = 15  # 120 bits: 24 caracteres base 32 sin relleno
+
+def pass_expiry(entry_time: datetime, exit_time: Optional[datetime] = None) -> datetime:
+    return exit_time or entry_time + timedelta(hours=QR_PASS_HOURS)
+
+def _epoch(value: datetime) -> int:
+    # Las fechas de Mongo son UTC sin zona
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+def _base36(n: int) -> str:
+    digits = ""
+    while True:
+        n, r = divmod(n, 36)
+        digits = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"[r] + digits
+        if n == 0:
+            return digits
+
+def _signature(body: str) -> str:
+    digest = hmac.new(QR_SECRET, body.encode(), hashlib.sha256).digest()[:SIGNATURE_BYTES]
+    return base64.b32encode(digest).decode()
+
+def sign_pass(visit_id, expires_at: datetime) -> str:
+    body = f"{str(visit_id).upper()}.{_base36(_epoch(expires_at))}"
+    return f"{body}.{_signature(body)}"
+
+def read_pass(token: str) -> Optional[Tuple[str, datetime]]:
+    """(_id de la visita, vencimiento UTC) si la firma es válida; None si no. No revisa el vencimiento."""
+    parts = token.strip().upper().split(".")
+    if len(parts) != 3 or len(parts[0]) != 24:
+        return None
+    visit_id, expires, signature = parts
+    if not hmac.compare_digest(signature, _signature(f"{visit_id}.{expires}")):
+        return None
+    try:
+        bytes.fromhex(visit_id)
+        expires_at = datetime.fromtimestamp(int(expires, 36), timezone.utc).replace(tzinfo=None)
+    except ValueError:
+        return None
+    return visit_id.lower(), expires_at
+
+def visit_expiry(doc: dict) -> datetime:
+    """passExpiresAt; las visitas anteriores a los pases lo derivan de entryTime/exitTime (o del _id)."""
+    if isinstance(doc.get("passExpiresAt"), datetime):
+        return doc["passExpiresAt"]
+    entry = doc.get("entryTime")
+    if not isinstance(entry, datetime):
+        entry = doc["_id"].generation_time.replace(tzinfo=None)
+    exit_time = doc.get("exitTime")
+    return pass_expiry(entry, exit_time if isinstance(exit_time, datetime) else None)
+
+def visit_pass(doc: dict) -> str:
+    return sign_pass(doc["_id"], visit_expiry(doc))
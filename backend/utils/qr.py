@@ -0,0 +1,158 @@
+# backend/utils/qr.py
+#
+# Render de códigos QR (qrcode + Pillow) en PNG o SVG. Es CPU puro (~8 ms por
+# imagen), así que corre en un ProcessPoolExecutor de QR_WORKERS procesos
+# (creado al primer uso) en vez de ocupar el event loop o el threadpool; con
+# QR_WORKERS=0 se renderiza en el mismo proceso.
+#
+# Las imágenes se guardan por huella de contenido (datos + formato + escala)
+# en un LRU acotado por bytes (QR_CACHE_BYTES): un pase se renderiza una sola
+# vez por proceso y la huella sirve también de ETag.
+
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from fastapi import HTTPException
+
+try:
+    import qrcode
+    from qrcode.image.svg import SvgPathImage
+except ImportError:  # pragma: no cover - qrcode/Pillow solo hacen falta para los pases
+    qrcode = None
+
+QR_WORKERS = int(os.getenv("QR_WORKERS", 2))
+QR_CACHE_BYTES = int(os.getenv("QR_CACHE_BYTES", 16 * 1024 * 1024))
+QR_SCALE = int(os.getenv("QR_SCALE", 8))  # px por módulo en PNG
+
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+def render(data: str, fmt: str = "png", scale: int = QR_SCALE) -> bytes:
+    """Imagen del QR para `data`. Función de módulo para poder ejecutarse en el pool."""
+    factory = SvgPathImage if fmt == "svg" else None
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, box_size=scale, border=4, image_factory=factory)
+    qr.add_data(data)
+    qr.make(fit=True)
+    buffer = io.BytesIO()
+    qr.make_image().save(buffer)
+    return buffer.getvalue()
+
+def qr_key(data: str, fmt: str = "png", scale: int = QR_SCALE) -> str:
+    return hashlib.sha256(f"{fmt}:{scale}:{data}".encode()).hexdigest()
+
+# --- Caché por contenido --------------------------------------------------------
+
+_images = OrderedDict()  # huella -> bytes
+_images_size = 0
+_images_lock = threading.Lock()
+
+def _cached(key: str):
+    with _images_lock:
+        image = _images.get(key)
+        if image is not None:
+            _images.move_to_end(key)
+        return image
+
+def _store(key: str, image: bytes):
+    global _images_size
+    if len(image) > QR_CACHE_BYTES:
+        return
+    with _images_lock:
+        if key in _images:
+            return
+        _images[key] = image
+        _images_size += len(image)
+        while _images_size > QR_CACHE_BYTES:
+            _, evicted = _images.popitem(last=False)
+            _images_size -= len(evicted)
+
+def clear_qr_cache():
+    global _images_size
+    with _images_lock:
+        _images.clear()
+        _images_size = 0
+
+# --- Pool de procesos -----------------------------------------------------------
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool():
+    global _pool
+    if QR_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # spawn: un fork heredaría los hilos y sockets del cliente de Mongo
+            _pool = ProcessPoolExecutor(QR_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+def _require():
+    if qrcode is None:
+        raise HTTPException(status_code=503, detail="Generación de QR no disponible: instala qrcode y pillow")
+
+# --- API ------------------------------------------------------------------------
+
+def qr_image(data: str, fmt: str = "png", scale: int = QR_SCALE) -> bytes:
+    """Imagen cacheada o renderizada en el pool (bloquea el hilo que llama: rutas sync)."""
+    _require()
+    key = qr_key(data, fmt, scale)
+    image = _cached(key)
+    if image is None:
+        pool = _get_pool()
+        image = pool.submit(render, data, fmt, scale).result() if pool else render(data, fmt, scale)
+        _store(key, image)
+    return image
+
+async def aqr_image(data: str, fmt: str = "png", scale: int = QR_SCALE) -> bytes:
+    _require()
+    key = qr_key(data, fmt, scale)
+    image = _cached(key)
+    if image is None:
+        image = await asyncio.get_running_loop().run_in_executor(_get_pool(), render, data, fmt, scale)
+        _store(key, image)
+    return image
+
+def _misses(datas, fmt, scale):
+    keys = [qr_key(data, fmt, scale) for data in datas]
+    images = [_cached(key) for key in keys]
+    return keys, images, [i for i, image in enumerate(images) if image is None]
+
+def qr_images(datas, fmt: str = "png", scale: int = QR_SCALE):
+    """Varias imágenes en paralelo (listas de invitados): solo se renderizan las que no están en caché."""
+    _require()
+    keys, images, missing = _misses(datas, fmt, scale)
+    pool = _get_pool()
+    pending = [datas[i] for i in missing]
+    if pool:
+        rendered = pool.map(render, pending, repeat(fmt), repeat(scale), chunksize=max(1, len(pending) // (QR_WORKERS * 4)))
+    else:
+        rendered = (render(data, fmt, scale) for data in pending)
+    for i, image in zip(missing, rendered):
+        images[i] = image
+        _store(keys[i], image)
+    return images
+
+async def aqr_images(datas, fmt: str = "png", scale: int = QR_SCALE):
+    _require()
+    keys, images, missing = _misses(datas, fmt, scale)
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    rendered = await asyncio.gather(*(loop.run_in_executor(pool, render, datas[i], fmt, scale) for i in missing))
+    for i, image in zip(missing, rendered):
+        images[i] = image
+        _store(keys[i], image)
+    return images
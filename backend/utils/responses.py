@@ -0,0 +1,71 @@
+# backend/utils/responses.py
+#
+# Respuesta JSON rápida (opt-in con FAST_JSON=true): codifica con orjson,
+# que entiende datetime de forma nativa, y resuelve ObjectId/Decimal en
+# `json_default`. Si orjson no está instalado se usa json de la stdlib.
+
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() == "true"
+
+def json_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(content) -> bytes:
+        return orjson.dumps(content, default=json_default, option=_ORJSON_OPTIONS)
+else:
+    def dumps(content) -> bytes:
+        return json.dumps(content, default=json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse que codifica directamente documentos de Mongo ya serializados."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+class EncodedJSONResponse(JSONResponse):
+    """Cuerpo ya codificado por json_response() (aciertos de caché): mismos headers, sin re-codificar."""
+
+    def render(self, content) -> bytes:
+        return content
+
+def json_response(content, headers=None) -> JSONResponse:
+    """
+    Respuesta codificada con el mismo encoder que trusted() según FAST_JSON
+    (orjson o jsonable_encoder + json). La usan las páginas y lo que se cachea,
+    para que un acierto devuelva exactamente los bytes de un fallo.
+    """
+    if FAST_JSON:
+        return FastJSONResponse(content, headers=headers)
+    return JSONResponse(jsonable_encoder(content, custom_encoder={ObjectId: str}), headers=headers)
+
+def trusted(content):
+    """
+    Salida de un serializador sobre datos de Mongo. Con FAST_JSON se envuelve
+    en FastJSONResponse y FastAPI omite jsonable_encoder y la re-validación
+    del response_model; si no, se devuelve tal cual (camino por defecto).
+    """
+    if FAST_JSON:
+        return FastJSONResponse(content)
+    return content
@@ -3,14 +3,22 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from backend.utils.jwt_handler import decode_access_token
+from backend.utils.logs import get_logger
 
 bearer_scheme = HTTPBearer()
+logger = get_logger("auth")
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
-    token = credentials.credentials
-    print("TOKEN RECIBIDO:", token)
-    payload = decode_access_token(token)
-    print("📦 PAYLOAD DECODIFICADO:", payload)  # Debug
+# async: se valida en el event loop en vez de ocupar un hilo del threadpool
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)):
+    payload = decode_access_token(credentials.credentials)
     if payload is None:
         raise HTTPException(status_code=401, detail="Token inválido o expirado")
-    return payload
\ No newline at end of file
+    # Nunca se registra el token, solo a quién pertenece
+    logger.debug("event=token_ok user_id=%s role=%s", payload.get("user_id"), payload.get("role"))
+    return payload
+
+# Rutas de operación (/debug): el rol viene en el JWT
+async def require_admin(payload: dict = Depends(verify_token)):
+    if payload.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Solo administradores")
+    return payload
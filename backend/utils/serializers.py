@@ -0,0 +1,81 @@
+# backend/utils/serializers.py
+#
+# Serializadores precompilados: a partir de la lista de campos de una colección
+# se arma (una sola vez, al importar el router) una tupla de conversores por
+# campo; el serializador recorre esa tupla y convierte ObjectId -> str y aplica
+# defaults en una sola pasada, sin mutar el documento y llamando a
+# datetime.utcnow() como mucho una vez por documento.
+
+from datetime import datetime
+from typing import Any, NamedTuple, Optional
+
+# Tipos de campo
+RAW = "raw"        # valor tal cual (con default si falta)
+ID = "id"          # ObjectId/valor -> str; default si es vacío
+FLOAT = "float"    # float(valor)
+DATE = "date"      # datetime; acepta strings ISO y cae a NOW si no es fecha
+
+# Default perezoso: datetime.utcnow() evaluado una vez por documento
+NOW = object()
+_MISSING = object()
+
+class Field(NamedTuple):
+    name: str
+    kind: str = RAW
+    default: Any = None
+    source: Optional[str] = None  # clave en Mongo si difiere de la de salida
+
+def _now(clock: list) -> datetime:
+    # clock: [None] por documento; el primer campo que lo necesita fija la hora
+    if clock[0] is None:
+        clock[0] = datetime.utcnow()
+    return clock[0]
+
+def _converter(f: Field):
+    """fn(doc, clock) -> valor de salida del campo."""
+    src = f.source or f.name
+    default = f.default
+
+    if f.kind == ID and src == "_id":
+        def convert(doc, clock):
+            return str(doc["_id"])
+    elif f.kind == ID:
+        def convert(doc, clock):
+            value = doc.get(src)
+            return str(value) if value else default
+    elif f.kind == FLOAT:
+        def convert(doc, clock):
+            value = doc.get(src, default)
+            return float(value) if value is not None else default
+    elif f.kind == DATE:
+        def convert(doc, clock):
+            value = doc.get(src)
+            if value.__class__ is str:
+                try:
+                    return datetime.fromisoformat(value)
+                except ValueError:
+                    return value  # fecha mal guardada: se devuelve tal cual en vez de un 500
+            if not isinstance(value, datetime):
+                return _now(clock)
+            return value
+    elif default is NOW:
+        def convert(doc, clock):
+            value = doc.get(src, _MISSING)
+            return _now(clock) if value is _MISSING else value
+    else:
+        def convert(doc, clock):
+            return doc.get(src, default)
+    return convert
+
+def compile_serializer(fields, name="serialize"):
+    """Devuelve `name(doc) -> dict` para la lista de Field dada."""
+    fields = tuple(fields)
+    steps = tuple((f.name, _converter(f)) for f in fields)
+
+    def serialize(doc):
+        clock = [None]
+        return {key: convert(doc, clock) for key, convert in steps}
+
+    serialize.__name__ = serialize.__qualname__ = name
+    serialize.fields = fields
+    return serialize
@@ -2,9 +2,11 @@
 import { useQuery } from "@tanstack/react-query";
 import axios from "@/lib/axios";
 
-interface OccupiedTime {
-  inicio: number;
-  fin: number;
+interface DayAvailability {
+  fecha: string;
+  slotMinutes: number;
+  ocupado: string;
+  libres: string[];
 }
 
 interface AvailableTime {
@@ -20,21 +22,14 @@ export const useAvailableTimes = (instalacion: string, fecha: string) => {
     queryFn: async () => {
       if (!instalacion || !fecha) return []; //Protección adicional extra
 
-      const res = await axios.get("/bookings/horarios", {
-        params: { instalacion, fecha },
+      // El backend ya calcula las horas libres (8:00 a 20:00) desde su bitmap de ocupación
+      const res = await axios.get<DayAvailability[]>("/bookings/disponibilidad", {
+        params: { instalacion, desde: fecha, apertura: 8, cierre: 20, paso: 60 },
       });
-      const ocupados: OccupiedTime[] = res.data;
+      const libres = res.data[0]?.libres ?? [];
 
-      const todasLasHoras = Array.from({ length: 12 }, (_, i) => i + 8); // 8:00 a 20:00
-
-      const disponibles = todasLasHoras.filter(hora => {
-        return !ocupados.some(
-          (reserva) => hora >= reserva.inicio && hora < reserva.fin
-        );
-      });
-
-      return disponibles.map(hora => ({
-        hora: `${hora.toString().padStart(2, "0")}:00`,
+      return libres.map(hora => ({
+        hora,
         disponible: true,
       }));
     },